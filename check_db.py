@@ -14,12 +14,12 @@ def check_database():
         print(f'Name: {row[0]}, ID: {row[1]}, Desc: {row[2]}, Created: {row[3]}')
     
     print("\n=== RECENT HEALTH METRICS ===")
-    cursor.execute('SELECT node_name, timestamp, audit_score, suspension_score, satellites_count FROM metrics_health ORDER BY timestamp DESC LIMIT 5')
+    cursor.execute("SELECT nodes.name, datetime(timestamp, 'unixepoch'), audit_score, suspension_score, satellites_count FROM metrics_health JOIN nodes ON nodes.id = metrics_health.node_ref ORDER BY metrics_health.timestamp DESC LIMIT 5")
     for row in cursor.fetchall():
         print(f'Node: {row[0]}, Time: {row[1]}, Audit: {row[2]}, Suspension: {row[3]}, Satellites: {row[4]}')
     
     print("\n=== RECENT DISK METRICS ===")
-    cursor.execute('SELECT node_name, timestamp, used_bytes, available_bytes FROM metrics_disk ORDER BY timestamp DESC LIMIT 5')
+    cursor.execute("SELECT nodes.name, datetime(timestamp, 'unixepoch'), used_bytes, available_bytes FROM metrics_disk JOIN nodes ON nodes.id = metrics_disk.node_ref ORDER BY metrics_disk.timestamp DESC LIMIT 5")
     for row in cursor.fetchall():
         used_gb = row[2] / (1024**3) if row[2] else 0
         available_gb = row[3] / (1024**3) if row[3] else 0
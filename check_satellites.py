@@ -31,9 +31,10 @@ def check_satellites():
     
     print("\n=== RECENT HEALTH METRICS (with satellite count) ===")
     cursor.execute("""
-        SELECT node_name, timestamp, satellites_count, audit_score, suspension_score 
+        SELECT nodes.name, datetime(timestamp, 'unixepoch'), satellites_count, audit_score, suspension_score 
         FROM metrics_health 
-        ORDER BY timestamp DESC 
+        JOIN nodes ON nodes.id = metrics_health.node_ref
+        ORDER BY metrics_health.timestamp DESC 
         LIMIT 5
     """)
     for row in cursor.fetchall():
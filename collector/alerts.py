@@ -0,0 +1,214 @@
+"""Threshold alert evaluation for Storj Monitor."""
+
+import asyncio
+import heapq
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from storj_monitor.config import AlertRuleConfig, AlertsConfig
+from storj_monitor.utils import datetime_to_epoch
+
+
+# Sample fields a node's alert state depends on; a node whose fields are
+# unchanged since the last cycle is not evaluated again
+ALERT_INPUTS = (
+    'disk_used', 'disk_available', 'audit_score', 'suspension_score',
+    'online_score', 'last_pinged', 'satellites_count',
+)
+
+
+def _epoch(value: Any) -> Optional[int]:
+    if isinstance(value, datetime):
+        return datetime_to_epoch(value)
+    return value
+
+
+def disk_usage_percent(inputs: Dict[str, Any], now: float) -> Optional[float]:
+    used, available = inputs.get('disk_used'), inputs.get('disk_available')
+    if used is None or available is None or used + available <= 0:
+        return None
+    return used / (used + available) * 100
+
+
+def ping_age_minutes(inputs: Dict[str, Any], now: float) -> Optional[float]:
+    last_pinged = inputs.get('last_pinged')
+    if last_pinged is None:
+        return None
+    return (now - last_pinged) / 60
+
+
+# Values a rule can test, computed from a node's inputs and the current time
+ALERT_METRICS: Dict[str, Callable[[Dict[str, Any], float], Optional[float]]] = {
+    'disk_usage_percent': disk_usage_percent,
+    'audit_score': lambda inputs, now: inputs.get('audit_score'),
+    'suspension_score': lambda inputs, now: inputs.get('suspension_score'),
+    'online_score': lambda inputs, now: inputs.get('online_score'),
+    'satellites_count': lambda inputs, now: inputs.get('satellites_count'),
+    'ping_age_minutes': ping_age_minutes,
+}
+
+
+def is_breached(rule: AlertRuleConfig, value: float, firing: bool) -> bool:
+    """Whether a rule is breached, with hysteresis.
+
+    A rule starts firing past threshold and only resolves once the value is
+    back past clear_threshold, so a value hovering around the threshold does
+    not flap.
+    """
+    if rule.condition == 'above':
+        return value > (rule.clear_threshold if firing else rule.threshold)
+    return value < (rule.clear_threshold if firing else rule.threshold)
+
+
+class FileSink:
+    """Appends alerts to a file as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def _write(self, alerts: List[Dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for alert in alerts:
+                file.write(json.dumps(alert) + '\n')
+
+    async def send(self, alerts: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._write, alerts)
+
+
+class WebhookSink:
+    """POSTs alerts as a JSON document to a webhook URL."""
+
+    def __init__(self, url: str, timeout: int = 10):
+        self.url = url
+        self.timeout = timeout
+
+    async def send(self, alerts: List[Dict[str, Any]]) -> None:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.post(self.url, json={'alerts': alerts})
+            response.raise_for_status()
+
+
+def build_sinks(config: AlertsConfig) -> List[Any]:
+    """Create the sinks an alerts configuration enables."""
+    sinks: List[Any] = []
+    if config.file:
+        sinks.append(FileSink(config.file))
+    if config.webhook_url:
+        sinks.append(WebhookSink(config.webhook_url, config.webhook_timeout))
+    return sinks
+
+
+class AlertEngine:
+    """Evaluates alert rules against each cycle's samples.
+
+    Only nodes whose inputs changed since the last cycle are evaluated,
+    plus nodes whose ping age reaches a rule's threshold by now (tracked
+    as due times, so an idle fleet costs nothing). Each (node, rule) pair
+    remembers whether it is firing, and an alert is produced only when
+    that changes.
+    """
+
+    def __init__(self, rules: List[AlertRuleConfig], sinks: Optional[List[Any]] = None,
+                 logger: Optional[logging.Logger] = None):
+        self.rules = rules
+        self.sinks = sinks or []
+        self.logger = logger or logging.getLogger(__name__)
+        self.inputs: Dict[str, Tuple] = {}
+        self.firing: Dict[Tuple[str, str], bool] = {}
+        self.due: Dict[str, float] = {}
+        self.due_heap: List[Tuple[float, str]] = []
+
+    @classmethod
+    def from_config(cls, config: AlertsConfig, logger: Optional[logging.Logger] = None) -> "AlertEngine":
+        return cls(config.rules if config.enabled else [], build_sinks(config), logger)
+
+    def _due_nodes(self, now: float) -> List[str]:
+        nodes = []
+        while self.due_heap and self.due_heap[0][0] <= now:
+            due, node_name = heapq.heappop(self.due_heap)
+            # Entries superseded by a later schedule are skipped
+            if self.due.get(node_name) == due:
+                del self.due[node_name]
+                nodes.append(node_name)
+        return nodes
+
+    def _schedule(self, node_name: str, inputs: Dict[str, Any]) -> None:
+        """Remember when the node's ping age next crosses a threshold it has not crossed yet."""
+        last_pinged = inputs.get('last_pinged')
+        due_times = [
+            last_pinged + rule.threshold * 60
+            for rule in self.rules
+            if rule.metric == 'ping_age_minutes' and rule.condition == 'above'
+            and last_pinged is not None and not self.firing.get((node_name, rule.name))
+        ]
+        if due_times:
+            self.due[node_name] = min(due_times)
+            heapq.heappush(self.due_heap, (self.due[node_name], node_name))
+        else:
+            self.due.pop(node_name, None)
+
+    def evaluate_node(self, node_name: str, inputs: Dict[str, Any], now: float) -> List[Dict[str, Any]]:
+        """Evaluate every rule for one node, returning the alerts whose state changed."""
+        alerts = []
+        for rule in self.rules:
+            value = ALERT_METRICS[rule.metric](inputs, now)
+            if value is None:
+                continue
+            key = (node_name, rule.name)
+            firing = self.firing.get(key, False)
+            breached = is_breached(rule, value, firing)
+            if breached == firing:
+                continue
+            self.firing[key] = breached
+            verb = f"{rule.condition} {rule.threshold:g}" if breached else f"back within {rule.clear_threshold:g}"
+            alerts.append({
+                'rule': rule.name,
+                'node_name': node_name,
+                'state': 'firing' if breached else 'resolved',
+                'severity': rule.severity if breached else 'info',
+                'metric': rule.metric,
+                'value': round(value, 4),
+                'threshold': rule.threshold if breached else rule.clear_threshold,
+                'timestamp': int(now),
+                'message': f"{node_name}: {rule.metric.replace('_', ' ')} {value:.4g} {verb}",
+            })
+        self._schedule(node_name, inputs)
+        return alerts
+
+    def evaluate(self, samples: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Evaluate a cycle's samples and return the alerts that fired or resolved."""
+        if not self.rules:
+            return []
+        now = time.time() if now is None else now
+
+        changed = {}
+        for sample in samples:
+            inputs = tuple(_epoch(sample.get(field)) for field in ALERT_INPUTS)
+            if self.inputs.get(sample['node_name']) != inputs:
+                self.inputs[sample['node_name']] = inputs
+                changed[sample['node_name']] = inputs
+        for node_name in self._due_nodes(now):
+            changed.setdefault(node_name, self.inputs[node_name])
+
+        alerts = []
+        for node_name, inputs in changed.items():
+            alerts.extend(self.evaluate_node(node_name, dict(zip(ALERT_INPUTS, inputs)), now))
+        return alerts
+
+    async def dispatch(self, alerts: List[Dict[str, Any]]) -> None:
+        """Log alerts and hand them to every sink; a failing sink does not affect the others."""
+        for alert in alerts:
+            level = logging.WARNING if alert['state'] == 'firing' else logging.INFO
+            self.logger.log(level, f"Alert {alert['rule']} {alert['state']}: {alert['message']}")
+
+        results = await asyncio.gather(*(sink.send(alerts) for sink in self.sinks), return_exceptions=True)
+        for sink, result in zip(self.sinks, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Alert sink {type(sink).__name__} failed: {result}")
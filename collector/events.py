@@ -0,0 +1,163 @@
+"""State-transition event detection for Storj Monitor."""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiosqlite
+
+
+# (level, threshold) pairs per score, worst first; a score below a
+# threshold is at that level, above all of them it is 'ok'
+SCORE_THRESHOLDS = {
+    'audit_score': (('critical', 0.95), ('warning', 0.99)),
+    'suspension_score': (('critical', 0.95), ('warning', 0.99)),
+    'online_score': (('warning', 0.95),),
+}
+
+SCORE_LEVELS = ('ok', 'warning', 'critical')
+
+# Event types written by the detector
+NODE_OFFLINE = 'node_offline'
+NODE_ONLINE = 'node_online'
+SCORE_DEGRADED = 'score_degraded'
+SCORE_RECOVERED = 'score_recovered'
+VERSION_CHANGED = 'version_changed'
+QUIC_STATUS_CHANGED = 'quic_status_changed'
+UPTIME_RESET = 'uptime_reset'
+
+
+def score_level(score_name: str, value: Optional[float]) -> Optional[str]:
+    """Classify a score as 'ok', 'warning' or 'critical' (None when unknown)."""
+    if value is None:
+        return None
+    for level, threshold in SCORE_THRESHOLDS[score_name]:
+        if value < threshold:
+            return level
+    return 'ok'
+
+
+def make_event(node_name: str, event_type: str, severity: str, message: str,
+               previous_value: Any = None, current_value: Any = None) -> Dict[str, Any]:
+    """Build an events row as named parameters."""
+    return {
+        'node_name': node_name,
+        'event_type': event_type,
+        'severity': severity,
+        'message': message,
+        'previous_value': None if previous_value is None else str(previous_value),
+        'current_value': None if current_value is None else str(current_value),
+    }
+
+
+class EventDetector:
+    """Turns consecutive node states into transition events.
+
+    Keeps the last stored sample of every node, plus whether it was
+    reachable, and compares each new cycle against it. A node that stays
+    degraded produces one event when it crosses the threshold, not one
+    per sample. States are seeded from the database the first time a
+    node is seen, so a collector restart does not re-announce old state.
+    """
+
+    def __init__(self):
+        self.states: Dict[str, Dict[str, Any]] = {}
+
+    async def load_states(self, db: aiosqlite.Connection, node_names: Iterable[str]) -> None:
+        """Seed the state of nodes not seen yet from their latest sample and reachability event."""
+        db.row_factory = aiosqlite.Row
+        try:
+            for node_name in node_names:
+                if node_name in self.states:
+                    continue
+                cursor = await db.execute("""
+                    SELECT * FROM metrics_samples
+                    WHERE node_ref = (SELECT id FROM nodes WHERE name = ?)
+                    ORDER BY timestamp DESC
+                    LIMIT 1
+                """, (node_name,))
+                sample = await cursor.fetchone()
+                cursor = await db.execute("""
+                    SELECT event_type FROM events
+                    WHERE node_ref = (SELECT id FROM nodes WHERE name = ?)
+                      AND event_type IN (?, ?)
+                    ORDER BY id DESC
+                    LIMIT 1
+                """, (node_name, NODE_OFFLINE, NODE_ONLINE))
+                reachability = await cursor.fetchone()
+                self.states[node_name] = {
+                    'sample': dict(sample) if sample else None,
+                    'offline': reachability is not None and reachability['event_type'] == NODE_OFFLINE,
+                }
+        finally:
+            db.row_factory = None
+
+    def sample_events(self, previous: Optional[Dict[str, Any]], sample: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Compare a node's new sample against its previous one."""
+        node_name = sample['node_name']
+        previous = previous or {}
+        events = []
+
+        for score_name in SCORE_THRESHOLDS:
+            label = score_name.replace('_', ' ')
+            value = sample.get(score_name)
+            level = score_level(score_name, value)
+            previous_level = score_level(score_name, previous.get(score_name)) or 'ok'
+            if level is None or level == previous_level:
+                continue
+            if SCORE_LEVELS.index(level) > SCORE_LEVELS.index(previous_level):
+                events.append(make_event(
+                    node_name, SCORE_DEGRADED, level,
+                    f"{label} dropped to {value:.3f} ({level})", previous.get(score_name), value
+                ))
+            else:
+                events.append(make_event(
+                    node_name, SCORE_RECOVERED, 'info',
+                    f"{label} recovered to {value:.3f} ({level})", previous.get(score_name), value
+                ))
+
+        old_version, new_version = previous.get('version'), sample.get('version')
+        if old_version and new_version and old_version != new_version:
+            events.append(make_event(
+                node_name, VERSION_CHANGED, 'info',
+                f"Version changed from {old_version} to {new_version}", old_version, new_version
+            ))
+
+        old_quic, new_quic = previous.get('quic_status'), sample.get('quic_status')
+        if old_quic and new_quic and old_quic != new_quic:
+            events.append(make_event(
+                node_name, QUIC_STATUS_CHANGED, 'info' if new_quic == 'OK' else 'warning',
+                f"QUIC status changed from {old_quic} to {new_quic}", old_quic, new_quic
+            ))
+
+        old_uptime, new_uptime = previous.get('uptime_seconds'), sample.get('uptime_seconds')
+        if old_uptime is not None and new_uptime is not None and new_uptime < old_uptime:
+            events.append(make_event(
+                node_name, UPTIME_RESET, 'warning',
+                f"Node restarted (uptime {old_uptime / 3600:.1f}h -> {new_uptime / 3600:.1f}h)",
+                old_uptime, new_uptime
+            ))
+
+        return events
+
+    def detect(self, samples: List[Dict[str, Any]], errors: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Build the events of one cycle from its samples and per-node collection errors."""
+        events = []
+        for node_name, error in errors.items():
+            if not self.states.get(node_name, {}).get('offline'):
+                events.append(make_event(node_name, NODE_OFFLINE, 'critical', f"Node unreachable: {error}"))
+
+        for sample in samples:
+            state = self.states.get(sample['node_name'], {})
+            if state.get('offline'):
+                events.append(make_event(sample['node_name'], NODE_ONLINE, 'info', "Node reachable again"))
+            events.extend(self.sample_events(state.get('sample'), sample))
+        return events
+
+    def advance(self, samples: List[Dict[str, Any]], errors: Dict[str, str]) -> None:
+        """Make a stored cycle the baseline for the next one."""
+        for node_name in errors:
+            self.states.setdefault(node_name, {'sample': None})['offline'] = True
+        for sample in samples:
+            # A partial sample keeps the previous values of the fields it lacks
+            previous = self.states.get(sample['node_name'], {}).get('sample') or {}
+            merged = {**previous, **{key: value for key, value in sample.items() if value is not None}}
+            self.states[sample['node_name']] = {'sample': merged, 'offline': False}
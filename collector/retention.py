@@ -0,0 +1,177 @@
+"""Retention policy enforcement for Storj Monitor."""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+import aiosqlite
+
+from storj_monitor.config import Settings
+from storj_monitor.db import connect_database, row_key_columns
+from storj_monitor.utils import utc_now, PerformanceTimer
+
+
+# Age column of every table retention can manage, and how that column stores time
+RETENTION_COLUMNS = {
+    'metrics_samples': ('timestamp', 'epoch'),
+    'collection_cycles': ('started_at', 'epoch'),
+    'events': ('timestamp', 'epoch'),
+    'node_satellites': ('timestamp', 'epoch'),
+    'metrics_daily_bandwidth': ('date', 'date'),
+    'metrics_daily_storage': ('date', 'date'),
+    'metrics_daily_satellite': ('date', 'date'),
+    'metrics_rollup_hourly': ('bucket', 'epoch'),
+    'metrics_rollup_daily': ('bucket', 'epoch'),
+}
+
+# Tables whose rows reference collection_cycles by cycle_id; a cycle is
+# kept as long as the longest retention among them
+CYCLE_REFERENCING_TABLES = ('metrics_samples',)
+
+# Further condition a row must meet to expire, for tables whose newest
+# rows are also current state
+RETENTION_EXPIRES_ONLY = {
+    # The newest version per node and satellite is the satellite's current
+    # status, however long ago it last changed
+    'node_satellites': """EXISTS (
+        SELECT 1 FROM node_satellites newer
+        WHERE newer.node_ref = node_satellites.node_ref
+          AND newer.satellite_ref = node_satellites.satellite_ref
+          AND newer.id > node_satellites.id
+    )""",
+}
+
+# auto_vacuum mode that supports PRAGMA incremental_vacuum
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Rows ANALYZE samples per index; bounds its cost on a large database
+# while keeping sqlite_stat1 row estimates close enough for the planner
+# and the schema browser
+ANALYSIS_LIMIT = 1000
+
+
+class RetentionEngine:
+    """Deletes rows older than each table's retention and reclaims the space.
+
+    Runs on its own connection. Every batch of deletes is a short
+    transaction followed by a pause, so the collector's writer is never
+    locked out for longer than one batch.
+    """
+
+    def __init__(self, settings: Settings, logger: Optional[logging.Logger] = None):
+        self.settings = settings
+        self.config = settings.retention
+        self.logger = logger or logging.getLogger(__name__)
+
+    def retention_days(self) -> Dict[str, Optional[int]]:
+        """Get the days each configured table keeps (None keeps it forever).
+
+        collection_cycles is kept at least as long as every table that
+        references it, so no sample is left pointing at a deleted cycle.
+        """
+        days = dict(self.config.tables)
+        if days.get('collection_cycles') is not None:
+            referencing = [days.get(table) for table in CYCLE_REFERENCING_TABLES]
+            if None in referencing:
+                days['collection_cycles'] = None
+            else:
+                days['collection_cycles'] = max(days['collection_cycles'], *referencing)
+        return days
+
+    def cutoff(self, table: str, days: int) -> Any:
+        """Get the oldest value of the table's age column that is kept."""
+        _, kind = RETENTION_COLUMNS[table]
+        cutoff_time = utc_now() - timedelta(days=days)
+        if kind == 'epoch':
+            return int(cutoff_time.timestamp())
+        return cutoff_time.date().isoformat()
+
+    async def _pause(self) -> None:
+        await asyncio.sleep(self.config.batch_pause_ms / 1000)
+
+    async def purge_table(self, db: aiosqlite.Connection, table: str, days: int) -> int:
+        """Delete a table's expired rows in batches, returning how many were deleted."""
+        column, _ = RETENTION_COLUMNS[table]
+        cutoff = self.cutoff(table, days)
+        key = ', '.join(await row_key_columns(db, table))
+        expires_only = f"AND {RETENTION_EXPIRES_ONLY[table]}" if table in RETENTION_EXPIRES_ONLY else ""
+        deleted = 0
+
+        while True:
+            cursor = await db.execute(f"""
+                DELETE FROM {table} WHERE ({key}) IN (
+                    SELECT {key} FROM {table} WHERE {column} < ? {expires_only} LIMIT ?
+                )
+            """, (cutoff, self.config.batch_size))
+            await db.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < self.config.batch_size:
+                return deleted
+            await self._pause()
+
+    async def _database_pages(self, db: aiosqlite.Connection) -> Dict[str, int]:
+        stats = {}
+        for pragma in ('page_count', 'page_size', 'freelist_count', 'auto_vacuum'):
+            cursor = await db.execute(f"PRAGMA {pragma}")
+            stats[pragma] = (await cursor.fetchone())[0]
+        return stats
+
+    async def reclaim_space(self, db: aiosqlite.Connection) -> None:
+        """Return free pages to the filesystem in small incremental_vacuum steps."""
+        stats = await self._database_pages(db)
+        if stats['auto_vacuum'] != AUTO_VACUUM_INCREMENTAL:
+            if stats['freelist_count']:
+                self.logger.info(
+                    f"{stats['freelist_count']} free pages will be reused but not returned: "
+                    f"the database was created without auto_vacuum=INCREMENTAL "
+                    f"(run scripts/apply_retention.py --convert to enable it)"
+                )
+            return
+
+        free_pages = stats['freelist_count']
+        while free_pages:
+            await db.execute(f"PRAGMA incremental_vacuum({self.config.vacuum_pages})")
+            await db.commit()
+            remaining = (await self._database_pages(db))['freelist_count']
+            if remaining >= free_pages:
+                return
+            free_pages = remaining
+            await self._pause()
+
+    async def refresh_statistics(self, db: aiosqlite.Connection) -> None:
+        """Re-estimate table statistics after the deletes with a sampling ANALYZE."""
+        await db.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        await db.execute("ANALYZE")
+        await db.commit()
+
+    async def run(self) -> Dict[str, Any]:
+        """Apply every configured retention period once.
+
+        Returns the rows deleted per table and the bytes the database file shrank by.
+        """
+        rows_deleted = {}
+        with PerformanceTimer("Retention run", self.logger):
+            db = await connect_database(self.settings.database)
+            try:
+                before = await self._database_pages(db)
+                for table, days in self.retention_days().items():
+                    if days is None:
+                        continue
+                    if table not in RETENTION_COLUMNS:
+                        self.logger.warning(f"Retention configured for unknown table {table}, skipping")
+                        continue
+                    rows_deleted[table] = await self.purge_table(db, table, days)
+                await self.reclaim_space(db)
+                await self.refresh_statistics(db)
+                after = await self._database_pages(db)
+            finally:
+                await db.close()
+
+        bytes_freed = (before['page_count'] - after['page_count']) * before['page_size']
+        self.logger.info(
+            f"Retention deleted {sum(rows_deleted.values())} rows "
+            f"({', '.join(f'{table}: {count}' for table, count in rows_deleted.items() if count) or 'nothing expired'}), "
+            f"freed {bytes_freed / (1024**2):.2f} MB"
+        )
+        return {'rows_deleted': rows_deleted, 'bytes_freed': bytes_freed}
@@ -1,41 +1,238 @@
 """Data collection service for Storj Monitor."""
 
 import asyncio
+import json
 import logging
 import signal
 import sys
+import time
 from datetime import datetime, date
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 import aiosqlite
 
 # Add parent directory to path to import storj_monitor
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from storj_monitor.config import load_settings
+from storj_monitor.config import load_settings, NodeConfig, Settings
 from storj_monitor.models import (
     StorjNodeInfo, StorjSatelliteInfo, DiskMetrics, BandwidthMetrics,
     HealthMetrics, DailyBandwidthMetrics, DailyStorageMetrics
 )
 from storj_monitor.utils import (
-    setup_logging, create_http_client, utc_now, timestamp_to_datetime,
+    AsyncHTTPClient, setup_logging, create_http_client, utc_now, timestamp_to_datetime, datetime_to_epoch,
     calculate_uptime_seconds, safe_int, safe_float, PerformanceTimer
 )
-from collector.satellite_extractor import SatelliteDataExtractor
+from storj_monitor.db import (
+    CONNECTION_ERRORS, ROLLUP_TIERS, apply_migrations, connect_database, is_connection_alive
+)
+from collector.satellite_extractor import KNOWN_SATELLITES, SatelliteDataExtractor
+from collector.retention import RetentionEngine
+from collector.events import EventDetector
+from collector.alerts import AlertEngine
+
+
+# History tables store integer references to nodes.id and satellites.id;
+# rows are written with names and resolved to references on insert
+NODE_REF = "(SELECT id FROM nodes WHERE name = ?)"
+SATELLITE_REF = "(SELECT id FROM satellites WHERE satellite_id = ?)"
+NAMED_NODE_REF = "(SELECT id FROM nodes WHERE name = :node_name)"
+NAMED_SATELLITE_REF = "(SELECT id FROM satellites WHERE satellite_id = :satellite_id)"
+
+# node_satellites fields whose change creates a new version row
+SATELLITE_TRACKED_FIELDS = (
+    'is_vetted', 'vetting_progress', 'vetted_at', 'audit_score',
+    'suspension_score', 'online_score', 'joined_at'
+)
+
+SATELLITE_STATUS_INSERT = f"""
+    INSERT OR REPLACE INTO node_satellites 
+    (node_ref, satellite_ref, timestamp, is_vetted, vetting_progress, vetted_at,
+     audit_score, suspension_score, online_score, joined_at, 
+     current_month_egress, current_month_ingress, last_seen)
+    VALUES ({NAMED_NODE_REF}, {NAMED_SATELLITE_REF}, :timestamp, :is_vetted, :vetting_progress, :vetted_at,
+            :audit_score, :suspension_score, :online_score, :joined_at,
+            :current_month_egress, :current_month_ingress, :timestamp)
+    """
+
+SATELLITE_LATEST_VERSION = f"""
+    SELECT MAX(id) FROM node_satellites
+    WHERE node_ref = {NAMED_NODE_REF} AND satellite_ref = {NAMED_SATELLITE_REF}
+    """
+
+# A second version within the same second replaces the first
+SATELLITE_VERSION_INSERT = f"""
+    INSERT OR REPLACE INTO node_satellites
+    (node_ref, satellite_ref, timestamp, is_vetted, vetting_progress, vetted_at,
+     audit_score, suspension_score, online_score, joined_at,
+     current_month_egress, current_month_ingress, last_seen)
+    SELECT {NAMED_NODE_REF}, {NAMED_SATELLITE_REF}, :timestamp, :is_vetted, :vetting_progress, :vetted_at,
+           :audit_score, :suspension_score, :online_score, :joined_at,
+           :current_month_egress, :current_month_ingress, :timestamp
+    WHERE NOT EXISTS (
+        SELECT 1 FROM node_satellites
+        WHERE id = ({SATELLITE_LATEST_VERSION})
+          AND {' AND '.join(f'{field} IS :{field}' for field in SATELLITE_TRACKED_FIELDS)}
+    )
+    """
+
+SATELLITE_VERSION_REFRESH = f"""
+    UPDATE node_satellites
+    SET last_seen = :timestamp,
+        current_month_egress = :current_month_egress,
+        current_month_ingress = :current_month_ingress
+    WHERE id = ({SATELLITE_LATEST_VERSION})
+    """
+
+# Each store opens a collection_cycles row; the cycle's samples reference it
+CYCLE_INSERT = """
+    INSERT INTO collection_cycles (started_at, finished_at, node_count, error_count, errors)
+    VALUES (?, CAST(strftime('%s', 'now') AS INTEGER), ?, ?, ?)
+    """
+CURRENT_CYCLE = "(SELECT MAX(id) FROM collection_cycles)"
+
+SAMPLE_COLUMNS = (
+    'disk_used', 'disk_available', 'disk_trash', 'disk_overused',
+    'bandwidth_used', 'bandwidth_available',
+    'version', 'uptime_seconds', 'last_pinged', 'quic_status',
+    'audit_score', 'suspension_score', 'online_score', 'satellites_count',
+)
+
+SAMPLE_INSERT = f"""
+    INSERT INTO metrics_samples (cycle_id, node_ref, {', '.join(SAMPLE_COLUMNS)})
+    VALUES ({CURRENT_CYCLE}, {NAMED_NODE_REF}, {', '.join(':' + column for column in SAMPLE_COLUMNS)})
+    """
+
+# Latest-state upserts, written alongside the history inserts so the
+# current status of a node is a primary key lookup instead of a MAX(id) scan
+NODE_LATEST_UPSERT = """
+    INSERT INTO node_latest
+    (node_name, disk_used, disk_available, disk_trash, bandwidth_used, version,
+     audit_score, suspension_score, online_score, quic_status, last_pinged,
+     satellites_count, last_updated)
+    VALUES (:node_name, :disk_used, :disk_available, :disk_trash, :bandwidth_used, :version,
+            :audit_score, :suspension_score, :online_score, :quic_status, :last_pinged,
+            :satellites_count, CAST(strftime('%s', 'now') AS INTEGER))
+    ON CONFLICT (node_name) DO UPDATE SET
+        disk_used = COALESCE(excluded.disk_used, disk_used),
+        disk_available = COALESCE(excluded.disk_available, disk_available),
+        disk_trash = COALESCE(excluded.disk_trash, disk_trash),
+        bandwidth_used = COALESCE(excluded.bandwidth_used, bandwidth_used),
+        version = COALESCE(excluded.version, version),
+        audit_score = COALESCE(excluded.audit_score, audit_score),
+        suspension_score = COALESCE(excluded.suspension_score, suspension_score),
+        online_score = COALESCE(excluded.online_score, online_score),
+        quic_status = COALESCE(excluded.quic_status, quic_status),
+        last_pinged = COALESCE(excluded.last_pinged, last_pinged),
+        satellites_count = COALESCE(excluded.satellites_count, satellites_count),
+        last_updated = excluded.last_updated
+    """
+
+EVENT_INSERT = f"""
+    INSERT INTO events (node_ref, event_type, severity, message, previous_value, current_value)
+    VALUES ({NAMED_NODE_REF}, :event_type, :severity, :message, :previous_value, :current_value)
+    """
+
+SATELLITE_LATEST_UPSERT = """
+    INSERT INTO node_satellite_latest
+    (node_name, satellite_id, is_vetted, vetting_progress, vetted_at,
+     audit_score, suspension_score, online_score, joined_at,
+     current_month_egress, current_month_ingress, last_updated)
+    VALUES (:node_name, :satellite_id, :is_vetted, :vetting_progress, :vetted_at,
+            :audit_score, :suspension_score, :online_score, :joined_at,
+            :current_month_egress, :current_month_ingress, :timestamp)
+    ON CONFLICT (node_name, satellite_id) DO UPDATE SET
+        is_vetted = excluded.is_vetted,
+        vetting_progress = excluded.vetting_progress,
+        vetted_at = excluded.vetted_at,
+        audit_score = excluded.audit_score,
+        suspension_score = excluded.suspension_score,
+        online_score = excluded.online_score,
+        joined_at = excluded.joined_at,
+        current_month_egress = excluded.current_month_egress,
+        current_month_ingress = excluded.current_month_ingress,
+        last_updated = excluded.last_updated
+    """
+
+# Rolled-up metrics as (metric name, source list in all_metrics, model attribute)
+ROLLUP_METRICS = (
+    ('disk_used', 'disk', 'used_bytes'),
+    ('disk_available', 'disk', 'available_bytes'),
+    ('disk_trash', 'disk', 'trash_bytes'),
+    ('bandwidth_used', 'bandwidth', 'used_bytes'),
+    ('audit_score', 'health', 'audit_score'),
+    ('suspension_score', 'health', 'suspension_score'),
+    ('online_score', 'health', 'online_score'),
+    ('uptime_seconds', 'health', 'uptime_seconds'),
+    ('satellites_count', 'health', 'satellites_count'),
+)
+
+DAILY_TABLES = ('metrics_daily_bandwidth', 'metrics_daily_storage', 'metrics_daily_satellite')
+
+
+def conditional_upsert(table: str, key_columns: List[str], value_columns: List[str],
+                       placeholders: Optional[Dict[str, str]] = None) -> str:
+    """Build an upsert that only rewrites a row when one of its values changed.
+
+    Unlike INSERT OR REPLACE, an unchanged row is left untouched: no delete,
+    no new rowid and no index maintenance. placeholders maps a column to
+    the SQL expression that binds it (default '?').
+    """
+    columns = key_columns + value_columns
+    placeholders = placeholders or {}
+    return f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({', '.join(placeholders.get(column, '?') for column in columns)})
+        ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET
+            {', '.join(f'{column} = excluded.{column}' for column in value_columns)}
+        WHERE {' OR '.join(f'{column} IS NOT excluded.{column}' for column in value_columns)}
+        """
+
+
+def rollup_upsert(table: str, bucket_seconds: int) -> str:
+    """Build the statement folding one (node_name, metric, value) sample into its bucket.
+
+    The bucket is taken from the started_at of the cycle stored just before,
+    the same timestamp the raw fleet history buckets by, so a cycle lands in
+    the same bucket whichever tier is read.
+    """
+    return f"""
+        INSERT INTO {table}
+        (node_ref, metric, bucket, samples, min_value, max_value, sum_value, last_value)
+        VALUES ((SELECT id FROM nodes WHERE name = ?1), ?2,
+                (SELECT started_at FROM collection_cycles WHERE id = {CURRENT_CYCLE})
+                    / {bucket_seconds} * {bucket_seconds},
+                1, ?3, ?3, ?3, ?3)
+        ON CONFLICT (node_ref, metric, bucket) DO UPDATE SET
+            samples = samples + 1,
+            min_value = MIN(min_value, excluded.min_value),
+            max_value = MAX(max_value, excluded.max_value),
+            sum_value = sum_value + excluded.sum_value,
+            last_value = excluded.last_value
+        """
 
 
 class StorjCollector:
     """Main collector service for Storj node metrics."""
 
-    def __init__(self):
-        self.settings = load_settings()
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or load_settings()
         self.logger = setup_logging(
             self.settings.logging.level,
-            "logs/collector.log"
+            "logs/collector.log",
+            self.settings
         )
         self.is_running = False
         self.satellite_extractor = SatelliteDataExtractor()
+        self.http_clients: Dict[str, AsyncHTTPClient] = {}
+        self.db: Optional[aiosqlite.Connection] = None
+        self.retention = RetentionEngine(self.settings, self.logger)
+        self.event_detector = EventDetector()
+        self.alert_engine = AlertEngine.from_config(self.settings.alerts, self.logger)
+        self.alert_tasks: set = set()
+        self.retention_task: Optional[asyncio.Task] = None
+        self.last_retention_run: Optional[float] = None
         self._setup_signal_handlers()
 
     def _setup_signal_handlers(self):
@@ -47,20 +244,150 @@ class StorjCollector:
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
 
-    async def collect_node_data(self, node_name: str, dashboard_url: str) -> Dict[str, Any]:
+    def get_http_client(self, host: str) -> AsyncHTTPClient:
+        """Get the collector-lifetime HTTP client for a host, opening it on first use.
+
+        Each host gets its own connection pool, sized from max_per_host so
+        that it holds the sockets that host's collection slots can use,
+        capped by max_connections and max_keepalive_connections. Connections
+        are kept alive between cycles so each poll reuses the pooled sockets
+        instead of paying a fresh TCP connect per request.
+        """
+        client = self.http_clients.get(host)
+        if client is None or not client.is_open:
+            monitoring = self.settings.monitoring
+            # Every node collection issues two requests at once
+            host_connections = min(monitoring.max_per_host * 2, monitoring.max_connections)
+            client = create_http_client(
+                self.settings,
+                max_connections=host_connections,
+                max_keepalive_connections=min(host_connections, monitoring.max_keepalive_connections)
+            ).open()
+            self.http_clients[host] = client
+        return client
+
+    async def get_db(self) -> aiosqlite.Connection:
+        """Get the long-lived writer connection, opening it on first use.
+
+        Pending schema revisions are applied when the connection is opened.
+        """
+        if self.db is None:
+            db = await connect_database(self.settings.database)
+            try:
+                applied = await apply_migrations(db)
+            except Exception:
+                await db.close()
+                raise
+            if applied:
+                self.logger.info(f"Applied database schema versions: {applied}")
+            self.db = db
+            self.logger.debug(f"Opened database writer connection to {self.settings.database.path}")
+        return self.db
+
+    async def _discard_db(self) -> None:
+        """Drop the writer connection so the next use reconnects."""
+        db, self.db = self.db, None
+        if db is not None:
+            try:
+                await db.close()
+            except Exception as e:
+                self.logger.debug(f"Error closing broken database connection: {e}")
+
+    def schedule_retention(self) -> None:
+        """Start a retention run in the background when one is due.
+
+        The run uses its own connection and short delete batches, so it
+        proceeds while the collector waits for (or writes) the next cycle.
+        """
+        config = self.settings.retention
+        if not config.enabled:
+            return
+        if self.retention_task is not None and not self.retention_task.done():
+            return
+        now = time.monotonic()
+        if self.last_retention_run is not None and now - self.last_retention_run < config.interval_hours * 3600:
+            return
+
+        self.last_retention_run = now
+        self.retention_task = asyncio.create_task(self._run_retention())
+
+    async def _run_retention(self) -> None:
+        try:
+            await self.retention.run()
+        except Exception as e:
+            self.logger.error(f"Retention run failed: {e}")
+
+    def dispatch_alerts(self, all_metrics: Dict[str, List]) -> None:
+        """Evaluate alert rules on a cycle's extracted metrics and notify sinks in the background.
+
+        Runs only once the cycle is stored, so alert state never advances
+        past data that was not persisted; a slow webhook never delays
+        collection.
+        """
+        alerts = self.alert_engine.evaluate(self.sample_rows(all_metrics))
+        if not alerts:
+            return
+        task = asyncio.create_task(self.alert_engine.dispatch(alerts))
+        self.alert_tasks.add(task)
+        task.add_done_callback(self.alert_tasks.discard)
+
+    async def close(self) -> None:
+        """Release resources held across collection cycles."""
+        # Deliver alerts already raised before shutting down
+        await asyncio.gather(*self.alert_tasks, return_exceptions=True)
+        if self.retention_task is not None:
+            self.retention_task.cancel()
+            await asyncio.gather(self.retention_task, return_exceptions=True)
+            self.retention_task = None
+        clients = list(self.http_clients.values())
+        self.http_clients.clear()
+        for client in clients:
+            await client.aclose()
+        await self._discard_db()
+
+    @staticmethod
+    def interleave_by_host(nodes: List[NodeConfig]) -> List[NodeConfig]:
+        """Order nodes round-robin across hosts.
+
+        Tasks queue on the global concurrency limit in this order, so free
+        slots are handed to different machines in turn instead of being
+        taken by every dashboard on the first host.
+        """
+        by_host: Dict[str, List[NodeConfig]] = {}
+        for node in nodes:
+            by_host.setdefault(node.host, []).append(node)
+
+        ordered = []
+        queues = list(by_host.values())
+        while queues:
+            ordered.extend(queue.pop(0) for queue in queues)
+            queues = [queue for queue in queues if queue]
+        return ordered
+
+    async def collect_node_data(self, node: NodeConfig) -> Dict[str, Any]:
         """Collect data from a single Storj node."""
-        async with create_http_client() as client:
-            sno_url = f"{dashboard_url}/api/sno"
-            satellites_url = f"{dashboard_url}/api/sno/satellites"
-            
-            # Fetch both endpoints
-            sno_data = await client.fetch_json(sno_url)
-            satellites_data = await client.fetch_json(satellites_url)
-            
-            return {
-                'node_info': StorjNodeInfo(**sno_data),
-                'satellite_info': StorjSatelliteInfo(**satellites_data)
-            }
+        client = self.get_http_client(node.host)
+        sno_url = node.sno_endpoint
+        satellites_url = node.satellites_endpoint
+        
+        # Fetch both endpoints concurrently; if either fails the other
+        # is cancelled and the node fails as a whole.
+        fetches = [
+            asyncio.ensure_future(client.fetch_json(sno_url)),
+            asyncio.ensure_future(client.fetch_json(satellites_url))
+        ]
+        try:
+            sno_data, satellites_data = await asyncio.gather(*fetches)
+        except BaseException:
+            for fetch in fetches:
+                fetch.cancel()
+            await asyncio.gather(*fetches, return_exceptions=True)
+            raise
+
+        return {
+            'node_info': StorjNodeInfo(**sno_data),
+            'satellite_info': StorjSatelliteInfo(**satellites_data)
+        }
 
     def extract_disk_metrics(self, node_name: str, node_info: StorjNodeInfo) -> DiskMetrics:
         """Extract disk metrics from node info."""
@@ -182,128 +509,269 @@ class StorjCollector:
         
         return metrics
 
-    async def store_metrics(self, all_metrics: Dict[str, List]) -> None:
-        """Store all collected metrics in the database."""
-        db_path = Path(self.settings.database.path)
-        
-        async with aiosqlite.connect(db_path) as db:
+    def _satellite_status_batches(self, satellite_statuses: List[Dict[str, Any]]) -> List[Tuple[str, str, List]]:
+        """Build the node_satellites batches for the configured history mode."""
+        # Sample times are stored as Unix seconds
+        satellite_statuses = [
+            {**status, 'timestamp': datetime_to_epoch(status['timestamp'])} for status in satellite_statuses
+        ]
+        latest_batch = ('node_satellite_latest', SATELLITE_LATEST_UPSERT, satellite_statuses)
+
+        if not self.settings.database.satellite_change_only:
+            return [('node_satellites', SATELLITE_STATUS_INSERT, satellite_statuses), latest_batch]
+
+        # Write a new version only where a tracked field changed, then
+        # refresh last_seen and the running counters on every latest version.
+        return [
+            ('node_satellites', SATELLITE_VERSION_INSERT, satellite_statuses),
+            ('node_satellites_seen', SATELLITE_VERSION_REFRESH, satellite_statuses),
+            latest_batch,
+        ]
+
+    @staticmethod
+    def satellite_reference_rows(all_metrics: Dict[str, List]) -> List[Tuple[str, str, Optional[str]]]:
+        """Build (satellite_id, name, region) rows for every satellite the metrics mention."""
+        satellite_ids = {status['satellite_id'] for status in all_metrics.get('satellite_status', [])}
+        satellite_ids.update(daily['satellite_id'] for daily in all_metrics.get('daily_satellite', []))
+        return [
+            (satellite_id,
+             KNOWN_SATELLITES.get(satellite_id, {}).get('name', satellite_id),
+             KNOWN_SATELLITES.get(satellite_id, {}).get('region'))
+            for satellite_id in sorted(satellite_ids)
+        ]
+
+    @staticmethod
+    def cycle_row(cycle: Dict[str, Any]) -> Tuple[int, int, int, Optional[str]]:
+        """Build the collection_cycles row for a cycle's start time, node count and errors."""
+        errors = cycle.get('errors', {})
+        return (
+            cycle.get('started_at', int(time.time())),
+            cycle.get('node_count', 0),
+            len(errors),
+            json.dumps(errors) if errors else None
+        )
+
+    @staticmethod
+    def sample_rows(all_metrics: Dict[str, List]) -> List[Dict[str, Any]]:
+        """Merge each node's disk, bandwidth and health metrics into one metrics_samples row."""
+        samples: Dict[str, Dict[str, Any]] = {}
+
+        def sample(node_name: str) -> Dict[str, Any]:
+            return samples.setdefault(node_name, {'node_name': node_name, **dict.fromkeys(SAMPLE_COLUMNS)})
+
+        for disk_metric in all_metrics.get('disk', []):
+            sample(disk_metric.node_name).update(
+                disk_used=disk_metric.used_bytes, disk_available=disk_metric.available_bytes,
+                disk_trash=disk_metric.trash_bytes, disk_overused=disk_metric.overused_bytes
+            )
+        for bw_metric in all_metrics.get('bandwidth', []):
+            sample(bw_metric.node_name).update(
+                bandwidth_used=bw_metric.used_bytes, bandwidth_available=bw_metric.available_bytes
+            )
+        for health_metric in all_metrics.get('health', []):
+            sample(health_metric.node_name).update(
+                version=health_metric.version, uptime_seconds=health_metric.uptime_seconds,
+                last_pinged=health_metric.last_pinged, quic_status=health_metric.quic_status,
+                audit_score=health_metric.audit_score, suspension_score=health_metric.suspension_score,
+                online_score=health_metric.online_score, satellites_count=health_metric.satellites_count
+            )
+        return list(samples.values())
+
+    @staticmethod
+    def rollup_samples(all_metrics: Dict[str, List]) -> List[Tuple[str, str, Any]]:
+        """Flatten disk, bandwidth and health metrics into (node_name, metric, value) samples."""
+        return [
+            (metric.node_name, name, getattr(metric, attribute))
+            for name, source, attribute in ROLLUP_METRICS
+            for metric in all_metrics.get(source, [])
+            if getattr(metric, attribute) is not None
+        ]
+
+    def build_metric_batches(self, all_metrics: Dict[str, List]) -> List[Tuple[str, str, List]]:
+        """Group collected metrics into (name, statement, rows) batches, one per table write."""
+        samples = self.sample_rows(all_metrics)
+        rollup_rows = self.rollup_samples(all_metrics)
+        return [
+            # Reference rows every history row resolves its node and satellite against
+            ('nodes_registered', """
+                INSERT OR IGNORE INTO nodes (name, dashboard_url, description)
+                VALUES (?, ?, ?)
+                """,
+             [(node.name, node.dashboard_url, node.description) for node in self.settings.nodes]),
+            ('satellites_registered', """
+                INSERT OR IGNORE INTO satellites (satellite_id, name, region)
+                VALUES (?, ?, ?)
+                """,
+             self.satellite_reference_rows(all_metrics)),
+
             # Update node information
-            for node in self.settings.nodes:
-                await db.execute(
-                    """
-                    UPDATE nodes 
-                    SET node_id = ?, updated_at = CURRENT_TIMESTAMP 
-                    WHERE name = ? AND node_id IS NULL
-                    """,
-                    (all_metrics.get(f'{node.name}_node_id'), node.name)
-                )
-            
-            # Insert disk metrics
-            for disk_metric in all_metrics.get('disk', []):
-                await db.execute(
-                    """
-                    INSERT INTO metrics_disk 
-                    (node_name, used_bytes, available_bytes, trash_bytes, overused_bytes)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (disk_metric.node_name, disk_metric.used_bytes, disk_metric.available_bytes,
-                     disk_metric.trash_bytes, disk_metric.overused_bytes)
-                )
-            
-            # Insert bandwidth metrics
-            for bw_metric in all_metrics.get('bandwidth', []):
-                await db.execute(
-                    """
-                    INSERT INTO metrics_bandwidth 
-                    (node_name, used_bytes, available_bytes)
-                    VALUES (?, ?, ?)
-                    """,
-                    (bw_metric.node_name, bw_metric.used_bytes, bw_metric.available_bytes)
-                )
-            
-            # Insert health metrics
-            for health_metric in all_metrics.get('health', []):
-                await db.execute(
-                    """
-                    INSERT INTO metrics_health 
-                    (node_name, version, uptime_seconds, last_pinged, quic_status,
-                     audit_score, suspension_score, online_score, satellites_count)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (health_metric.node_name, health_metric.version, health_metric.uptime_seconds,
-                     health_metric.last_pinged, health_metric.quic_status, health_metric.audit_score,
-                     health_metric.suspension_score, health_metric.online_score, health_metric.satellites_count)
-                )
-            
-            # Insert daily bandwidth metrics (with conflict resolution)
-            for daily_bw in all_metrics.get('daily_bandwidth', []):
-                await db.execute(
-                    """
-                    INSERT OR REPLACE INTO metrics_daily_bandwidth 
-                    (node_name, date, ingress_usage_bytes, ingress_repair_bytes,
-                     egress_usage_bytes, egress_repair_bytes, egress_audit_bytes, delete_bytes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (daily_bw.node_name, daily_bw.date, daily_bw.ingress_usage_bytes,
-                     daily_bw.ingress_repair_bytes, daily_bw.egress_usage_bytes,
-                     daily_bw.egress_repair_bytes, daily_bw.egress_audit_bytes, daily_bw.delete_bytes)
-                )
-            
-            # Insert daily storage metrics (with conflict resolution)
-            for daily_storage in all_metrics.get('daily_storage', []):
-                await db.execute(
-                    """
-                    INSERT OR REPLACE INTO metrics_daily_storage 
-                    (node_name, date, at_rest_total_bytes, average_usage_bytes)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (daily_storage.node_name, daily_storage.date, 
-                     daily_storage.at_rest_total_bytes, daily_storage.average_usage_bytes)
-                )
-            
-            # Insert satellite status data
-            for satellite_status in all_metrics.get('satellite_status', []):
-                await db.execute(
-                    """
-                    INSERT OR REPLACE INTO node_satellites 
-                    (node_name, satellite_id, timestamp, is_vetted, vetting_progress, vetted_at,
-                     audit_score, suspension_score, online_score, joined_at, 
-                     current_month_egress, current_month_ingress)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (satellite_status['node_name'], satellite_status['satellite_id'], 
-                     satellite_status['timestamp'], satellite_status['is_vetted'], 
-                     satellite_status['vetting_progress'], satellite_status['vetted_at'],
-                     satellite_status['audit_score'], satellite_status['suspension_score'], 
-                     satellite_status['online_score'], satellite_status['joined_at'],
-                     satellite_status['current_month_egress'], satellite_status['current_month_ingress'])
-                )
-            
-            # Insert daily satellite metrics (with conflict resolution)
-            for daily_satellite in all_metrics.get('daily_satellite', []):
-                await db.execute(
-                    """
-                    INSERT OR REPLACE INTO metrics_daily_satellite
-                    (node_name, satellite_id, date, storage_used_bytes, storage_at_rest_bytes,
-                     ingress_usage_bytes, ingress_repair_bytes, egress_usage_bytes, 
-                     egress_repair_bytes, egress_audit_bytes, vetting_bandwidth_requirement,
-                     vetting_bandwidth_completed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (daily_satellite['node_name'], daily_satellite['satellite_id'], 
-                     daily_satellite['date'], daily_satellite['storage_used_bytes'],
-                     daily_satellite['storage_at_rest_bytes'], daily_satellite['ingress_usage_bytes'],
-                     daily_satellite['ingress_repair_bytes'], daily_satellite['egress_usage_bytes'],
-                     daily_satellite['egress_repair_bytes'], daily_satellite['egress_audit_bytes'],
-                     daily_satellite['vetting_bandwidth_requirement'], daily_satellite['vetting_bandwidth_completed'])
+            ('nodes', """
+                UPDATE nodes 
+                SET node_id = ?, updated_at = CURRENT_TIMESTAMP 
+                WHERE name = ? AND node_id IS NULL
+                """,
+             [(all_metrics.get(f'{node.name}_node_id'), node.name) for node in self.settings.nodes]),
+
+            # Cycle header, then one wide sample row per node
+            ('collection_cycles', CYCLE_INSERT, [self.cycle_row(all_metrics.get('cycle', {}))]),
+            ('metrics_samples', SAMPLE_INSERT, samples),
+
+            # Latest node state
+            ('node_latest', NODE_LATEST_UPSERT, samples),
+
+            # State transitions detected against the previous cycle
+            ('events', EVENT_INSERT, all_metrics.get('events', [])),
+
+            # Hourly and daily rollups
+            *((table, rollup_upsert(table, bucket_seconds), rollup_rows)
+              for table, bucket_seconds in ROLLUP_TIERS),
+
+            # Daily bandwidth metrics (only days whose values changed are written)
+            ('metrics_daily_bandwidth', conditional_upsert(
+                'metrics_daily_bandwidth', ['node_name', 'date'],
+                ['ingress_usage_bytes', 'ingress_repair_bytes', 'egress_usage_bytes',
+                 'egress_repair_bytes', 'egress_audit_bytes', 'delete_bytes']
+             ),
+             [(daily_bw.node_name, daily_bw.date, daily_bw.ingress_usage_bytes,
+               daily_bw.ingress_repair_bytes, daily_bw.egress_usage_bytes,
+               daily_bw.egress_repair_bytes, daily_bw.egress_audit_bytes, daily_bw.delete_bytes)
+              for daily_bw in all_metrics.get('daily_bandwidth', [])]),
+
+            # Daily storage metrics (only days whose values changed are written)
+            ('metrics_daily_storage', conditional_upsert(
+                'metrics_daily_storage', ['node_name', 'date'],
+                ['at_rest_total_bytes', 'average_usage_bytes']
+             ),
+             [(daily_storage.node_name, daily_storage.date,
+               daily_storage.at_rest_total_bytes, daily_storage.average_usage_bytes)
+              for daily_storage in all_metrics.get('daily_storage', [])]),
+
+            # Satellite status data
+            *self._satellite_status_batches(all_metrics.get('satellite_status', [])),
+
+            # Daily satellite metrics (only days whose values changed are written)
+            ('metrics_daily_satellite', conditional_upsert(
+                'metrics_daily_satellite', ['node_ref', 'satellite_ref', 'date'],
+                ['storage_used_bytes', 'storage_at_rest_bytes', 'ingress_usage_bytes',
+                 'ingress_repair_bytes', 'egress_usage_bytes', 'egress_repair_bytes',
+                 'egress_audit_bytes', 'vetting_bandwidth_requirement', 'vetting_bandwidth_completed'],
+                placeholders={'node_ref': NODE_REF, 'satellite_ref': SATELLITE_REF}
+             ),
+             [(daily_satellite['node_name'], daily_satellite['satellite_id'],
+               daily_satellite['date'], daily_satellite['storage_used_bytes'],
+               daily_satellite['storage_at_rest_bytes'], daily_satellite['ingress_usage_bytes'],
+               daily_satellite['ingress_repair_bytes'], daily_satellite['egress_usage_bytes'],
+               daily_satellite['egress_repair_bytes'], daily_satellite['egress_audit_bytes'],
+               daily_satellite['vetting_bandwidth_requirement'], daily_satellite['vetting_bandwidth_completed'])
+              for daily_satellite in all_metrics.get('daily_satellite', [])]),
+        ]
+
+    async def store_metrics(self, all_metrics: Dict[str, List]) -> Dict[str, int]:
+        """Store all collected metrics in the database.
+
+        Rows are grouped per table and written with one executemany call
+        each, all inside a single transaction on the long-lived writer
+        connection. A broken connection is reopened and the cycle retried once.
+        State transitions against the previous cycle are written as events.
+
+        Returns the number of rows actually inserted or updated per table.
+        """
+        samples = self.sample_rows(all_metrics)
+        errors = all_metrics.get('cycle', {}).get('errors', {})
+
+        for attempt in range(2):
+            db = await self.get_db()
+            try:
+                await self.event_detector.load_states(
+                    db, [sample['node_name'] for sample in samples] + list(errors)
                 )
-            
-            await db.commit()
+                events = self.event_detector.detect(samples, errors)
+                batches = self.build_metric_batches({**all_metrics, 'events': events})
+
+                rows_touched = {}
+                for table, statement, rows in batches:
+                    if rows:
+                        # rowcount leaves out rows written by triggers
+                        cursor = await db.executemany(statement, rows)
+                        rows_touched[table] = cursor.rowcount
+                
+                await db.commit()
+                self.event_detector.advance(samples, errors)
+                return rows_touched
+            except CONNECTION_ERRORS as e:
+                # The same errors come from a faulty statement on a live
+                # connection; those are not retried
+                if await is_connection_alive(db):
+                    await db.rollback()
+                    raise
+                await self._discard_db()
+                if attempt:
+                    raise
+                self.logger.warning(f"Database connection lost ({e}), reconnecting...")
+            except Exception:
+                await db.rollback()
+                raise
+
+    async def collect_node_metrics(self, node: NodeConfig, semaphore: asyncio.Semaphore,
+                                   host_semaphore: asyncio.Semaphore,
+                                   errors: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """Collect and extract all metrics for a single node.
+
+        Returns None if the node could not be collected, so one failing
+        node never affects the rest of the cycle. The failure is recorded
+        in errors, keyed by node name, when a dict is given.
+        """
+        try:
+            # Take the host slot first so a node waiting on a busy host
+            # never holds one of the global slots.
+            async with host_semaphore, semaphore:
+                self.logger.info(f"Collecting data from node: {node.name}")
+                data = await self.collect_node_data(node)
+
+            node_info = data['node_info']
+            satellite_info = data['satellite_info']
+
+            # Extract satellite-specific data
+            satellite_statuses = self.satellite_extractor.extract_satellite_status(
+                node.name, node_info, satellite_info
+            )
+            daily_satellite_metrics = self.satellite_extractor.extract_daily_satellite_metrics(
+                node.name, satellite_info
+            )
+
+            node_metrics = {
+                'node_id': node_info.node_id,
+                'disk': self.extract_disk_metrics(node.name, node_info),
+                'bandwidth': self.extract_bandwidth_metrics(node.name, node_info),
+                'health': self.extract_health_metrics(node.name, node_info, satellite_info),
+                'daily_bandwidth': self.extract_daily_bandwidth_metrics(node.name, satellite_info),
+                'daily_storage': self.extract_daily_storage_metrics(node.name, satellite_info),
+                'satellite_status': satellite_statuses,
+                'daily_satellite': daily_satellite_metrics
+            }
+
+            self.logger.info(
+                f"Successfully collected data from {node.name} "
+                f"(satellites: {len(satellite_statuses)}, daily metrics: {len(daily_satellite_metrics)})"
+            )
+            return node_metrics
+
+        except Exception as e:
+            self.logger.error(f"Failed to collect data from {node.name}: {e}")
+            if errors is not None:
+                errors[node.name] = str(e)
+            return None
 
     async def collect_all_metrics(self) -> None:
         """Collect metrics from all configured nodes."""
         with PerformanceTimer("Full collection cycle", self.logger):
+            errors: Dict[str, str] = {}
             all_metrics = {
+                'cycle': {
+                    'started_at': int(time.time()),
+                    'node_count': len(self.settings.nodes),
+                    'errors': errors
+                },
                 'disk': [],
                 'bandwidth': [],
                 'health': [],
@@ -312,89 +780,90 @@ class StorjCollector:
                 'satellite_status': [],
                 'daily_satellite': []
             }
-            
+
+            # Collect all nodes concurrently; cycle time is bounded by the
+            # slowest node instead of the sum of every node's latency.
+            # Nodes sharing a machine are additionally limited per host.
+            monitoring = self.settings.monitoring
+            semaphore = asyncio.Semaphore(monitoring.max_concurrency)
+            host_semaphores = {
+                node.host: asyncio.Semaphore(monitoring.max_per_host) for node in self.settings.nodes
+            }
+            ordered_nodes = self.interleave_by_host(self.settings.nodes)
+            results = await asyncio.gather(*(
+                self.collect_node_metrics(node, semaphore, host_semaphores[node.host], errors)
+                for node in ordered_nodes
+            ))
+            results_by_node = {node.name: result for node, result in zip(ordered_nodes, results)}
+
             for node in self.settings.nodes:
-                try:
-                    self.logger.info(f"Collecting data from node: {node.name}")
-                    
-                    data = await self.collect_node_data(node.name, node.dashboard_url)
-                    node_info = data['node_info']
-                    satellite_info = data['satellite_info']
-                    
-                    # Store node ID for database update
-                    all_metrics[f'{node.name}_node_id'] = node_info.node_id
-                    
-                    # Extract all metrics
-                    all_metrics['disk'].append(
-                        self.extract_disk_metrics(node.name, node_info)
-                    )
-                    all_metrics['bandwidth'].append(
-                        self.extract_bandwidth_metrics(node.name, node_info)
-                    )
-                    all_metrics['health'].append(
-                        self.extract_health_metrics(node.name, node_info, satellite_info)
-                    )
-                    all_metrics['daily_bandwidth'].extend(
-                        self.extract_daily_bandwidth_metrics(node.name, satellite_info)
-                    )
-                    all_metrics['daily_storage'].extend(
-                        self.extract_daily_storage_metrics(node.name, satellite_info)
-                    )
-                    
-                    # Extract satellite-specific data
-                    satellite_statuses = self.satellite_extractor.extract_satellite_status(
-                        node.name, node_info, satellite_info
-                    )
-                    all_metrics['satellite_status'].extend(satellite_statuses)
-                    
-                    daily_satellite_metrics = self.satellite_extractor.extract_daily_satellite_metrics(
-                        node.name, satellite_info
-                    )
-                    all_metrics['daily_satellite'].extend(daily_satellite_metrics)
-                    
-                    self.logger.info(
-                        f"Successfully collected data from {node.name} "
-                        f"(satellites: {len(satellite_statuses)}, daily metrics: {len(daily_satellite_metrics)})"
-                    )
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to collect data from {node.name}: {e}")
+                node_metrics = results_by_node[node.name]
+                if node_metrics is None:
                     continue
-            
+
+                # Store node ID for database update
+                all_metrics[f'{node.name}_node_id'] = node_metrics['node_id']
+
+                all_metrics['disk'].append(node_metrics['disk'])
+                all_metrics['bandwidth'].append(node_metrics['bandwidth'])
+                all_metrics['health'].append(node_metrics['health'])
+                all_metrics['daily_bandwidth'].extend(node_metrics['daily_bandwidth'])
+                all_metrics['daily_storage'].extend(node_metrics['daily_storage'])
+                all_metrics['satellite_status'].extend(node_metrics['satellite_status'])
+                all_metrics['daily_satellite'].extend(node_metrics['daily_satellite'])
+
             # Store all metrics
             try:
-                await self.store_metrics(all_metrics)
+                rows_touched = await self.store_metrics(all_metrics)
                 self.logger.info(f"Successfully stored metrics for {len(all_metrics['disk'])} nodes")
+
+                daily_received = sum(len(all_metrics[key]) for key in
+                                     ('daily_bandwidth', 'daily_storage', 'daily_satellite'))
+                daily_touched = sum(rows_touched.get(table, 0) for table in DAILY_TABLES)
+                self.logger.info(f"Daily metrics: {daily_touched} of {daily_received} rows changed")
+                self.logger.info(
+                    f"Satellite status: {rows_touched.get('node_satellites', 0)} new versions "
+                    f"for {len(all_metrics['satellite_status'])} samples"
+                )
+                if rows_touched.get('events'):
+                    self.logger.info(f"Recorded {rows_touched['events']} node events")
             except Exception as e:
                 self.logger.error(f"Failed to store metrics: {e}")
+            else:
+                self.dispatch_alerts(all_metrics)
 
     async def run(self) -> None:
         """Main collection loop."""
         self.is_running = True
         self.logger.info("Starting Storj Monitor collector...")
         
-        # Initial collection
-        await self.collect_all_metrics()
-        
-        # Main loop
-        while self.is_running:
-            try:
-                # Wait for the configured interval
-                poll_interval_seconds = self.settings.monitoring.poll_interval * 60
-                self.logger.info(f"Waiting {poll_interval_seconds} seconds until next collection...")
-                
-                for _ in range(poll_interval_seconds):
-                    if not self.is_running:
-                        break
-                    await asyncio.sleep(1)
-                
-                if self.is_running:
-                    await self.collect_all_metrics()
+        try:
+            # Initial collection
+            await self.collect_all_metrics()
+            self.schedule_retention()
+            
+            # Main loop
+            while self.is_running:
+                try:
+                    # Wait for the configured interval
+                    poll_interval_seconds = self.settings.monitoring.poll_interval * 60
+                    self.logger.info(f"Waiting {poll_interval_seconds} seconds until next collection...")
                     
-            except Exception as e:
-                self.logger.error(f"Unexpected error in collection loop: {e}")
-                if self.is_running:
-                    await asyncio.sleep(60)  # Wait 1 minute before retrying
+                    for _ in range(poll_interval_seconds):
+                        if not self.is_running:
+                            break
+                        await asyncio.sleep(1)
+                    
+                    if self.is_running:
+                        await self.collect_all_metrics()
+                        self.schedule_retention()
+                        
+                except Exception as e:
+                    self.logger.error(f"Unexpected error in collection loop: {e}")
+                    if self.is_running:
+                        await asyncio.sleep(60)  # Wait 1 minute before retrying
+        finally:
+            await self.close()
         
         self.logger.info("Collector stopped.")
 
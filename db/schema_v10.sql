@@ -0,0 +1,63 @@
+-- Storj Monitor Database Schema v10
+-- Covering and partial indexes for the web API's hot queries
+
+-- Rollup history reads select the aggregates of a (node, metric) range.
+-- Clustered on their primary key as WITHOUT ROWID tables, the index
+-- search that finds the range already holds every column it returns.
+CREATE TABLE metrics_rollup_hourly_new (
+    node_name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    min_value REAL,
+    max_value REAL,
+    sum_value REAL,
+    last_value REAL,
+    PRIMARY KEY (node_name, metric, bucket),
+    FOREIGN KEY (node_name) REFERENCES nodes(name)
+) WITHOUT ROWID;
+INSERT INTO metrics_rollup_hourly_new
+SELECT node_name, metric, bucket, samples, min_value, max_value, sum_value, last_value
+FROM metrics_rollup_hourly;
+DROP TABLE metrics_rollup_hourly;
+ALTER TABLE metrics_rollup_hourly_new RENAME TO metrics_rollup_hourly;
+
+CREATE TABLE metrics_rollup_daily_new (
+    node_name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    min_value REAL,
+    max_value REAL,
+    sum_value REAL,
+    last_value REAL,
+    PRIMARY KEY (node_name, metric, bucket),
+    FOREIGN KEY (node_name) REFERENCES nodes(name)
+) WITHOUT ROWID;
+INSERT INTO metrics_rollup_daily_new
+SELECT node_name, metric, bucket, samples, min_value, max_value, sum_value, last_value
+FROM metrics_rollup_daily;
+DROP TABLE metrics_rollup_daily;
+ALTER TABLE metrics_rollup_daily_new RENAME TO metrics_rollup_daily;
+
+-- The daily_summary view reads these columns by (node_name, date). They
+-- replace the plain (node_name, date) indexes, which the UNIQUE
+-- constraints already duplicated.
+DROP INDEX IF EXISTS idx_daily_bw_node_date;
+DROP INDEX IF EXISTS idx_daily_storage_node_date;
+CREATE INDEX IF NOT EXISTS idx_daily_bandwidth_summary ON metrics_daily_bandwidth(
+    node_name, date, ingress_usage_bytes, ingress_repair_bytes,
+    egress_usage_bytes, egress_repair_bytes, egress_audit_bytes
+);
+CREATE INDEX IF NOT EXISTS idx_daily_storage_summary ON metrics_daily_storage(
+    node_name, date, at_rest_total_bytes, average_usage_bytes
+);
+
+-- Recent events: only the few unhealthy samples, newest first. The WHERE
+-- clause must match the query's filter exactly for the planner to use it.
+CREATE INDEX IF NOT EXISTS idx_samples_unhealthy ON metrics_samples(timestamp)
+WHERE audit_score < 0.99 OR suspension_score < 0.99 OR online_score < 0.95;
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (10, 'Covering indexes for history reads and a partial index over unhealthy samples');
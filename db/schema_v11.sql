@@ -0,0 +1,28 @@
+-- Storj Monitor Database Schema v11
+-- Node state-transition events recorded at ingest
+
+-- The collector compares every cycle with the previous state of each node
+-- and writes one row per transition: a score crossing a threshold, the
+-- node becoming unreachable or reachable again, a version or QUIC status
+-- change, or an uptime reset. Events are read newest first by id, which
+-- doubles as the pagination cursor.
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node_ref INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    event_type TEXT NOT NULL,
+    severity TEXT NOT NULL, -- info, warning or critical
+    message TEXT NOT NULL,
+    previous_value TEXT,
+    current_value TEXT,
+    FOREIGN KEY (node_ref) REFERENCES nodes(id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_node ON events(node_ref, id);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
+
+-- Recent events no longer scan samples for low scores
+DROP INDEX IF EXISTS idx_samples_unhealthy;
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (11, 'Node state-transition events recorded at ingest');
@@ -0,0 +1,85 @@
+-- Storj Monitor Database Schema v12
+-- Row counters for the growing history tables
+
+-- The system summary reported COUNT(*) over metrics_samples, a full scan
+-- that grows with history. Row counts and time bounds are now kept per
+-- table and updated by triggers as rows are inserted and deleted, so
+-- reading them is a primary key lookup. Deleting the oldest (or newest)
+-- row looks the new bound up through the timestamp index.
+CREATE TABLE IF NOT EXISTS table_counters (
+    table_name TEXT PRIMARY KEY,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    oldest INTEGER,
+    newest INTEGER
+) WITHOUT ROWID;
+
+INSERT OR REPLACE INTO table_counters (table_name, row_count, oldest, newest)
+SELECT 'metrics_samples', COUNT(*), MIN(timestamp), MAX(timestamp) FROM metrics_samples;
+INSERT OR REPLACE INTO table_counters (table_name, row_count, oldest, newest)
+SELECT 'collection_cycles', COUNT(*), MIN(started_at), MAX(started_at) FROM collection_cycles;
+INSERT OR REPLACE INTO table_counters (table_name, row_count, oldest, newest)
+SELECT 'events', COUNT(*), MIN(timestamp), MAX(timestamp) FROM events;
+
+CREATE TRIGGER IF NOT EXISTS metrics_samples_count_insert AFTER INSERT ON metrics_samples
+BEGIN
+    UPDATE table_counters
+    SET row_count = row_count + 1,
+        oldest = MIN(COALESCE(oldest, NEW.timestamp), NEW.timestamp),
+        newest = MAX(COALESCE(newest, NEW.timestamp), NEW.timestamp)
+    WHERE table_name = 'metrics_samples';
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_samples_count_delete AFTER DELETE ON metrics_samples
+BEGIN
+    UPDATE table_counters
+    SET row_count = row_count - 1,
+        oldest = CASE WHEN OLD.timestamp > oldest THEN oldest
+                      ELSE (SELECT MIN(timestamp) FROM metrics_samples) END,
+        newest = CASE WHEN OLD.timestamp < newest THEN newest
+                      ELSE (SELECT MAX(timestamp) FROM metrics_samples) END
+    WHERE table_name = 'metrics_samples';
+END;
+
+CREATE TRIGGER IF NOT EXISTS collection_cycles_count_insert AFTER INSERT ON collection_cycles
+BEGIN
+    UPDATE table_counters
+    SET row_count = row_count + 1,
+        oldest = MIN(COALESCE(oldest, NEW.started_at), NEW.started_at),
+        newest = MAX(COALESCE(newest, NEW.started_at), NEW.started_at)
+    WHERE table_name = 'collection_cycles';
+END;
+
+CREATE TRIGGER IF NOT EXISTS collection_cycles_count_delete AFTER DELETE ON collection_cycles
+BEGIN
+    UPDATE table_counters
+    SET row_count = row_count - 1,
+        oldest = CASE WHEN OLD.started_at > oldest THEN oldest
+                      ELSE (SELECT MIN(started_at) FROM collection_cycles) END,
+        newest = CASE WHEN OLD.started_at < newest THEN newest
+                      ELSE (SELECT MAX(started_at) FROM collection_cycles) END
+    WHERE table_name = 'collection_cycles';
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_count_insert AFTER INSERT ON events
+BEGIN
+    UPDATE table_counters
+    SET row_count = row_count + 1,
+        oldest = MIN(COALESCE(oldest, NEW.timestamp), NEW.timestamp),
+        newest = MAX(COALESCE(newest, NEW.timestamp), NEW.timestamp)
+    WHERE table_name = 'events';
+END;
+
+CREATE TRIGGER IF NOT EXISTS events_count_delete AFTER DELETE ON events
+BEGIN
+    UPDATE table_counters
+    SET row_count = row_count - 1,
+        oldest = CASE WHEN OLD.timestamp > oldest THEN oldest
+                      ELSE (SELECT MIN(timestamp) FROM events) END,
+        newest = CASE WHEN OLD.timestamp < newest THEN newest
+                      ELSE (SELECT MAX(timestamp) FROM events) END
+    WHERE table_name = 'events';
+END;
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (12, 'Trigger-maintained row counters for the history tables');
@@ -0,0 +1,53 @@
+-- Storj Monitor Database Schema v13
+-- Integer node references in the rollup tables
+
+-- The rollups are kept longest of all history, yet still repeated the
+-- node name in every row and in their clustered primary key. Like the
+-- raw history since v7 they now reference nodes.id (node_ref).
+
+-- Every name in the rollups must resolve to a reference row first
+INSERT OR IGNORE INTO nodes (name, dashboard_url)
+SELECT node_name, '' FROM (
+    SELECT node_name FROM metrics_rollup_hourly
+    UNION SELECT node_name FROM metrics_rollup_daily
+);
+
+CREATE TABLE metrics_rollup_hourly_new (
+    node_ref INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    min_value REAL,
+    max_value REAL,
+    sum_value REAL,
+    last_value REAL,
+    PRIMARY KEY (node_ref, metric, bucket),
+    FOREIGN KEY (node_ref) REFERENCES nodes(id)
+) WITHOUT ROWID;
+INSERT INTO metrics_rollup_hourly_new
+SELECT n.id, r.metric, r.bucket, r.samples, r.min_value, r.max_value, r.sum_value, r.last_value
+FROM metrics_rollup_hourly r JOIN nodes n ON n.name = r.node_name;
+DROP TABLE metrics_rollup_hourly;
+ALTER TABLE metrics_rollup_hourly_new RENAME TO metrics_rollup_hourly;
+
+CREATE TABLE metrics_rollup_daily_new (
+    node_ref INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    min_value REAL,
+    max_value REAL,
+    sum_value REAL,
+    last_value REAL,
+    PRIMARY KEY (node_ref, metric, bucket),
+    FOREIGN KEY (node_ref) REFERENCES nodes(id)
+) WITHOUT ROWID;
+INSERT INTO metrics_rollup_daily_new
+SELECT n.id, r.metric, r.bucket, r.samples, r.min_value, r.max_value, r.sum_value, r.last_value
+FROM metrics_rollup_daily r JOIN nodes n ON n.name = r.node_name;
+DROP TABLE metrics_rollup_daily;
+ALTER TABLE metrics_rollup_daily_new RENAME TO metrics_rollup_daily;
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (13, 'Integer node references in the rollup tables');
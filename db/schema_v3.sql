@@ -0,0 +1,39 @@
+-- Storj Monitor Database Schema v3
+-- Change-only versioning for node_satellites
+
+-- A node_satellites row is now a version: it is written when one of the
+-- tracked fields changes and then refreshed in place on every later sample.
+-- last_seen records the most recent sample that confirmed the version.
+ALTER TABLE node_satellites ADD COLUMN last_seen TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_node_satellites_node_satellite ON node_satellites(node_name, satellite_id, id);
+
+-- last_updated is the time of the latest sample, not of the latest change
+DROP VIEW IF EXISTS latest_satellite_status;
+CREATE VIEW latest_satellite_status AS
+SELECT
+    ns.node_name,
+    s.name as satellite_name,
+    s.region as satellite_region,
+    ns.satellite_id,
+    ns.is_vetted,
+    ns.vetting_progress,
+    ns.vetted_at,
+    ns.audit_score,
+    ns.suspension_score,
+    ns.online_score,
+    ns.joined_at,
+    ns.current_month_egress,
+    ns.current_month_ingress,
+    COALESCE(ns.last_seen, ns.timestamp) as last_updated
+FROM node_satellites ns
+JOIN satellites s ON ns.satellite_id = s.satellite_id
+WHERE ns.id IN (
+    SELECT MAX(id)
+    FROM node_satellites
+    GROUP BY node_name, satellite_id
+);
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (3, 'Change-only versioning for node_satellites');
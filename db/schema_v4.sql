@@ -0,0 +1,145 @@
+-- Storj Monitor Database Schema v4
+-- Materialized latest-state tables
+
+-- One row per node holding the most recent disk, bandwidth and health sample.
+-- The collector upserts it in the same transaction as the history inserts,
+-- so reading the current state never scans the metrics tables.
+CREATE TABLE IF NOT EXISTS node_latest (
+    node_name TEXT PRIMARY KEY,
+    disk_used INTEGER,
+    disk_available INTEGER,
+    disk_trash INTEGER,
+    bandwidth_used INTEGER,
+    version TEXT,
+    audit_score REAL,
+    suspension_score REAL,
+    online_score REAL,
+    quic_status TEXT,
+    last_pinged TIMESTAMP,
+    satellites_count INTEGER,
+    last_updated TIMESTAMP,
+    FOREIGN KEY (node_name) REFERENCES nodes(name)
+);
+
+-- One row per (node, satellite) holding the most recent satellite sample
+CREATE TABLE IF NOT EXISTS node_satellite_latest (
+    node_name TEXT NOT NULL,
+    satellite_id TEXT NOT NULL,
+    is_vetted BOOLEAN DEFAULT FALSE,
+    vetting_progress REAL DEFAULT 0.0,
+    vetted_at TIMESTAMP NULL,
+    audit_score REAL DEFAULT 1.0,
+    suspension_score REAL DEFAULT 1.0,
+    online_score REAL DEFAULT 1.0,
+    joined_at TIMESTAMP,
+    current_month_egress INTEGER DEFAULT 0,
+    current_month_ingress INTEGER DEFAULT 0,
+    last_updated TIMESTAMP,
+    PRIMARY KEY (node_name, satellite_id),
+    FOREIGN KEY (node_name) REFERENCES nodes(name),
+    FOREIGN KEY (satellite_id) REFERENCES satellites(satellite_id)
+);
+
+-- Backfill from existing history using the previous views (one last full scan)
+INSERT OR REPLACE INTO node_latest
+(node_name, disk_used, disk_available, disk_trash, bandwidth_used, version,
+ audit_score, suspension_score, online_score, quic_status, last_pinged,
+ satellites_count, last_updated)
+SELECT name, disk_used, disk_available, disk_trash, bandwidth_used, version,
+       audit_score, suspension_score, online_score, quic_status, last_pinged,
+       satellites_count, last_updated
+FROM latest_node_status
+WHERE disk_used IS NOT NULL OR bandwidth_used IS NOT NULL OR version IS NOT NULL;
+
+INSERT OR REPLACE INTO node_satellite_latest
+(node_name, satellite_id, is_vetted, vetting_progress, vetted_at, audit_score,
+ suspension_score, online_score, joined_at, current_month_egress,
+ current_month_ingress, last_updated)
+SELECT node_name, satellite_id, is_vetted, vetting_progress, vetted_at, audit_score,
+       suspension_score, online_score, joined_at, current_month_egress,
+       current_month_ingress, last_updated
+FROM latest_satellite_status;
+
+-- Views now read the latest-state tables by primary key
+DROP VIEW IF EXISTS latest_node_status;
+CREATE VIEW latest_node_status AS
+SELECT
+    n.name,
+    n.node_id,
+    n.description,
+    l.disk_used,
+    l.disk_available,
+    l.disk_trash,
+    l.bandwidth_used,
+    l.version,
+    l.audit_score,
+    l.suspension_score,
+    l.online_score,
+    l.quic_status,
+    l.last_pinged,
+    l.satellites_count,
+    l.last_updated
+FROM nodes n
+LEFT JOIN node_latest l ON n.name = l.node_name;
+
+DROP VIEW IF EXISTS latest_satellite_status;
+CREATE VIEW latest_satellite_status AS
+SELECT
+    ns.node_name,
+    s.name as satellite_name,
+    s.region as satellite_region,
+    ns.satellite_id,
+    ns.is_vetted,
+    ns.vetting_progress,
+    ns.vetted_at,
+    ns.audit_score,
+    ns.suspension_score,
+    ns.online_score,
+    ns.joined_at,
+    ns.current_month_egress,
+    ns.current_month_ingress,
+    ns.last_updated
+FROM node_satellite_latest ns
+JOIN satellites s ON ns.satellite_id = s.satellite_id;
+
+DROP VIEW IF EXISTS node_overview_with_satellites;
+CREATE VIEW node_overview_with_satellites AS
+SELECT
+    n.name,
+    n.node_id,
+    n.description,
+    l.disk_used,
+    l.disk_available,
+    l.version,
+    l.audit_score as overall_audit_score,
+    l.suspension_score as overall_suspension_score,
+    l.online_score as overall_online_score,
+    l.satellites_count,
+
+    -- Satellite summary
+    COALESCE(sat.active_satellites, 0) as active_satellites,
+    sat.vetted_satellites,
+    sat.avg_vetting_progress,
+    sat.vetted_satellite_names,
+
+    l.last_updated
+FROM nodes n
+LEFT JOIN node_latest l ON n.name = l.node_name
+LEFT JOIN (
+    SELECT
+        node_name,
+        COUNT(satellite_id) as active_satellites,
+        SUM(CASE WHEN is_vetted = 1 THEN 1 ELSE 0 END) as vetted_satellites,
+        AVG(vetting_progress) as avg_vetting_progress,
+        GROUP_CONCAT(
+            CASE WHEN is_vetted = 1
+            THEN satellite_name
+            ELSE NULL END
+        ) as vetted_satellite_names
+    FROM latest_satellite_status
+    GROUP BY node_name
+) sat ON n.name = sat.node_name;
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (4, 'Materialized latest-state tables for nodes and satellites');
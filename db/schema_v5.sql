@@ -0,0 +1,74 @@
+-- Storj Monitor Database Schema v5
+-- Hourly and daily rollups of disk, bandwidth and health samples
+
+-- One row per (node, metric, bucket). bucket is the bucket start as Unix
+-- seconds. The collector folds every new sample into the current bucket of
+-- each tier, so history queries over long windows read one row per bucket
+-- instead of every raw sample.
+CREATE TABLE IF NOT EXISTS metrics_rollup_hourly (
+    node_name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    min_value REAL,
+    max_value REAL,
+    sum_value REAL,
+    last_value REAL,
+    PRIMARY KEY (node_name, metric, bucket),
+    FOREIGN KEY (node_name) REFERENCES nodes(name)
+);
+
+CREATE TABLE IF NOT EXISTS metrics_rollup_daily (
+    node_name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    min_value REAL,
+    max_value REAL,
+    sum_value REAL,
+    last_value REAL,
+    PRIMARY KEY (node_name, metric, bucket),
+    FOREIGN KEY (node_name) REFERENCES nodes(name)
+);
+
+-- Backfill both tiers from the existing raw history
+CREATE TEMP VIEW rollup_backfill_samples AS
+SELECT node_name, 'disk_used' AS metric, id, CAST(strftime('%s', timestamp) AS INTEGER) AS ts, used_bytes AS value FROM metrics_disk
+UNION ALL SELECT node_name, 'disk_available', id, CAST(strftime('%s', timestamp) AS INTEGER), available_bytes FROM metrics_disk
+UNION ALL SELECT node_name, 'disk_trash', id, CAST(strftime('%s', timestamp) AS INTEGER), trash_bytes FROM metrics_disk
+UNION ALL SELECT node_name, 'bandwidth_used', id, CAST(strftime('%s', timestamp) AS INTEGER), used_bytes FROM metrics_bandwidth
+UNION ALL SELECT node_name, 'audit_score', id, CAST(strftime('%s', timestamp) AS INTEGER), audit_score FROM metrics_health
+UNION ALL SELECT node_name, 'suspension_score', id, CAST(strftime('%s', timestamp) AS INTEGER), suspension_score FROM metrics_health
+UNION ALL SELECT node_name, 'online_score', id, CAST(strftime('%s', timestamp) AS INTEGER), online_score FROM metrics_health
+UNION ALL SELECT node_name, 'uptime_seconds', id, CAST(strftime('%s', timestamp) AS INTEGER), uptime_seconds FROM metrics_health
+UNION ALL SELECT node_name, 'satellites_count', id, CAST(strftime('%s', timestamp) AS INTEGER), satellites_count FROM metrics_health;
+
+INSERT OR REPLACE INTO metrics_rollup_hourly
+(node_name, metric, bucket, samples, min_value, max_value, sum_value, last_value)
+SELECT node_name, metric, bucket, COUNT(*), MIN(value), MAX(value), SUM(value),
+       MAX(CASE WHEN newest = 1 THEN value END)
+FROM (
+    SELECT node_name, metric, value, ts / 3600 * 3600 AS bucket,
+           ROW_NUMBER() OVER (PARTITION BY node_name, metric, ts / 3600 ORDER BY id DESC) AS newest
+    FROM rollup_backfill_samples
+    WHERE value IS NOT NULL AND ts IS NOT NULL
+)
+GROUP BY node_name, metric, bucket;
+
+INSERT OR REPLACE INTO metrics_rollup_daily
+(node_name, metric, bucket, samples, min_value, max_value, sum_value, last_value)
+SELECT node_name, metric, bucket, COUNT(*), MIN(value), MAX(value), SUM(value),
+       MAX(CASE WHEN newest = 1 THEN value END)
+FROM (
+    SELECT node_name, metric, value, ts / 86400 * 86400 AS bucket,
+           ROW_NUMBER() OVER (PARTITION BY node_name, metric, ts / 86400 ORDER BY id DESC) AS newest
+    FROM rollup_backfill_samples
+    WHERE value IS NOT NULL AND ts IS NOT NULL
+)
+GROUP BY node_name, metric, bucket;
+
+DROP VIEW rollup_backfill_samples;
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (5, 'Hourly and daily rollups of disk, bandwidth and health metrics');
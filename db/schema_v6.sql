@@ -0,0 +1,269 @@
+-- Storj Monitor Database Schema v6
+-- Sample timestamps stored as integer Unix seconds (UTC)
+
+-- Text timestamps ('2025-01-01 12:00:00') made every row and time index
+-- carry a 19+ byte key and range predicates compare strings whose format
+-- depended on the writer. Each table is rebuilt with INTEGER columns and
+-- its existing rows converted. Views expose the same text timestamps as
+-- before so API responses do not change.
+
+-- Views over the rebuilt tables are recreated at the end
+DROP VIEW IF EXISTS vetting_summary;
+DROP VIEW IF EXISTS node_overview_with_satellites;
+DROP VIEW IF EXISTS latest_satellite_status;
+DROP VIEW IF EXISTS latest_node_status;
+
+-- Disk space metrics
+CREATE TABLE metrics_disk_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node_name TEXT NOT NULL,
+    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    used_bytes INTEGER NOT NULL,
+    available_bytes INTEGER NOT NULL,
+    trash_bytes INTEGER DEFAULT 0,
+    overused_bytes INTEGER DEFAULT 0,
+    FOREIGN KEY (node_name) REFERENCES nodes(name)
+);
+INSERT INTO metrics_disk_new (id, node_name, timestamp, used_bytes, available_bytes, trash_bytes, overused_bytes)
+SELECT id, node_name, CAST(strftime('%s', timestamp) AS INTEGER), used_bytes, available_bytes, trash_bytes, overused_bytes
+FROM metrics_disk;
+DROP TABLE metrics_disk;
+ALTER TABLE metrics_disk_new RENAME TO metrics_disk;
+CREATE INDEX idx_disk_node_timestamp ON metrics_disk(node_name, timestamp);
+CREATE INDEX idx_disk_timestamp_node ON metrics_disk(timestamp, node_name);
+
+-- Bandwidth metrics
+CREATE TABLE metrics_bandwidth_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node_name TEXT NOT NULL,
+    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    used_bytes INTEGER NOT NULL,
+    available_bytes INTEGER DEFAULT 0,
+    FOREIGN KEY (node_name) REFERENCES nodes(name)
+);
+INSERT INTO metrics_bandwidth_new (id, node_name, timestamp, used_bytes, available_bytes)
+SELECT id, node_name, CAST(strftime('%s', timestamp) AS INTEGER), used_bytes, available_bytes
+FROM metrics_bandwidth;
+DROP TABLE metrics_bandwidth;
+ALTER TABLE metrics_bandwidth_new RENAME TO metrics_bandwidth;
+CREATE INDEX idx_bandwidth_node_timestamp ON metrics_bandwidth(node_name, timestamp);
+CREATE INDEX idx_bandwidth_timestamp_node ON metrics_bandwidth(timestamp, node_name);
+
+-- Node health and status metrics
+CREATE TABLE metrics_health_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node_name TEXT NOT NULL,
+    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    version TEXT,
+    uptime_seconds INTEGER,
+    last_pinged TIMESTAMP,
+    quic_status TEXT,
+    audit_score REAL,
+    suspension_score REAL,
+    online_score REAL,
+    satellites_count INTEGER DEFAULT 0,
+    FOREIGN KEY (node_name) REFERENCES nodes(name)
+);
+INSERT INTO metrics_health_new
+(id, node_name, timestamp, version, uptime_seconds, last_pinged, quic_status,
+ audit_score, suspension_score, online_score, satellites_count)
+SELECT id, node_name, CAST(strftime('%s', timestamp) AS INTEGER), version, uptime_seconds, last_pinged,
+       quic_status, audit_score, suspension_score, online_score, satellites_count
+FROM metrics_health;
+DROP TABLE metrics_health;
+ALTER TABLE metrics_health_new RENAME TO metrics_health;
+CREATE INDEX idx_health_node_timestamp ON metrics_health(node_name, timestamp);
+CREATE INDEX idx_health_timestamp_node ON metrics_health(timestamp, node_name);
+
+-- Per-satellite status versions
+CREATE TABLE node_satellites_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node_name TEXT NOT NULL,
+    satellite_id TEXT NOT NULL,
+    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+
+    -- Vetting status
+    is_vetted BOOLEAN DEFAULT FALSE,
+    vetting_progress REAL DEFAULT 0.0, -- 0.0 to 1.0
+    vetted_at TIMESTAMP NULL,
+
+    -- Satellite-specific scores
+    audit_score REAL DEFAULT 1.0,
+    suspension_score REAL DEFAULT 1.0,
+    online_score REAL DEFAULT 1.0,
+
+    -- Satellite-specific stats
+    joined_at TIMESTAMP,
+    current_month_egress INTEGER DEFAULT 0,
+    current_month_ingress INTEGER DEFAULT 0,
+    last_seen INTEGER,
+
+    FOREIGN KEY (node_name) REFERENCES nodes(name),
+    FOREIGN KEY (satellite_id) REFERENCES satellites(satellite_id),
+    UNIQUE(node_name, satellite_id, timestamp)
+);
+INSERT INTO node_satellites_new
+(id, node_name, satellite_id, timestamp, is_vetted, vetting_progress, vetted_at,
+ audit_score, suspension_score, online_score, joined_at,
+ current_month_egress, current_month_ingress, last_seen)
+SELECT id, node_name, satellite_id, CAST(strftime('%s', timestamp) AS INTEGER), is_vetted, vetting_progress,
+       vetted_at, audit_score, suspension_score, online_score, joined_at,
+       current_month_egress, current_month_ingress, CAST(strftime('%s', last_seen) AS INTEGER)
+FROM node_satellites
+-- Second-resolution timestamps can collide where the text form kept microseconds
+WHERE id IN (
+    SELECT MAX(id) FROM node_satellites
+    GROUP BY node_name, satellite_id, CAST(strftime('%s', timestamp) AS INTEGER)
+);
+DROP TABLE node_satellites;
+ALTER TABLE node_satellites_new RENAME TO node_satellites;
+CREATE INDEX idx_node_satellites_node_time ON node_satellites(node_name, timestamp);
+CREATE INDEX idx_node_satellites_satellite_time ON node_satellites(satellite_id, timestamp);
+CREATE INDEX idx_node_satellites_node_satellite ON node_satellites(node_name, satellite_id, id);
+
+-- Latest-state tables
+CREATE TABLE node_latest_new (
+    node_name TEXT PRIMARY KEY,
+    disk_used INTEGER,
+    disk_available INTEGER,
+    disk_trash INTEGER,
+    bandwidth_used INTEGER,
+    version TEXT,
+    audit_score REAL,
+    suspension_score REAL,
+    online_score REAL,
+    quic_status TEXT,
+    last_pinged TIMESTAMP,
+    satellites_count INTEGER,
+    last_updated INTEGER,
+    FOREIGN KEY (node_name) REFERENCES nodes(name)
+);
+INSERT INTO node_latest_new
+SELECT node_name, disk_used, disk_available, disk_trash, bandwidth_used, version,
+       audit_score, suspension_score, online_score, quic_status, last_pinged,
+       satellites_count, CAST(strftime('%s', last_updated) AS INTEGER)
+FROM node_latest;
+DROP TABLE node_latest;
+ALTER TABLE node_latest_new RENAME TO node_latest;
+
+CREATE TABLE node_satellite_latest_new (
+    node_name TEXT NOT NULL,
+    satellite_id TEXT NOT NULL,
+    is_vetted BOOLEAN DEFAULT FALSE,
+    vetting_progress REAL DEFAULT 0.0,
+    vetted_at TIMESTAMP NULL,
+    audit_score REAL DEFAULT 1.0,
+    suspension_score REAL DEFAULT 1.0,
+    online_score REAL DEFAULT 1.0,
+    joined_at TIMESTAMP,
+    current_month_egress INTEGER DEFAULT 0,
+    current_month_ingress INTEGER DEFAULT 0,
+    last_updated INTEGER,
+    PRIMARY KEY (node_name, satellite_id),
+    FOREIGN KEY (node_name) REFERENCES nodes(name),
+    FOREIGN KEY (satellite_id) REFERENCES satellites(satellite_id)
+);
+INSERT INTO node_satellite_latest_new
+SELECT node_name, satellite_id, is_vetted, vetting_progress, vetted_at, audit_score,
+       suspension_score, online_score, joined_at, current_month_egress,
+       current_month_ingress, CAST(strftime('%s', last_updated) AS INTEGER)
+FROM node_satellite_latest;
+DROP TABLE node_satellite_latest;
+ALTER TABLE node_satellite_latest_new RENAME TO node_satellite_latest;
+
+-- Views, unchanged apart from rendering the integer timestamps as text
+CREATE VIEW latest_node_status AS
+SELECT
+    n.name,
+    n.node_id,
+    n.description,
+    l.disk_used,
+    l.disk_available,
+    l.disk_trash,
+    l.bandwidth_used,
+    l.version,
+    l.audit_score,
+    l.suspension_score,
+    l.online_score,
+    l.quic_status,
+    l.last_pinged,
+    l.satellites_count,
+    datetime(l.last_updated, 'unixepoch') as last_updated
+FROM nodes n
+LEFT JOIN node_latest l ON n.name = l.node_name;
+
+CREATE VIEW latest_satellite_status AS
+SELECT
+    ns.node_name,
+    s.name as satellite_name,
+    s.region as satellite_region,
+    ns.satellite_id,
+    ns.is_vetted,
+    ns.vetting_progress,
+    ns.vetted_at,
+    ns.audit_score,
+    ns.suspension_score,
+    ns.online_score,
+    ns.joined_at,
+    ns.current_month_egress,
+    ns.current_month_ingress,
+    datetime(ns.last_updated, 'unixepoch') as last_updated
+FROM node_satellite_latest ns
+JOIN satellites s ON ns.satellite_id = s.satellite_id;
+
+CREATE VIEW node_overview_with_satellites AS
+SELECT
+    n.name,
+    n.node_id,
+    n.description,
+    l.disk_used,
+    l.disk_available,
+    l.version,
+    l.audit_score as overall_audit_score,
+    l.suspension_score as overall_suspension_score,
+    l.online_score as overall_online_score,
+    l.satellites_count,
+
+    -- Satellite summary
+    COALESCE(sat.active_satellites, 0) as active_satellites,
+    sat.vetted_satellites,
+    sat.avg_vetting_progress,
+    sat.vetted_satellite_names,
+
+    datetime(l.last_updated, 'unixepoch') as last_updated
+FROM nodes n
+LEFT JOIN node_latest l ON n.name = l.node_name
+LEFT JOIN (
+    SELECT
+        node_name,
+        COUNT(satellite_id) as active_satellites,
+        SUM(CASE WHEN is_vetted = 1 THEN 1 ELSE 0 END) as vetted_satellites,
+        AVG(vetting_progress) as avg_vetting_progress,
+        GROUP_CONCAT(
+            CASE WHEN is_vetted = 1
+            THEN satellite_name
+            ELSE NULL END
+        ) as vetted_satellite_names
+    FROM latest_satellite_status
+    GROUP BY node_name
+) sat ON n.name = sat.node_name;
+
+CREATE VIEW vetting_summary AS
+SELECT
+    node_name,
+    COUNT(*) as total_satellites,
+    SUM(CASE WHEN is_vetted = 1 THEN 1 ELSE 0 END) as vetted_count,
+    AVG(vetting_progress) as avg_progress,
+    MIN(CASE WHEN is_vetted = 0 THEN vetting_progress ELSE 1.0 END) as min_progress,
+    MAX(vetting_progress) as max_progress,
+    GROUP_CONCAT(
+        satellite_name || ':' ||
+        CASE WHEN is_vetted = 1 THEN 'VETTED'
+        ELSE ROUND(vetting_progress * 100, 1) || '%' END
+    ) as status_summary
+FROM latest_satellite_status
+GROUP BY node_name;
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (6, 'Integer epoch timestamps for metric samples');
@@ -0,0 +1,173 @@
+-- Storj Monitor Database Schema v7
+-- Integer node and satellite references in the metric history tables
+
+-- node_name and the ~50 character satellite_id were repeated in every
+-- history row and every composite index. The history tables now reference
+-- nodes.id (node_ref) and satellites.id (satellite_ref) instead; names are
+-- resolved by joining the two small reference tables.
+
+-- Every name in the history must resolve to a reference row first
+INSERT OR IGNORE INTO nodes (name, dashboard_url)
+SELECT node_name, '' FROM (
+    SELECT node_name FROM metrics_disk
+    UNION SELECT node_name FROM metrics_bandwidth
+    UNION SELECT node_name FROM metrics_health
+    UNION SELECT node_name FROM node_satellites
+    UNION SELECT node_name FROM metrics_daily_satellite
+);
+
+INSERT OR IGNORE INTO satellites (satellite_id, name)
+SELECT satellite_id, satellite_id FROM (
+    SELECT satellite_id FROM node_satellites
+    UNION SELECT satellite_id FROM metrics_daily_satellite
+);
+
+-- Disk space metrics
+CREATE TABLE metrics_disk_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node_ref INTEGER NOT NULL,
+    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    used_bytes INTEGER NOT NULL,
+    available_bytes INTEGER NOT NULL,
+    trash_bytes INTEGER DEFAULT 0,
+    overused_bytes INTEGER DEFAULT 0,
+    FOREIGN KEY (node_ref) REFERENCES nodes(id)
+);
+INSERT INTO metrics_disk_new (id, node_ref, timestamp, used_bytes, available_bytes, trash_bytes, overused_bytes)
+SELECT m.id, n.id, m.timestamp, m.used_bytes, m.available_bytes, m.trash_bytes, m.overused_bytes
+FROM metrics_disk m JOIN nodes n ON n.name = m.node_name;
+DROP TABLE metrics_disk;
+ALTER TABLE metrics_disk_new RENAME TO metrics_disk;
+CREATE INDEX idx_disk_node_timestamp ON metrics_disk(node_ref, timestamp);
+CREATE INDEX idx_disk_timestamp_node ON metrics_disk(timestamp, node_ref);
+
+-- Bandwidth metrics
+CREATE TABLE metrics_bandwidth_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node_ref INTEGER NOT NULL,
+    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    used_bytes INTEGER NOT NULL,
+    available_bytes INTEGER DEFAULT 0,
+    FOREIGN KEY (node_ref) REFERENCES nodes(id)
+);
+INSERT INTO metrics_bandwidth_new (id, node_ref, timestamp, used_bytes, available_bytes)
+SELECT m.id, n.id, m.timestamp, m.used_bytes, m.available_bytes
+FROM metrics_bandwidth m JOIN nodes n ON n.name = m.node_name;
+DROP TABLE metrics_bandwidth;
+ALTER TABLE metrics_bandwidth_new RENAME TO metrics_bandwidth;
+CREATE INDEX idx_bandwidth_node_timestamp ON metrics_bandwidth(node_ref, timestamp);
+CREATE INDEX idx_bandwidth_timestamp_node ON metrics_bandwidth(timestamp, node_ref);
+
+-- Node health and status metrics
+CREATE TABLE metrics_health_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node_ref INTEGER NOT NULL,
+    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    version TEXT,
+    uptime_seconds INTEGER,
+    last_pinged TIMESTAMP,
+    quic_status TEXT,
+    audit_score REAL,
+    suspension_score REAL,
+    online_score REAL,
+    satellites_count INTEGER DEFAULT 0,
+    FOREIGN KEY (node_ref) REFERENCES nodes(id)
+);
+INSERT INTO metrics_health_new
+(id, node_ref, timestamp, version, uptime_seconds, last_pinged, quic_status,
+ audit_score, suspension_score, online_score, satellites_count)
+SELECT m.id, n.id, m.timestamp, m.version, m.uptime_seconds, m.last_pinged, m.quic_status,
+       m.audit_score, m.suspension_score, m.online_score, m.satellites_count
+FROM metrics_health m JOIN nodes n ON n.name = m.node_name;
+DROP TABLE metrics_health;
+ALTER TABLE metrics_health_new RENAME TO metrics_health;
+CREATE INDEX idx_health_node_timestamp ON metrics_health(node_ref, timestamp);
+CREATE INDEX idx_health_timestamp_node ON metrics_health(timestamp, node_ref);
+
+-- Per-satellite status versions
+CREATE TABLE node_satellites_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node_ref INTEGER NOT NULL,
+    satellite_ref INTEGER NOT NULL,
+    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+
+    -- Vetting status
+    is_vetted BOOLEAN DEFAULT FALSE,
+    vetting_progress REAL DEFAULT 0.0, -- 0.0 to 1.0
+    vetted_at TIMESTAMP NULL,
+
+    -- Satellite-specific scores
+    audit_score REAL DEFAULT 1.0,
+    suspension_score REAL DEFAULT 1.0,
+    online_score REAL DEFAULT 1.0,
+
+    -- Satellite-specific stats
+    joined_at TIMESTAMP,
+    current_month_egress INTEGER DEFAULT 0,
+    current_month_ingress INTEGER DEFAULT 0,
+    last_seen INTEGER,
+
+    FOREIGN KEY (node_ref) REFERENCES nodes(id),
+    FOREIGN KEY (satellite_ref) REFERENCES satellites(id),
+    UNIQUE(node_ref, satellite_ref, timestamp)
+);
+INSERT INTO node_satellites_new
+(id, node_ref, satellite_ref, timestamp, is_vetted, vetting_progress, vetted_at,
+ audit_score, suspension_score, online_score, joined_at,
+ current_month_egress, current_month_ingress, last_seen)
+SELECT ns.id, n.id, s.id, ns.timestamp, ns.is_vetted, ns.vetting_progress, ns.vetted_at,
+       ns.audit_score, ns.suspension_score, ns.online_score, ns.joined_at,
+       ns.current_month_egress, ns.current_month_ingress, ns.last_seen
+FROM node_satellites ns
+JOIN nodes n ON n.name = ns.node_name
+JOIN satellites s ON s.satellite_id = ns.satellite_id;
+DROP TABLE node_satellites;
+ALTER TABLE node_satellites_new RENAME TO node_satellites;
+CREATE INDEX idx_node_satellites_node_time ON node_satellites(node_ref, timestamp);
+CREATE INDEX idx_node_satellites_satellite_time ON node_satellites(satellite_ref, timestamp);
+CREATE INDEX idx_node_satellites_node_satellite ON node_satellites(node_ref, satellite_ref, id);
+
+-- Daily metrics per satellite
+CREATE TABLE metrics_daily_satellite_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    node_ref INTEGER NOT NULL,
+    satellite_ref INTEGER NOT NULL,
+    date DATE NOT NULL,
+
+    -- Storage metrics per satellite
+    storage_used_bytes INTEGER DEFAULT 0,
+    storage_at_rest_bytes INTEGER DEFAULT 0,
+
+    -- Bandwidth metrics per satellite
+    ingress_usage_bytes INTEGER DEFAULT 0,
+    ingress_repair_bytes INTEGER DEFAULT 0,
+    egress_usage_bytes INTEGER DEFAULT 0,
+    egress_repair_bytes INTEGER DEFAULT 0,
+    egress_audit_bytes INTEGER DEFAULT 0,
+
+    -- Vetting progress tracking
+    vetting_bandwidth_requirement INTEGER DEFAULT 0,
+    vetting_bandwidth_completed INTEGER DEFAULT 0,
+
+    FOREIGN KEY (node_ref) REFERENCES nodes(id),
+    FOREIGN KEY (satellite_ref) REFERENCES satellites(id),
+    UNIQUE(node_ref, satellite_ref, date)
+);
+INSERT INTO metrics_daily_satellite_new
+(id, node_ref, satellite_ref, date, storage_used_bytes, storage_at_rest_bytes,
+ ingress_usage_bytes, ingress_repair_bytes, egress_usage_bytes, egress_repair_bytes,
+ egress_audit_bytes, vetting_bandwidth_requirement, vetting_bandwidth_completed)
+SELECT m.id, n.id, s.id, m.date, m.storage_used_bytes, m.storage_at_rest_bytes,
+       m.ingress_usage_bytes, m.ingress_repair_bytes, m.egress_usage_bytes, m.egress_repair_bytes,
+       m.egress_audit_bytes, m.vetting_bandwidth_requirement, m.vetting_bandwidth_completed
+FROM metrics_daily_satellite m
+JOIN nodes n ON n.name = m.node_name
+JOIN satellites s ON s.satellite_id = m.satellite_id;
+DROP TABLE metrics_daily_satellite;
+ALTER TABLE metrics_daily_satellite_new RENAME TO metrics_daily_satellite;
+CREATE INDEX idx_daily_satellite_node_date ON metrics_daily_satellite(node_ref, date);
+CREATE INDEX idx_daily_satellite_satellite_date ON metrics_daily_satellite(satellite_ref, date);
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (7, 'Integer node and satellite references in metric history tables');
@@ -0,0 +1,125 @@
+-- Storj Monitor Database Schema v8
+-- One wide sample row per node per collection cycle
+
+-- Disk, bandwidth and health values of one node in one cycle were written
+-- to three tables, each stamped separately, so lining them up took three
+-- correlated lookups. Every cycle now gets a collection_cycles header and
+-- each node one metrics_samples row keyed by (cycle_id, node_ref).
+CREATE TABLE IF NOT EXISTS collection_cycles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at INTEGER NOT NULL,
+    finished_at INTEGER,
+    node_count INTEGER DEFAULT 0,
+    error_count INTEGER DEFAULT 0,
+    errors TEXT -- JSON object of node name -> error message
+);
+CREATE INDEX IF NOT EXISTS idx_cycles_started ON collection_cycles(started_at);
+
+CREATE TABLE IF NOT EXISTS metrics_samples (
+    cycle_id INTEGER NOT NULL,
+    node_ref INTEGER NOT NULL,
+    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+
+    -- Disk
+    disk_used INTEGER,
+    disk_available INTEGER,
+    disk_trash INTEGER,
+    disk_overused INTEGER,
+
+    -- Bandwidth
+    bandwidth_used INTEGER,
+    bandwidth_available INTEGER,
+
+    -- Health
+    version TEXT,
+    uptime_seconds INTEGER,
+    last_pinged TIMESTAMP,
+    quic_status TEXT,
+    audit_score REAL,
+    suspension_score REAL,
+    online_score REAL,
+    satellites_count INTEGER,
+
+    PRIMARY KEY (cycle_id, node_ref),
+    FOREIGN KEY (cycle_id) REFERENCES collection_cycles(id),
+    FOREIGN KEY (node_ref) REFERENCES nodes(id)
+);
+CREATE INDEX IF NOT EXISTS idx_samples_node_timestamp ON metrics_samples(node_ref, timestamp);
+CREATE INDEX IF NOT EXISTS idx_samples_timestamp ON metrics_samples(timestamp);
+
+-- Backfill: the three rows a legacy cycle wrote for a node were stamped
+-- within a few seconds of each other, so rows of a node less than 5
+-- seconds apart are merged into one sample (the newest row wins if a
+-- table has several). Each distinct sample time becomes one backfilled
+-- cycle.
+CREATE TEMP TABLE legacy_samples AS
+SELECT node_ref, timestamp FROM metrics_disk;
+CREATE INDEX temp.idx_legacy_samples ON legacy_samples(node_ref, timestamp);
+
+INSERT INTO legacy_samples (node_ref, timestamp)
+SELECT h.node_ref, h.timestamp FROM metrics_health h
+WHERE NOT EXISTS (
+    SELECT 1 FROM legacy_samples s
+    WHERE s.node_ref = h.node_ref AND s.timestamp BETWEEN h.timestamp - 5 AND h.timestamp + 5
+);
+
+INSERT INTO legacy_samples (node_ref, timestamp)
+SELECT b.node_ref, b.timestamp FROM metrics_bandwidth b
+WHERE NOT EXISTS (
+    SELECT 1 FROM legacy_samples s
+    WHERE s.node_ref = b.node_ref AND s.timestamp BETWEEN b.timestamp - 5 AND b.timestamp + 5
+);
+
+INSERT INTO collection_cycles (started_at, finished_at, node_count)
+SELECT timestamp, timestamp, COUNT(DISTINCT node_ref)
+FROM legacy_samples
+GROUP BY timestamp
+ORDER BY timestamp;
+
+INSERT OR IGNORE INTO metrics_samples
+(cycle_id, node_ref, timestamp, disk_used, disk_available, disk_trash, disk_overused,
+ bandwidth_used, bandwidth_available, version, uptime_seconds, last_pinged, quic_status,
+ audit_score, suspension_score, online_score, satellites_count)
+SELECT c.id, s.node_ref, s.timestamp,
+       d.used_bytes, d.available_bytes, d.trash_bytes, d.overused_bytes,
+       b.used_bytes, b.available_bytes,
+       h.version, h.uptime_seconds, h.last_pinged, h.quic_status,
+       h.audit_score, h.suspension_score, h.online_score, h.satellites_count
+FROM (
+    SELECT l.node_ref, l.timestamp,
+           (SELECT MAX(id) FROM metrics_disk
+            WHERE node_ref = l.node_ref AND timestamp BETWEEN l.timestamp - 5 AND l.timestamp + 5) AS disk_id,
+           (SELECT MAX(id) FROM metrics_bandwidth
+            WHERE node_ref = l.node_ref AND timestamp BETWEEN l.timestamp - 5 AND l.timestamp + 5) AS bandwidth_id,
+           (SELECT MAX(id) FROM metrics_health
+            WHERE node_ref = l.node_ref AND timestamp BETWEEN l.timestamp - 5 AND l.timestamp + 5) AS health_id
+    FROM legacy_samples l
+) s
+JOIN collection_cycles c ON c.started_at = s.timestamp
+LEFT JOIN metrics_disk d ON d.id = s.disk_id
+LEFT JOIN metrics_bandwidth b ON b.id = s.bandwidth_id
+LEFT JOIN metrics_health h ON h.id = s.health_id;
+
+DROP TABLE legacy_samples;
+DROP TABLE metrics_disk;
+DROP TABLE metrics_bandwidth;
+DROP TABLE metrics_health;
+
+-- Read-only views under the old names for ad-hoc queries and scripts
+CREATE VIEW metrics_disk AS
+SELECT rowid AS id, node_ref, timestamp, disk_used AS used_bytes, disk_available AS available_bytes,
+       disk_trash AS trash_bytes, disk_overused AS overused_bytes
+FROM metrics_samples WHERE disk_used IS NOT NULL;
+
+CREATE VIEW metrics_bandwidth AS
+SELECT rowid AS id, node_ref, timestamp, bandwidth_used AS used_bytes, bandwidth_available AS available_bytes
+FROM metrics_samples WHERE bandwidth_used IS NOT NULL;
+
+CREATE VIEW metrics_health AS
+SELECT rowid AS id, node_ref, timestamp, version, uptime_seconds, last_pinged, quic_status,
+       audit_score, suspension_score, online_score, satellites_count
+FROM metrics_samples WHERE audit_score IS NOT NULL OR version IS NOT NULL;
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (8, 'Collection cycles and one wide sample row per node per cycle');
@@ -0,0 +1,74 @@
+-- Storj Monitor Database Schema v9
+-- metrics_samples clustered on (node_ref, timestamp) as a WITHOUT ROWID table
+
+-- With a rowid primary key every sample insert wrote the table plus the
+-- (cycle_id, node_ref), (node_ref, timestamp) and (timestamp) B-trees,
+-- and a history read walked the node index and looked each row up in the
+-- table. Keyed on (node_ref, timestamp, cycle_id) the rows of one node are
+-- stored in time order, so a history range is one sequential scan of the
+-- table itself. cycle_id completes the key because a node can be sampled
+-- twice in one second; the collector writes one row per node per cycle.
+-- Only the fleet-wide timestamp index remains.
+
+-- Views over the rebuilt table are recreated at the end
+DROP VIEW IF EXISTS metrics_disk;
+DROP VIEW IF EXISTS metrics_bandwidth;
+DROP VIEW IF EXISTS metrics_health;
+
+CREATE TABLE metrics_samples_new (
+    cycle_id INTEGER NOT NULL,
+    node_ref INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+
+    -- Disk
+    disk_used INTEGER,
+    disk_available INTEGER,
+    disk_trash INTEGER,
+    disk_overused INTEGER,
+
+    -- Bandwidth
+    bandwidth_used INTEGER,
+    bandwidth_available INTEGER,
+
+    -- Health
+    version TEXT,
+    uptime_seconds INTEGER,
+    last_pinged TIMESTAMP,
+    quic_status TEXT,
+    audit_score REAL,
+    suspension_score REAL,
+    online_score REAL,
+    satellites_count INTEGER,
+
+    PRIMARY KEY (node_ref, timestamp, cycle_id),
+    FOREIGN KEY (cycle_id) REFERENCES collection_cycles(id),
+    FOREIGN KEY (node_ref) REFERENCES nodes(id)
+) WITHOUT ROWID;
+INSERT INTO metrics_samples_new
+SELECT cycle_id, node_ref, timestamp, disk_used, disk_available, disk_trash, disk_overused,
+       bandwidth_used, bandwidth_available, version, uptime_seconds, last_pinged, quic_status,
+       audit_score, suspension_score, online_score, satellites_count
+FROM metrics_samples
+WHERE timestamp IS NOT NULL;
+DROP TABLE metrics_samples;
+ALTER TABLE metrics_samples_new RENAME TO metrics_samples;
+CREATE INDEX idx_samples_timestamp ON metrics_samples(timestamp);
+
+-- Read-only views under the old names, keyed by cycle instead of rowid
+CREATE VIEW metrics_disk AS
+SELECT cycle_id, node_ref, timestamp, disk_used AS used_bytes, disk_available AS available_bytes,
+       disk_trash AS trash_bytes, disk_overused AS overused_bytes
+FROM metrics_samples WHERE disk_used IS NOT NULL;
+
+CREATE VIEW metrics_bandwidth AS
+SELECT cycle_id, node_ref, timestamp, bandwidth_used AS used_bytes, bandwidth_available AS available_bytes
+FROM metrics_samples WHERE bandwidth_used IS NOT NULL;
+
+CREATE VIEW metrics_health AS
+SELECT cycle_id, node_ref, timestamp, version, uptime_seconds, last_pinged, quic_status,
+       audit_score, suspension_score, online_score, satellites_count
+FROM metrics_samples WHERE audit_score IS NOT NULL OR version IS NOT NULL;
+
+-- Update schema version
+INSERT OR REPLACE INTO schema_versions (version, description)
+VALUES (9, 'metrics_samples clustered on node and time as a WITHOUT ROWID table');
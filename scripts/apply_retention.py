@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""Apply the configured retention policy once and report what was freed."""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import storj_monitor
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storj_monitor.config import load_settings
+from storj_monitor.db import connect_database
+from collector.retention import RetentionEngine
+
+
+async def convert_to_incremental_vacuum(settings):
+    """Switch an existing database to auto_vacuum=INCREMENTAL.
+
+    The mode of an existing database only changes with a full VACUUM,
+    which rewrites the file and holds the write lock until it finishes,
+    so stop the collector first.
+    """
+    db = await connect_database(settings.database)
+    try:
+        await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        await db.execute("VACUUM")
+    finally:
+        await db.close()
+
+
+async def apply_retention(convert: bool):
+    settings = load_settings()
+
+    if convert:
+        print("🔧 Rewriting database with auto_vacuum=INCREMENTAL...")
+        await convert_to_incremental_vacuum(settings)
+
+    engine = RetentionEngine(settings)
+    print("🧹 Applying retention policy...")
+    for table, days in engine.retention_days().items():
+        print(f"   {table}: {'keep forever' if days is None else f'{days} days'}")
+
+    try:
+        report = await engine.run()
+    except Exception as e:
+        print(f"❌ Retention failed: {e}")
+        return 1
+
+    for table, count in report['rows_deleted'].items():
+        print(f"   {table}: {count} rows deleted")
+    print(f"✅ Freed {report['bytes_freed'] / (1024**2):.2f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--convert", action="store_true",
+                        help="Enable incremental vacuum on an existing database first (runs a full VACUUM)")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(apply_retention(args.convert)))
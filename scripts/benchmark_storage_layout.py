@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark the metrics_samples storage layouts: a rowid table with
+secondary indexes (schema v8) versus the WITHOUT ROWID table clustered on
+(node_ref, timestamp) (schema v9).
+
+Fills a temporary database per layout with synthetic samples written one
+cycle at a time, as the collector does, and reports insert throughput,
+file size and the cost of per-node history range reads.
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storj_monitor.config import DatabaseConfig
+from storj_monitor.db import pragma_statements
+
+
+SAMPLE_COLUMNS = """
+    cycle_id INTEGER NOT NULL,
+    node_ref INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    disk_used INTEGER,
+    disk_available INTEGER,
+    disk_trash INTEGER,
+    disk_overused INTEGER,
+    bandwidth_used INTEGER,
+    bandwidth_available INTEGER,
+    version TEXT,
+    uptime_seconds INTEGER,
+    last_pinged TIMESTAMP,
+    quic_status TEXT,
+    audit_score REAL,
+    suspension_score REAL,
+    online_score REAL,
+    satellites_count INTEGER,
+"""
+
+LAYOUTS = {
+    "rowid + indexes (v8)": [
+        f"CREATE TABLE metrics_samples ({SAMPLE_COLUMNS} PRIMARY KEY (cycle_id, node_ref))",
+        "CREATE INDEX idx_samples_node_timestamp ON metrics_samples(node_ref, timestamp)",
+        "CREATE INDEX idx_samples_timestamp ON metrics_samples(timestamp)",
+    ],
+    "clustered WITHOUT ROWID (v9)": [
+        f"CREATE TABLE metrics_samples ({SAMPLE_COLUMNS} PRIMARY KEY (node_ref, timestamp, cycle_id)) WITHOUT ROWID",
+        "CREATE INDEX idx_samples_timestamp ON metrics_samples(timestamp)",
+    ],
+}
+
+# Same shape as the web API's raw history query
+HISTORY_QUERY = """
+    SELECT timestamp, disk_used, disk_available, disk_trash
+    FROM metrics_samples
+    WHERE node_ref = ? AND timestamp >= ? AND timestamp < ? AND disk_used IS NOT NULL
+    ORDER BY timestamp
+"""
+
+START_TIME = 1700000000
+
+
+def sample_rows(cycle, nodes, interval):
+    """One collection cycle worth of synthetic sample rows."""
+    timestamp = START_TIME + cycle * interval
+    return [
+        (cycle, node, timestamp, node * 10**9 + cycle, 10**12, cycle % 1000, 0,
+         cycle * 1000, 10**12, "1.136.4", cycle * interval, timestamp, "OK",
+         0.999, 1.0, 0.98, 4)
+        for node in range(1, nodes + 1)
+    ]
+
+
+def fill(conn, cycles, nodes, interval, commit_every):
+    """Insert every cycle in time order, committing every commit_every cycles."""
+    statement = f"INSERT INTO metrics_samples VALUES ({', '.join('?' * 17)})"
+    for cycle in range(cycles):
+        conn.executemany(statement, sample_rows(cycle, nodes, interval))
+        if cycle % commit_every == commit_every - 1:
+            conn.commit()
+    conn.commit()
+
+
+def range_reads(conn, cycles, nodes, interval, window_hours, queries):
+    """Run random per-node history reads and return (ms per query, rows per query)."""
+    rng = random.Random(42)
+    span = cycles * interval
+    window = window_hours * 3600
+    total_rows = 0
+    started = time.perf_counter()
+    for _ in range(queries):
+        since = START_TIME + rng.randrange(max(1, span - window))
+        rows = conn.execute(HISTORY_QUERY, (rng.randint(1, nodes), since, since + window)).fetchall()
+        total_rows += len(rows)
+    elapsed = time.perf_counter() - started
+    return elapsed / queries * 1000, total_rows / queries
+
+
+def run_benchmark(rows, nodes, interval, queries, commit_every):
+    cycles = rows // nodes
+    print(f"Dataset: {cycles * nodes:,} rows = {nodes} nodes x {cycles:,} cycles "
+          f"({cycles * interval / 86400:.0f} days at {interval}s)")
+
+    for label, statements in LAYOUTS.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "layout.db"
+            conn = sqlite3.connect(db_path)
+            for pragma in pragma_statements(DatabaseConfig(path=str(db_path))):
+                conn.execute(pragma)
+            for statement in statements:
+                conn.execute(statement)
+
+            started = time.perf_counter()
+            fill(conn, cycles, nodes, interval, commit_every)
+            insert_seconds = time.perf_counter() - started
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            size_mb = db_path.stat().st_size / (1024**2)
+
+            # Cold cache for the reads: reopen the database
+            conn.close()
+            conn = sqlite3.connect(db_path)
+            day_ms, day_rows = range_reads(conn, cycles, nodes, interval, 24, queries)
+            month_ms, month_rows = range_reads(conn, cycles, nodes, interval, 24 * 30, max(1, queries // 10))
+            conn.close()
+
+        print(f"\n{label}")
+        print(f"  insert: {insert_seconds:8.1f} s, {cycles * nodes / insert_seconds:10.0f} rows/sec")
+        print(f"  size:   {size_mb:8.1f} MB")
+        print(f"  24h history: {day_ms:8.2f} ms/query ({day_rows:.0f} rows)")
+        print(f"  30d history: {month_ms:8.2f} ms/query ({month_rows:.0f} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Total sample rows per layout")
+    parser.add_argument("--nodes", type=int, default=20, help="Number of synthetic nodes")
+    parser.add_argument("--interval", type=int, default=300, help="Seconds between collection cycles")
+    parser.add_argument("--queries", type=int, default=200, help="24h history reads per layout")
+    parser.add_argument("--commit-every", type=int, default=100, help="Cycles per transaction while filling")
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.nodes, args.interval, args.queries, args.commit_every)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark collector metric writes: one execute() per row versus the
+batched executemany() path used by StorjCollector.store_metrics.
+
+Builds a synthetic fleet (nodes x days x satellites) in a temporary
+database and reports rows/sec for both strategies.
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storj_monitor.config import Settings
+from storj_monitor.db import connect_database, schema_files
+from storj_monitor.models import (
+    DiskMetrics, BandwidthMetrics, HealthMetrics, DailyBandwidthMetrics, DailyStorageMetrics
+)
+from storj_monitor.utils import utc_now
+from collector.satellite_extractor import KNOWN_SATELLITES
+from collector.service import StorjCollector
+
+
+
+def build_metrics(node_names, days, satellites):
+    """Build one collection cycle worth of synthetic metrics."""
+    now = utc_now()
+    today = date.today()
+    all_metrics = {key: [] for key in (
+        'disk', 'bandwidth', 'health', 'daily_bandwidth', 'daily_storage',
+        'satellite_status', 'daily_satellite'
+    )}
+
+    for i, name in enumerate(node_names):
+        all_metrics[f'{name}_node_id'] = f"node_id_{i}"
+        all_metrics['disk'].append(DiskMetrics(
+            node_name=name, timestamp=now, used_bytes=i * 1000, available_bytes=10 ** 12
+        ))
+        all_metrics['bandwidth'].append(BandwidthMetrics(
+            node_name=name, timestamp=now, used_bytes=i * 500
+        ))
+        all_metrics['health'].append(HealthMetrics(
+            node_name=name, timestamp=now, version="1.136.4", uptime_seconds=3600,
+            last_pinged=now, quic_status="OK", satellites_count=len(satellites)
+        ))
+        for day in range(days):
+            metric_date = today - timedelta(days=day)
+            all_metrics['daily_bandwidth'].append(DailyBandwidthMetrics(
+                node_name=name, date=metric_date, ingress_usage_bytes=day * 10
+            ))
+            all_metrics['daily_storage'].append(DailyStorageMetrics(
+                node_name=name, date=metric_date, at_rest_total_bytes=day * 20
+            ))
+            for satellite_id in satellites:
+                all_metrics['daily_satellite'].append({
+                    'node_name': name, 'satellite_id': satellite_id, 'date': metric_date,
+                    'storage_used_bytes': day, 'storage_at_rest_bytes': day,
+                    'ingress_usage_bytes': day, 'ingress_repair_bytes': 0,
+                    'egress_usage_bytes': day, 'egress_repair_bytes': 0, 'egress_audit_bytes': 0,
+                    'vetting_bandwidth_requirement': 1024 ** 4, 'vetting_bandwidth_completed': day
+                })
+        for satellite_id in satellites:
+            all_metrics['satellite_status'].append({
+                'node_name': name, 'satellite_id': satellite_id, 'timestamp': now,
+                'is_vetted': True, 'vetting_progress': 1.0, 'vetted_at': now,
+                'audit_score': 1.0, 'suspension_score': 1.0, 'online_score': 1.0,
+                'joined_at': now, 'current_month_egress': 0, 'current_month_ingress': 0
+            })
+
+    return all_metrics
+
+
+def create_database(db_path, node_names):
+    """Create a database with the full schema and the benchmark nodes."""
+    conn = sqlite3.connect(db_path)
+    for _, schema_file in schema_files():
+        conn.executescript(schema_file.read_text(encoding="utf-8"))
+    conn.executemany(
+        "INSERT INTO nodes (name, dashboard_url) VALUES (?, ?)",
+        [(name, f"http://127.0.0.1:{14002 + i}") for i, name in enumerate(node_names)]
+    )
+    conn.commit()
+    conn.close()
+
+
+async def store_row_by_row(collector, all_metrics):
+    """The previous write path: one round trip per row."""
+    db = await connect_database(collector.settings.database)
+    try:
+        for _, statement, rows in collector.build_metric_batches(all_metrics):
+            for row in rows:
+                await db.execute(statement, row)
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def run_benchmark(nodes, days, cycles):
+    node_names = [f"node{i}" for i in range(nodes)]
+    satellites = [sid for sid, info in KNOWN_SATELLITES.items() if not info['name'].endswith('_legacy')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(
+            nodes=[{"name": name, "dashboard_url": "http://127.0.0.1:14002"} for name in node_names],
+            database={"path": str(Path(tmp) / "bench.db")},
+            logging={"level": "WARNING", "file": str(Path(tmp) / "bench.log")}
+        )
+        collector = StorjCollector(settings)
+
+        all_metrics = build_metrics(node_names, days, satellites)
+        rows_per_cycle = sum(len(rows) for _, _, rows in collector.build_metric_batches(all_metrics))
+        print(f"Fleet: {nodes} nodes x {days} days x {len(satellites)} satellites "
+              f"= {rows_per_cycle} rows per cycle, {cycles} cycles")
+
+        for label, store in (("row-by-row execute", store_row_by_row),
+                             ("batched executemany", StorjCollector.store_metrics)):
+            await collector.close()
+            for suffix in ("", "-wal", "-shm"):
+                Path(settings.database.path + suffix).unlink(missing_ok=True)
+            create_database(settings.database.path, node_names)
+
+            started = time.perf_counter()
+            for _ in range(cycles):
+                await store(collector, all_metrics)
+            elapsed = time.perf_counter() - started
+
+            print(f"{label:>22}: {elapsed / cycles * 1000:8.1f} ms/cycle, "
+                  f"{rows_per_cycle * cycles / elapsed:10.0f} rows/sec")
+
+        await collector.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=100, help="Number of synthetic nodes")
+    parser.add_argument("--days", type=int, default=31, help="Daily rows per node per cycle")
+    parser.add_argument("--cycles", type=int, default=5, help="Collection cycles to store")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.nodes, args.days, args.cycles))
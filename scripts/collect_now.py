@@ -14,6 +14,7 @@ async def collect_now():
     """Run a single collection cycle immediately."""
     print("🚀 Starting immediate data collection...")
     
+    collector = None
     try:
         collector = StorjCollector()
         await collector.collect_all_metrics()
@@ -22,6 +23,9 @@ async def collect_now():
     except Exception as e:
         print(f"❌ Data collection failed: {e}")
         return 1
+    finally:
+        if collector:
+            await collector.close()
     
     return 0
 
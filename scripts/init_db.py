@@ -1,9 +1,7 @@
 import asyncio
-import aiosqlite
 from pathlib import Path
 from storj_monitor.config import load_settings, get_settings
-
-SCHEMA_PATH = Path("db/schema.sql")
+from storj_monitor.db import apply_migrations, connect_database
 
 
 async def init_db():
@@ -11,16 +9,12 @@ async def init_db():
     db_path = Path(settings.database.path)
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    async with aiosqlite.connect(db_path) as db:
-        # Enable WAL mode if configured
-        if settings.database.wal_mode:
-            await db.execute("PRAGMA journal_mode=WAL;")
-            await db.execute("PRAGMA synchronous=NORMAL;")
-
-        # Apply schema
-        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-            schema_sql = f.read()
-        await db.executescript(schema_sql)
+    # Applies WAL mode and the other configured pragmas
+    db = await connect_database(settings.database)
+    try:
+        # Apply schema.sql and every later schema revision
+        applied = await apply_migrations(db)
+        print(f"Applied schema versions: {applied or 'none (already up to date)'}")
 
         # Seed nodes table from config
         for node in settings.nodes:
@@ -32,6 +26,8 @@ async def init_db():
                 (node.name, node.dashboard_url, node.description),
             )
         await db.commit()
+    finally:
+        await db.close()
 
     print(f"Database initialized at {db_path.resolve()}")
 
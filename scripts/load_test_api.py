@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Load test GET /api/nodes with and without the read connection pool.
+
+Runs the FastAPI app in-process against a temporary database holding a
+synthetic fleet and reports request latency percentiles for a
+connection per query versus connections borrowed from the pool.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import yaml
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.benchmark_store_metrics import build_metrics, create_database
+from storj_monitor.config import load_settings
+from storj_monitor.db import ConnectionPool
+from collector.satellite_extractor import KNOWN_SATELLITES
+from collector.service import StorjCollector
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_load(app, requests, concurrency):
+    """Issue GET /api/nodes requests and return per-request latencies in ms."""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        async def one_request():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get("/api/nodes")
+                latencies.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+
+        await asyncio.gather(*(one_request() for _ in range(requests)))
+
+    return latencies
+
+
+async def run_load_test(nodes, requests, concurrency, pool_size):
+    node_names = [f"node{i}" for i in range(nodes)]
+    satellites = [sid for sid, info in KNOWN_SATELLITES.items() if not info['name'].endswith('_legacy')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The web server loads config/settings.yaml relative to the working directory
+        os.chdir(tmp)
+        Path("config").mkdir()
+        Path("config/settings.yaml").write_text(yaml.safe_dump({
+            "nodes": [{"name": name, "dashboard_url": "http://127.0.0.1:14002"} for name in node_names],
+            "database": {"path": str(Path(tmp) / "load.db"), "pool_size": pool_size},
+            "logging": {"level": "WARNING", "file": str(Path(tmp) / "load.log")}
+        }))
+        settings = load_settings()
+        create_database(settings.database.path, node_names)
+
+        collector = StorjCollector(settings)
+        await collector.store_metrics(build_metrics(node_names, 31, satellites))
+        await collector.close()
+
+        from webapp.server import app
+        from webapp.database import DatabaseManager
+
+        print(f"GET /api/nodes: {nodes} nodes, {requests} requests, concurrency {concurrency}")
+        for label, pool in (("connection per query", None),
+                            (f"pool of {pool_size}", ConnectionPool(settings.database))):
+            if pool is not None:
+                await pool.open()
+            DatabaseManager.pool = pool
+            try:
+                await run_load(app, concurrency, concurrency)  # warm up
+                started = time.perf_counter()
+                latencies = await run_load(app, requests, concurrency)
+                elapsed = time.perf_counter() - started
+            finally:
+                DatabaseManager.pool = None
+                if pool is not None:
+                    await pool.close()
+
+            print(f"{label:>22}: p50 {statistics.median(latencies):7.1f} ms, "
+                  f"p99 {percentile(latencies, 99):7.1f} ms, {requests / elapsed:7.0f} req/sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=20, help="Number of synthetic nodes")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+    parser.add_argument("--pool-size", type=int, default=5, help="Read connections in the pool")
+    args = parser.parse_args()
+
+    asyncio.run(run_load_test(args.nodes, args.requests, args.concurrency, args.pool_size))
@@ -10,6 +10,11 @@ from pathlib import Path
 from datetime import datetime, date, timedelta
 import random
 
+# Add parent directory to path to import storj_monitor
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storj_monitor.utils import datetime_to_epoch
+
 def populate_sample_data():
     """Populate sample satellite data."""
     
@@ -64,16 +69,30 @@ def populate_sample_data():
                 
                 cursor.execute("""
                     INSERT OR REPLACE INTO node_satellites 
-                    (node_name, satellite_id, timestamp, is_vetted, vetting_progress, vetted_at,
+                    (node_ref, satellite_ref, timestamp, is_vetted, vetting_progress, vetted_at,
                      audit_score, suspension_score, online_score, joined_at, 
                      current_month_egress, current_month_ingress)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    VALUES ((SELECT id FROM nodes WHERE name = ?), (SELECT id FROM satellites WHERE satellite_id = ?),
+                            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
-                    node_name, satellite_id, timestamp, is_vetted, vetting_progress, vetted_at,
+                    node_name, satellite_id, datetime_to_epoch(timestamp), is_vetted, vetting_progress, vetted_at,
                     audit_score, suspension_score, online_score, joined_at,
                     current_month_egress, current_month_ingress
                 ))
                 
+                # Keep the latest-state table read by the status views in step
+                cursor.execute("""
+                    INSERT OR REPLACE INTO node_satellite_latest
+                    (node_name, satellite_id, is_vetted, vetting_progress, vetted_at,
+                     audit_score, suspension_score, online_score, joined_at,
+                     current_month_egress, current_month_ingress, last_updated)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    node_name, satellite_id, is_vetted, vetting_progress, vetted_at,
+                    audit_score, suspension_score, online_score, joined_at,
+                    current_month_egress, current_month_ingress, datetime_to_epoch(timestamp)
+                ))
+                
                 print(f"Added sample data for {node_name} -> {satellite_name} (vetted: {is_vetted}, progress: {vetting_progress:.1%})")
         
         # Add some sample daily satellite metrics for the past 30 days
@@ -89,10 +108,11 @@ def populate_sample_data():
                     
                     cursor.execute("""
                         INSERT OR REPLACE INTO metrics_daily_satellite
-                        (node_name, satellite_id, date, storage_used_bytes, storage_at_rest_bytes,
+                        (node_ref, satellite_ref, date, storage_used_bytes, storage_at_rest_bytes,
                          ingress_usage_bytes, egress_usage_bytes, vetting_bandwidth_requirement,
                          vetting_bandwidth_completed)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        VALUES ((SELECT id FROM nodes WHERE name = ?), (SELECT id FROM satellites WHERE satellite_id = ?),
+                                ?, ?, ?, ?, ?, ?, ?)
                     """, (
                         node_name, satellite_id, metric_date, storage_used, storage_used,
                         ingress_usage, egress_usage, 1024**4,  # 1TB requirement
@@ -59,11 +59,13 @@ async def test_collection():
         if daily_satellite_count > 0:
             print("\\n📈 Recent Daily Metrics:")
             cursor.execute("""
-                SELECT node_name, satellite_id, date, 
-                       ingress_usage_bytes, egress_usage_bytes
-                FROM metrics_daily_satellite 
-                WHERE date >= date('now', '-7 days')
-                ORDER BY date DESC, node_name 
+                SELECT n.name, s.satellite_id, m.date, 
+                       m.ingress_usage_bytes, m.egress_usage_bytes
+                FROM metrics_daily_satellite m
+                JOIN nodes n ON n.id = m.node_ref
+                JOIN satellites s ON s.id = m.satellite_ref
+                WHERE m.date >= date('now', '-7 days')
+                ORDER BY m.date DESC, n.name 
                 LIMIT 10
             """)
             
@@ -79,6 +81,8 @@ async def test_collection():
         import traceback
         traceback.print_exc()
         return False
+    finally:
+        await collector.close()
     
     return True
 
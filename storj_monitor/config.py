@@ -1,8 +1,9 @@
 """Configuration management for Storj Monitor."""
 
 from pathlib import Path
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
+from urllib.parse import urlparse
+from pydantic import BaseModel, Field, PositiveInt, model_validator
 from pydantic_settings import BaseSettings
 import yaml
 
@@ -13,6 +14,11 @@ class NodeConfig(BaseModel):
     dashboard_url: str
     description: Optional[str] = None
 
+    @property
+    def host(self) -> str:
+        """Get the host part of the dashboard URL (shared by nodes on one machine)."""
+        return urlparse(self.dashboard_url).hostname or self.dashboard_url
+
     @property
     def api_base_url(self) -> str:
         """Get the base API URL for this node."""
@@ -35,13 +41,23 @@ class MonitoringConfig(BaseModel):
     http_timeout: int = Field(default=30, description="HTTP timeout in seconds")
     max_retries: int = Field(default=3, description="Number of retries for failed requests")
     retry_delay: int = Field(default=5, description="Delay between retries in seconds")
+    max_concurrency: int = Field(default=10, ge=1, description="Maximum number of nodes collected concurrently")
+    max_per_host: int = Field(default=2, ge=1, description="Maximum nodes collected concurrently on one host")
+    max_connections: int = Field(default=100, ge=1, description="Cap on open HTTP connections in one host's pool")
+    max_keepalive_connections: int = Field(default=20, ge=0, description="Cap on idle keep-alive HTTP connections in one host's pool")
 
 
 class DatabaseConfig(BaseModel):
     """Database configuration."""
     path: str = Field(default="db/storj_monitor.db", description="SQLite database file path")
     wal_mode: bool = Field(default=True, description="Enable WAL mode for better performance")
-    pool_size: int = Field(default=5, description="Connection pool size")
+    pool_size: int = Field(default=5, ge=1, description="Web API read connection pool size")
+    busy_timeout_ms: int = Field(default=5000, description="How long a connection waits on a locked database")
+    cache_size_mb: int = Field(default=64, description="SQLite page cache size per connection in MB")
+    satellite_change_only: bool = Field(
+        default=True,
+        description="Store a new node_satellites row only when vetting status or scores change"
+    )
 
     @property
     def absolute_path(self) -> Path:
@@ -49,12 +65,79 @@ class DatabaseConfig(BaseModel):
         return Path(self.path).resolve()
 
 
+class RetentionConfig(BaseModel):
+    """Data retention configuration."""
+    enabled: bool = Field(default=False, description="Delete expired rows on a schedule (opt-in)")
+    tables: Dict[str, Optional[PositiveInt]] = Field(
+        default_factory=lambda: {
+            "metrics_samples": 14,
+            "collection_cycles": 14,
+            "events": 365,
+            "metrics_rollup_hourly": 365,
+            "metrics_rollup_daily": None,
+        },
+        description="Days to keep per table; null keeps rows forever"
+    )
+    interval_hours: int = Field(default=24, ge=1, description="Hours between retention runs")
+    batch_size: int = Field(default=5000, ge=1, description="Rows deleted per transaction")
+    batch_pause_ms: int = Field(default=50, ge=0, description="Pause between batches so writers get the lock")
+    vacuum_pages: int = Field(default=1000, ge=1, description="Pages released per incremental_vacuum step")
+
+
+class AlertRuleConfig(BaseModel):
+    """A threshold rule evaluated against each node's newest sample."""
+    name: str
+    metric: Literal[
+        "disk_usage_percent", "audit_score", "suspension_score", "online_score",
+        "satellites_count", "ping_age_minutes"
+    ]
+    condition: Literal["above", "below"]
+    threshold: float
+    clear_threshold: Optional[float] = Field(
+        default=None, description="Value the metric must return past to resolve; defaults to threshold"
+    )
+    severity: Literal["warning", "critical"] = "warning"
+
+    @model_validator(mode="after")
+    def default_clear_threshold(self) -> "AlertRuleConfig":
+        """Resolve at the threshold itself unless a separate clear level is given."""
+        if self.clear_threshold is None:
+            self.clear_threshold = self.threshold
+        if (self.condition == "above" and self.clear_threshold > self.threshold) or \
+           (self.condition == "below" and self.clear_threshold < self.threshold):
+            raise ValueError(f"clear_threshold of alert rule {self.name} is on the wrong side of threshold")
+        return self
+
+
+class AlertsConfig(BaseModel):
+    """Alerting configuration."""
+    enabled: bool = Field(default=True, description="Evaluate alert rules after every collection")
+    rules: List[AlertRuleConfig] = Field(
+        default_factory=lambda: [
+            AlertRuleConfig(name="disk_full", metric="disk_usage_percent", condition="above",
+                            threshold=90, clear_threshold=85),
+            AlertRuleConfig(name="audit_score_low", metric="audit_score", condition="below",
+                            threshold=0.95, clear_threshold=0.96, severity="critical"),
+            AlertRuleConfig(name="suspension_score_low", metric="suspension_score", condition="below",
+                            threshold=0.95, clear_threshold=0.96, severity="critical"),
+            AlertRuleConfig(name="ping_stale", metric="ping_age_minutes", condition="above", threshold=60),
+        ],
+        description="Rules evaluated per node"
+    )
+    file: Optional[str] = Field(default=None, description="Append alerts to this file as JSON lines")
+    webhook_url: Optional[str] = Field(default=None, description="POST alerts to this URL")
+    webhook_timeout: int = Field(default=10, description="Webhook request timeout in seconds")
+
+
 class WebServerConfig(BaseModel):
     """Web server configuration."""
     host: str = Field(default="127.0.0.1", description="Host to bind to")
     port: int = Field(default=8080, description="Port to listen on")
     debug: bool = Field(default=False, description="Enable debug mode")
     reload: bool = Field(default=False, description="Auto-reload on code changes")
+    stream_poll_seconds: float = Field(
+        default=5, gt=0, description="How often live dashboard streams check for a new collection cycle"
+    )
 
 
 class LoggingConfig(BaseModel):
@@ -79,6 +162,8 @@ class Settings(BaseSettings):
     monitoring: MonitoringConfig = Field(default_factory=MonitoringConfig)
     nodes: List[NodeConfig] = Field(default_factory=list)
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
+    retention: RetentionConfig = Field(default_factory=RetentionConfig)
+    alerts: AlertsConfig = Field(default_factory=AlertsConfig)
     web_server: WebServerConfig = Field(default_factory=WebServerConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
 
@@ -0,0 +1,227 @@
+"""Shared SQLite connection helpers for Storj Monitor."""
+
+import asyncio
+import re
+import sqlite3
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+import aiosqlite
+
+from .config import DatabaseConfig
+
+
+SCHEMA_DIR = Path(__file__).parent.parent / "db"
+
+
+# Rollup tables as (table, bucket width in seconds), finest first
+ROLLUP_TIERS = (
+    ("metrics_rollup_hourly", 3600),
+    ("metrics_rollup_daily", 86400),
+)
+
+# A history window is served from the coarsest tier that still gives
+# the chart at least this many points
+ROLLUP_MIN_POINTS = 48
+
+
+# Errors raised when a connection (or aiosqlite's worker thread) is gone.
+# A bad statement raises the same types, so check is_connection_alive
+# before treating one of them as a lost connection.
+CONNECTION_ERRORS = (ValueError, sqlite3.ProgrammingError, sqlite3.InterfaceError)
+
+
+async def is_connection_alive(db: aiosqlite.Connection) -> bool:
+    """Probe whether a connection still answers a trivial query."""
+    try:
+        await db.execute("SELECT 1")
+    except Exception:
+        return False
+    return True
+
+
+def pragma_statements(config: DatabaseConfig) -> List[str]:
+    """Build the PRAGMA statements applied to every new connection."""
+    pragmas = [
+        # Only takes effect on a new database; lets retention hand freed
+        # pages back with incremental_vacuum. Must precede journal_mode.
+        "PRAGMA auto_vacuum=INCREMENTAL",
+        f"PRAGMA busy_timeout={config.busy_timeout_ms}",
+        # Negative cache_size is expressed in KiB
+        f"PRAGMA cache_size={-config.cache_size_mb * 1024}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if config.wal_mode:
+        pragmas += [
+            "PRAGMA journal_mode=WAL",
+            "PRAGMA synchronous=NORMAL",
+        ]
+    return pragmas
+
+
+async def connect_database(config: DatabaseConfig) -> aiosqlite.Connection:
+    """Open a connection to the configured database with tuned pragmas.
+
+    The connection's worker thread is a daemon so a long-lived connection
+    that is never closed cannot keep the interpreter alive on exit.
+    """
+    connection = aiosqlite.connect(config.path, timeout=config.busy_timeout_ms / 1000)
+    connection.daemon = True
+    db = await connection
+    try:
+        for pragma in pragma_statements(config):
+            await db.execute(pragma)
+    except Exception:
+        await db.close()
+        raise
+    return db
+
+
+def select_rollup_tier(hours: int) -> Optional[Tuple[str, int]]:
+    """Pick the rollup tier for a history window, or None to read raw samples."""
+    for table, bucket_seconds in reversed(ROLLUP_TIERS):
+        if hours * 3600 // bucket_seconds >= ROLLUP_MIN_POINTS:
+            return table, bucket_seconds
+    return None
+
+
+async def row_key_columns(db: aiosqlite.Connection, table: str) -> List[str]:
+    """Get the columns that identify a row: rowid, or the primary key of a WITHOUT ROWID table."""
+    cursor = await db.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    )
+    row = await cursor.fetchone()
+    if not row or not re.search(r"WITHOUT\s+ROWID", row[0], re.IGNORECASE):
+        return ['rowid']
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    primary_key = sorted((column[5], column[1]) for column in await cursor.fetchall() if column[5])
+    return [name for _, name in primary_key]
+
+
+def schema_files(schema_dir: Path = SCHEMA_DIR) -> List[Tuple[int, Path]]:
+    """List schema files as (version, path), oldest first.
+
+    db/schema.sql is version 1; every later revision is db/schema_vN.sql.
+    """
+    files = [(1, schema_dir / "schema.sql")]
+    for path in schema_dir.glob("schema_v*.sql"):
+        match = re.fullmatch(r"schema_v(\d+)\.sql", path.name)
+        if match:
+            files.append((int(match.group(1)), path))
+    return sorted(files)
+
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    """Get the highest applied schema version (0 for an empty database)."""
+    cursor = await db.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_versions'"
+    )
+    if not await cursor.fetchone():
+        return 0
+    cursor = await db.execute("SELECT MAX(version) FROM schema_versions")
+    return (await cursor.fetchone())[0] or 0
+
+
+async def apply_migrations(db: aiosqlite.Connection, schema_dir: Path = SCHEMA_DIR) -> List[int]:
+    """Bring the database schema up to date.
+
+    Each pending schema file runs in its own transaction, so a failing
+    revision leaves the database at the previous version. Returns the
+    versions that were applied.
+    """
+    current_version = await get_schema_version(db)
+    applied = []
+
+    for version, path in schema_files(schema_dir):
+        if version <= current_version:
+            continue
+        schema_sql = path.read_text(encoding="utf-8")
+        try:
+            await db.executescript(f"BEGIN;\n{schema_sql}\n;COMMIT;")
+        except Exception:
+            await db.rollback()
+            raise
+        applied.append(version)
+
+    return applied
+
+
+class ConnectionPool:
+    """A fixed-size pool of long-lived read connections.
+
+    Connections are opened once (with the tuned pragmas) and handed out
+    one request at a time, so a query costs neither a new worker thread
+    nor a fresh open of the database file. Pooled connections are
+    query-only; writes belong to the collector.
+    """
+
+    def __init__(self, config: DatabaseConfig, size: Optional[int] = None):
+        self.config = config
+        self.size = size or config.pool_size
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._connections: List[aiosqlite.Connection] = []
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await connect_database(self.config)
+        await db.execute("PRAGMA query_only=ON")
+        self._connections.append(db)
+        return db
+
+    async def open(self) -> "ConnectionPool":
+        """Open every connection in the pool."""
+        try:
+            for _ in range(self.size):
+                self._idle.put_nowait(await self._connect())
+        except Exception:
+            await self.close()
+            raise
+        return self
+
+    async def close(self) -> None:
+        """Close every connection, idle or not."""
+        connections, self._connections = self._connections, []
+        self._idle = asyncio.Queue()
+        for db in connections:
+            await _close_quietly(db)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a connection, waiting while all of them are in use.
+
+        A connection found broken after an error is closed and its slot
+        reconnected on the next borrow.
+        """
+        db = await self._idle.get()
+        if db is None:
+            try:
+                db = await self._connect()
+            except Exception:
+                self._idle.put_nowait(None)
+                raise
+
+        healthy = True
+        try:
+            yield db
+        except CONNECTION_ERRORS:
+            healthy = await is_connection_alive(db)
+            raise
+        finally:
+            # A connection from before close() is not handed out again
+            if db in self._connections:
+                if healthy:
+                    db.row_factory = None
+                    if db.in_transaction:
+                        await db.rollback()
+                    self._idle.put_nowait(db)
+                else:
+                    self._connections.remove(db)
+                    self._idle.put_nowait(None)
+                    await _close_quietly(db)
+
+
+async def _close_quietly(db: aiosqlite.Connection) -> None:
+    try:
+        await db.close()
+    except Exception:
+        pass
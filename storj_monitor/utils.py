@@ -6,33 +6,64 @@ import time
 from datetime import datetime, timezone
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
 
 import httpx
-from .config import get_settings
+from .config import Settings, get_settings
+
+
+T = TypeVar("T")
 
 
 class AsyncHTTPClient:
     """Async HTTP client with retry logic and timeout handling."""
 
-    def __init__(self, timeout: int = 30, max_retries: int = 3, retry_delay: int = 5):
+    def __init__(self, timeout: int = 30, max_retries: int = 3, retry_delay: int = 5,
+                 max_connections: int = 100, max_keepalive_connections: int = 20):
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
         self._client: Optional[httpx.AsyncClient] = None
 
     async def __aenter__(self):
-        self._client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=True)
-        return self
+        return self.open()
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the underlying connection pool is open."""
+        return self._client is not None
+
+    def open(self) -> "AsyncHTTPClient":
+        """Open the underlying keep-alive connection pool.
+
+        Use this instead of the async context manager when the client should
+        live across many requests (e.g. for the lifetime of the collector).
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                follow_redirects=True
+            )
+        return self
+
+    async def aclose(self) -> None:
+        """Close the connection pool and release its sockets."""
         if self._client:
             await self._client.aclose()
+            self._client = None
 
     async def fetch_json(self, url: str) -> Dict[str, Any]:
         """Fetch JSON data from URL with retry logic."""
         if not self._client:
-            raise RuntimeError("Client not initialized. Use async context manager.")
+            raise RuntimeError("Client not initialized. Use async context manager or open().")
 
         last_exception = None
         
@@ -58,9 +89,13 @@ class AsyncHTTPClient:
         raise last_exception
 
 
-def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None) -> logging.Logger:
-    """Set up structured logging with rotating file handler."""
-    settings = get_settings()
+def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None,
+                  settings: Optional[Settings] = None) -> logging.Logger:
+    """Set up structured logging with rotating file handler.
+
+    Uses the given settings, or the globally loaded ones.
+    """
+    settings = settings or get_settings()
     
     # Create logs directory if it doesn't exist
     if log_file:
@@ -152,6 +187,13 @@ def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def datetime_to_epoch(dt: datetime) -> int:
+    """Convert a datetime to integer Unix seconds, treating naive values as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
 def timestamp_to_datetime(timestamp_str: str) -> datetime:
     """Convert ISO timestamp string to datetime object."""
     # Handle different timestamp formats
@@ -194,6 +236,44 @@ def safe_float(value: Any, default: float = 0.0) -> float:
         return default
 
 
+def downsample_lttb(points: Sequence[T], max_points: int, value: Callable[[T], float]) -> List[T]:
+    """Reduce a time series to at most max_points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept. The points in between are split
+    into max_points - 2 equal buckets, and from each bucket the point
+    forming the largest triangle with the previously kept point and the
+    average of the next bucket is kept, so peaks and dips survive where
+    plain averaging would flatten them. Points are assumed evenly spaced.
+    """
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3")
+    count = len(points)
+    if count <= max_points:
+        return list(points)
+
+    values = [value(point) for point in points]
+    buckets = max_points - 2
+
+    def bucket_start(bucket: int) -> int:
+        return bucket * (count - 2) // buckets + 1
+
+    kept = [0]
+    for bucket in range(buckets):
+        start, end = bucket_start(bucket), bucket_start(bucket + 1)
+        # The point after the last bucket is the final point itself
+        next_end = bucket_start(bucket + 2) if bucket + 1 < buckets else count
+        next_x = (end + next_end - 1) / 2
+        next_y = sum(values[end:next_end]) / (next_end - end)
+
+        a = kept[-1]
+        kept.append(max(
+            range(start, end),
+            key=lambda i: abs((a - next_x) * (values[i] - values[a]) - (a - i) * (next_y - values[a]))
+        ))
+    kept.append(count - 1)
+    return [points[i] for i in kept]
+
+
 class PerformanceTimer:
     """Context manager for measuring execution time."""
 
@@ -211,11 +291,24 @@ class PerformanceTimer:
         self.logger.debug(f"{self.name} took {elapsed:.2f} seconds")
 
 
-def create_http_client() -> AsyncHTTPClient:
-    """Create HTTP client with settings from configuration."""
-    settings = get_settings()
+def create_http_client(settings: Optional[Settings] = None,
+                       max_connections: Optional[int] = None,
+                       max_keepalive_connections: Optional[int] = None) -> AsyncHTTPClient:
+    """Create HTTP client with settings from configuration.
+
+    Pool limits default to the configured caps and can be narrowed per
+    client (e.g. for a per-host pool).
+    """
+    settings = settings or get_settings()
+    if max_connections is None:
+        max_connections = settings.monitoring.max_connections
+    if max_keepalive_connections is None:
+        max_keepalive_connections = settings.monitoring.max_keepalive_connections
+
     return AsyncHTTPClient(
         timeout=settings.monitoring.http_timeout,
         max_retries=settings.monitoring.max_retries,
-        retry_delay=settings.monitoring.retry_delay
+        retry_delay=settings.monitoring.retry_delay,
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections
     )
@@ -0,0 +1,166 @@
+"""Shared fixtures and helpers for the Storj Monitor tests."""
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+import aiosqlite
+import pytest
+
+# Add parent directory to path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def node_response(node_id="test_node_123"):
+    """Create mock response for /api/sno endpoint."""
+    return {
+        "nodeID": node_id,
+        "wallet": "0x123456789abcdef",
+        "walletFeatures": None,
+        "satellites": [
+            {
+                "id": "1wFTAgs9DP5RSnCqKV1eLf6N9wtk4EAtmN5DpSxcs8EjT69tGE",
+                "url": "saltlake.tardigrade.io:7777",
+                "disqualified": None,
+                "suspended": None,
+                "vettedAt": None
+            }
+        ],
+        "diskSpace": {
+            "used": 1500000000,  # 1.5 GB
+            "available": 8500000000,  # 8.5 GB
+            "trash": 50000000,  # 50 MB
+            "overused": 0
+        },
+        "bandwidth": {
+            "used": 750000000,  # 750 MB
+            "available": 0
+        },
+        "lastPinged": "2025-09-14T23:30:00Z",
+        "version": "1.136.4",
+        "allowedVersion": "1.135.5",
+        "upToDate": True,
+        "startedAt": "2025-09-14T20:00:00Z",
+        "configuredPort": "28967",
+        "quicStatus": "OK",
+        "lastQuicPingedAt": "2025-09-14T23:25:00Z"
+    }
+
+
+def satellites_response():
+    """Create mock response for /api/sno/satellites endpoint."""
+    return {
+        "storageDaily": [
+            {
+                "atRestTotal": 1200000000000,  # 1.2 TB-hours
+                "atRestTotalBytes": 50000000000,  # 50 GB
+                "intervalStart": "2025-09-14T00:00:00Z"
+            }
+        ],
+        "bandwidthDaily": [
+            {
+                "egress": {
+                    "repair": 10000000,
+                    "audit": 1000000,
+                    "usage": 500000000
+                },
+                "ingress": {
+                    "repair": 50000000,
+                    "usage": 1000000000
+                },
+                "delete": 100000,
+                "intervalStart": "2025-09-14T00:00:00Z"
+            }
+        ],
+        "storageSummary": 1200000000000,
+        "averageUsageBytes": 50000000000,
+        "bandwidthSummary": 1561100000,
+        "egressSummary": 511000000,
+        "ingressSummary": 1050000000,
+        "earliestJoinedAt": "2025-09-13T12:00:00Z",
+        "audits": [
+            {
+                "auditScore": 0.999,
+                "suspensionScore": 1.0,
+                "onlineScore": 0.98,
+                "satelliteName": "saltlake.tardigrade.io:7777"
+            }
+        ]
+    }
+
+
+@pytest.fixture
+def mock_node_response():
+    """Build the /api/sno payload for a node id."""
+    return node_response
+
+
+@pytest.fixture
+def mock_satellites_response():
+    """Build the /api/sno/satellites payload."""
+    return satellites_response
+
+
+@pytest.fixture
+def node_data():
+    """Build the parsed data collect_node_data returns for a node id."""
+    from storj_monitor.models import StorjNodeInfo, StorjSatelliteInfo
+
+    def build(node_id="test_node_123"):
+        return {
+            'node_info': StorjNodeInfo(**node_response(node_id)),
+            'satellite_info': StorjSatelliteInfo(**satellites_response())
+        }
+
+    return build
+
+
+@pytest.fixture
+def fake_collect_node_data(node_data):
+    """Build a collect_node_data replacement; nodes named in unreachable fail to connect."""
+    def build(unreachable=()):
+        async def collect_node_data(node):
+            if node.name in unreachable:
+                raise ConnectionError("node unreachable")
+            return node_data(f"{node.name}_id")
+
+        return collect_node_data
+
+    return build
+
+
+@pytest.fixture
+def health_cycle():
+    """Build a stored-metrics cycle holding one health sample for test_node1.
+
+    A cycle with errors records the node as failed and carries no sample.
+    """
+    from storj_monitor.models import HealthMetrics
+
+    def build(audit_score=0.999, version="1.136.4", uptime_seconds=7200, errors=None):
+        health = [] if errors else [HealthMetrics(
+            node_name="test_node1", timestamp=datetime.now(), version=version,
+            uptime_seconds=uptime_seconds, last_pinged=datetime.now(), quic_status="OK",
+            audit_score=audit_score, suspension_score=1.0, online_score=1.0
+        )]
+        return {'cycle': {'node_count': 1, 'errors': errors or {}}, 'health': health}
+
+    return build
+
+
+@pytest.fixture
+def traced_connection():
+    """Record every statement the web API's DatabaseManager connections run."""
+    from webapp.database import DatabaseManager
+
+    statements = []
+
+    @asynccontextmanager
+    async def get_connection(manager):
+        async with aiosqlite.connect(manager.db_path) as db:
+            await db.set_trace_callback(statements.append)
+            yield db
+
+    with patch.object(DatabaseManager, 'get_connection', get_connection):
+        yield statements
@@ -3,9 +3,11 @@
 import pytest
 import asyncio
 import json
+import sqlite3
 import tempfile
+import time
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, date, timedelta, timezone
 from unittest.mock import AsyncMock, patch
 import aiosqlite
 import respx
@@ -15,7 +17,7 @@ import httpx
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from storj_monitor.config import Settings
+from storj_monitor.config import Settings, NodeConfig
 from collector.service import StorjCollector
 
 
@@ -79,97 +81,21 @@ class TestCollectorIntegration:
         )
         return settings
 
-    def create_mock_node_response(self, node_id="test_node_123"):
-        """Create mock response for /api/sno endpoint."""
-        return {
-            "nodeID": node_id,
-            "wallet": "0x123456789abcdef",
-            "walletFeatures": None,
-            "satellites": [
-                {
-                    "id": "1wFTAgs9DP5RSnCqKV1eLf6N9wtk4EAtmN5DpSxcs8EjT69tGE",
-                    "url": "saltlake.tardigrade.io:7777",
-                    "disqualified": None,
-                    "suspended": None,
-                    "vettedAt": None
-                }
-            ],
-            "diskSpace": {
-                "used": 1500000000,  # 1.5 GB
-                "available": 8500000000,  # 8.5 GB
-                "trash": 50000000,  # 50 MB
-                "overused": 0
-            },
-            "bandwidth": {
-                "used": 750000000,  # 750 MB
-                "available": 0
-            },
-            "lastPinged": "2025-09-14T23:30:00Z",
-            "version": "1.136.4",
-            "allowedVersion": "1.135.5",
-            "upToDate": True,
-            "startedAt": "2025-09-14T20:00:00Z",
-            "configuredPort": "28967",
-            "quicStatus": "OK",
-            "lastQuicPingedAt": "2025-09-14T23:25:00Z"
-        }
-
-    def create_mock_satellites_response(self):
-        """Create mock response for /api/sno/satellites endpoint."""
-        return {
-            "storageDaily": [
-                {
-                    "atRestTotal": 1200000000000,  # 1.2 TB-hours
-                    "atRestTotalBytes": 50000000000,  # 50 GB
-                    "intervalStart": "2025-09-14T00:00:00Z"
-                }
-            ],
-            "bandwidthDaily": [
-                {
-                    "egress": {
-                        "repair": 10000000,
-                        "audit": 1000000,
-                        "usage": 500000000
-                    },
-                    "ingress": {
-                        "repair": 50000000,
-                        "usage": 1000000000
-                    },
-                    "delete": 100000,
-                    "intervalStart": "2025-09-14T00:00:00Z"
-                }
-            ],
-            "storageSummary": 1200000000000,
-            "averageUsageBytes": 50000000000,
-            "bandwidthSummary": 1561100000,
-            "egressSummary": 511000000,
-            "ingressSummary": 1050000000,
-            "earliestJoinedAt": "2025-09-13T12:00:00Z",
-            "audits": [
-                {
-                    "auditScore": 0.999,
-                    "suspensionScore": 1.0,
-                    "onlineScore": 0.98,
-                    "satelliteName": "saltlake.tardigrade.io:7777"
-                }
-            ]
-        }
-
     @respx.mock
-    async def test_collector_data_collection(self, mock_settings, temp_db):
+    async def test_collector_data_collection(self, mock_settings, temp_db, mock_node_response, mock_satellites_response):
         """Test that the collector can fetch and store data."""
         # Mock HTTP responses
         respx.get("http://192.168.177.133:14002/api/sno").mock(
-            return_value=httpx.Response(200, json=self.create_mock_node_response("node1_id"))
+            return_value=httpx.Response(200, json=mock_node_response("node1_id"))
         )
         respx.get("http://192.168.177.133:14002/api/sno/satellites").mock(
-            return_value=httpx.Response(200, json=self.create_mock_satellites_response())
+            return_value=httpx.Response(200, json=mock_satellites_response())
         )
         respx.get("http://192.168.177.133:14003/api/sno").mock(
-            return_value=httpx.Response(200, json=self.create_mock_node_response("node2_id"))
+            return_value=httpx.Response(200, json=mock_node_response("node2_id"))
         )
         respx.get("http://192.168.177.133:14003/api/sno/satellites").mock(
-            return_value=httpx.Response(200, json=self.create_mock_satellites_response())
+            return_value=httpx.Response(200, json=mock_satellites_response())
         )
 
         # Create collector with mocked settings
@@ -179,6 +105,7 @@ class TestCollectorIntegration:
                 
                 # Run single collection cycle
                 await collector.collect_all_metrics()
+                await collector.close()
         
         # Verify data was stored in database
         async with aiosqlite.connect(temp_db) as db:
@@ -200,7 +127,7 @@ class TestCollectorIntegration:
             # Check specific values for one node
             cursor = await db.execute("""
                 SELECT used_bytes, available_bytes FROM metrics_disk 
-                WHERE node_name = 'test_node1'
+                WHERE node_ref = (SELECT id FROM nodes WHERE name = 'test_node1')
             """)
             row = await cursor.fetchone()
             assert row[0] == 1500000000  # 1.5 GB
@@ -209,7 +136,7 @@ class TestCollectorIntegration:
             # Check health metrics
             cursor = await db.execute("""
                 SELECT audit_score, version, satellites_count FROM metrics_health
-                WHERE node_name = 'test_node1'
+                WHERE node_ref = (SELECT id FROM nodes WHERE name = 'test_node1')
             """)
             row = await cursor.fetchone()
             assert row[0] == 0.999
@@ -217,14 +144,14 @@ class TestCollectorIntegration:
             assert row[2] == 1  # One satellite in mock data
 
     @respx.mock
-    async def test_collector_error_handling(self, mock_settings, temp_db):
+    async def test_collector_error_handling(self, mock_settings, temp_db, mock_node_response, mock_satellites_response):
         """Test that collector handles errors gracefully."""
         # Mock one successful response and one failed response
         respx.get("http://192.168.177.133:14002/api/sno").mock(
-            return_value=httpx.Response(200, json=self.create_mock_node_response("node1_id"))
+            return_value=httpx.Response(200, json=mock_node_response("node1_id"))
         )
         respx.get("http://192.168.177.133:14002/api/sno/satellites").mock(
-            return_value=httpx.Response(200, json=self.create_mock_satellites_response())
+            return_value=httpx.Response(200, json=mock_satellites_response())
         )
         respx.get("http://192.168.177.133:14003/api/sno").mock(
             return_value=httpx.Response(500, text="Internal Server Error")
@@ -236,6 +163,7 @@ class TestCollectorIntegration:
                 
                 # Should not raise exception even with one failing node
                 await collector.collect_all_metrics()
+                await collector.close()
         
         # Verify only successful node data was stored
         async with aiosqlite.connect(temp_db) as db:
@@ -243,6 +171,1092 @@ class TestCollectorIntegration:
             disk_count = (await cursor.fetchone())[0]
             assert disk_count == 1  # Only one successful node
 
+    async def test_collection_cycle_writes_one_sample_per_node(self, mock_settings, temp_db, fake_collect_node_data):
+        """Test that a cycle records its header and one wide sample row per collected node."""
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                collector.collect_node_data = fake_collect_node_data(unreachable={"test_node2"})
+                await collector.collect_all_metrics()
+                await collector.close()
+
+        async with aiosqlite.connect(temp_db) as db:
+            cursor = await db.execute(
+                "SELECT id, node_count, error_count, errors, finished_at >= started_at FROM collection_cycles"
+            )
+            cycle_id, node_count, error_count, errors, finished_after_start = await cursor.fetchone()
+            assert (node_count, error_count, finished_after_start) == (2, 1, 1)
+            assert json.loads(errors) == {"test_node2": "node unreachable"}
+
+            cursor = await db.execute("""
+                SELECT nodes.name, cycle_id, disk_used, bandwidth_used, audit_score
+                FROM metrics_samples JOIN nodes ON nodes.id = metrics_samples.node_ref
+            """)
+            assert await cursor.fetchall() == [("test_node1", cycle_id, 1500000000, 750000000, 0.999)]
+
+    async def test_events_recorded_on_state_transitions(self, mock_settings, temp_db, health_cycle):
+        """Test that events are written once per transition and paged newest first."""
+        from webapp.database import DatabaseManager
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                await collector.store_metrics(health_cycle())
+                touched = await collector.store_metrics(health_cycle(audit_score=0.97))
+                # Rows the table_counters triggers write are not counted
+                assert (touched['collection_cycles'], touched['metrics_samples'], touched['events']) == (1, 1, 1)
+                await collector.store_metrics(health_cycle(audit_score=0.97))  # still degraded
+                await collector.store_metrics(health_cycle(errors={"test_node1": "timed out"}))
+                await collector.store_metrics(health_cycle(version="1.137.0", uptime_seconds=60))
+                await collector.close()
+
+                # A restarted collector picks up the stored state instead of re-reporting it
+                collector = StorjCollector()
+                touched = await collector.store_metrics(health_cycle(version="1.137.0", uptime_seconds=120))
+                assert 'events' not in touched
+                await collector.close()
+
+        with patch('webapp.database.get_settings', return_value=mock_settings):
+            manager = DatabaseManager()
+            events = await manager.get_recent_events()
+            first_page = await manager.get_recent_events(limit=2)
+            second_page = await manager.get_recent_events(limit=2, before=first_page[-1]['id'])
+
+        assert [(event['event_type'], event['type']) for event in reversed(events)] == [
+            ('score_degraded', 'warning'),
+            ('node_offline', 'critical'),
+            ('node_online', 'info'),
+            ('score_recovered', 'info'),
+            ('version_changed', 'info'),
+            ('uptime_reset', 'warning'),
+        ]
+        assert {event['node_name'] for event in events} == {"test_node1"}
+        assert first_page + second_page == events[:4]
+
+    async def test_live_stream_publishes_once_per_cycle(self, mock_settings, temp_db, health_cycle):
+        """Test that every stream subscriber gets the same update once per new collection cycle."""
+        from webapp.live import CycleBroadcaster
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                await collector.store_metrics(health_cycle(0.999))
+
+                with patch('webapp.database.get_settings', return_value=mock_settings):
+                    broadcaster = CycleBroadcaster()
+                    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+                    assert not await broadcaster.check()  # baseline
+                    assert not await broadcaster.check()  # no new cycle
+
+                    await collector.store_metrics(health_cycle(0.97))
+                    assert await broadcaster.check()
+                    assert not await broadcaster.check()
+
+                    await collector.store_metrics(health_cycle(0.95))
+                    assert await broadcaster.check()
+                await collector.close()
+
+        message = first.get_nowait()
+        assert second.get_nowait() == message
+        assert message.startswith("id: 2\nevent: cycle\ndata: ")
+        update = json.loads(message.split("data: ", 1)[1])
+        assert update['cycle_id'] == 2
+        assert [event['event_type'] for event in update['events']] == ['score_degraded']
+        # The first update carries the full state
+        assert list(update['nodes']) == ['test_node1', 'test_node2']
+        assert update['nodes']['test_node2']['name'] == 'test_node2'
+        assert update['summary']['last_cycle']['id'] == 2
+        assert 'satellites' in update
+
+        # Later ones only what changed: test_node2 and the node count did not
+        message = first.get_nowait()
+        assert second.get_nowait() == message
+        assert first.empty() and second.empty()
+        update = json.loads(message.split("data: ", 1)[1])
+        assert update['cycle_id'] == 3
+        assert list(update['nodes']) == ['test_node1']
+        assert update['nodes']['test_node1']['audit_score'] == 0.95
+        assert 'name' not in update['nodes']['test_node1']
+        assert update['summary']['last_cycle']['id'] == 3
+        assert 'node_count' not in update['summary']
+        assert 'satellites' not in update and update['removed_nodes'] == []
+
+    async def test_dashboard_reads_one_snapshot(self, mock_settings, temp_db):
+        """Test that the dashboard is read on one connection that doesn't see later commits."""
+        from storj_monitor.models import DiskMetrics
+        from webapp import database
+        from webapp.database import DatabaseManager
+
+        mock_settings.database.wal_mode = True
+
+        def cycle(used_bytes):
+            return {'cycle': {'node_count': 1}, 'disk': [DiskMetrics(
+                node_name="test_node1", timestamp=datetime.now(), used_bytes=used_bytes,
+                available_bytes=1000, trash_bytes=0, overused_bytes=0
+            )]}
+
+        connect = aiosqlite.connect
+        opened = []
+
+        def counting_connect(*args, **kwargs):
+            opened.append(args)
+            return connect(*args, **kwargs)
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                await collector.store_metrics(cycle(100))
+
+                with patch('webapp.database.get_settings', return_value=mock_settings):
+                    manager = DatabaseManager()
+                    with patch.object(database.aiosqlite, 'connect', counting_connect):
+                        dashboard = await manager.get_dashboard()
+                        assert len(opened) == 1
+
+                        async with manager.read_snapshot():
+                            first_cycle = await manager.get_last_cycle_id()
+                            await collector.store_metrics(cycle(200))
+                            assert await manager.get_last_cycle_id() == first_cycle
+                            nodes = await manager.get_latest_node_status()
+                        assert await manager.get_last_cycle_id() == first_cycle + 1
+                await collector.close()
+
+        assert set(dashboard) == {'nodes', 'summary', 'events', 'vetting', 'satellites'}
+        assert dashboard['summary']['last_cycle']['id'] == first_cycle
+        assert [node.disk_used for node in nodes if node.name == "test_node1"] == [100]
+
+    async def test_alerts_fire_once_with_hysteresis(self, mock_settings, tmp_path):
+        """Test that alerts fire and resolve once per transition and only changed or due nodes are evaluated."""
+        from collector.alerts import AlertEngine
+        from storj_monitor.config import AlertRuleConfig
+
+        now = time.time()
+        mock_settings.alerts.rules = [
+            AlertRuleConfig(name="disk_full", metric="disk_usage_percent", condition="above",
+                            threshold=90, clear_threshold=85),
+            AlertRuleConfig(name="ping_stale", metric="ping_age_minutes", condition="above", threshold=30),
+        ]
+        mock_settings.alerts.file = str(tmp_path / "alerts.jsonl")
+
+        def sample(node_name, used, last_pinged=now):
+            return {'node_name': node_name, 'disk_used': used, 'disk_available': 100 - used,
+                    'last_pinged': datetime.fromtimestamp(last_pinged, timezone.utc)}
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+        engine = collector.alert_engine
+        evaluated = []
+        evaluate_node = engine.evaluate_node
+        engine.evaluate_node = lambda node_name, *args: evaluated.append(node_name) or evaluate_node(node_name, *args)
+
+        def states(samples, at=now):
+            evaluated.clear()
+            return [(alert['node_name'], alert['rule'], alert['state']) for alert in engine.evaluate(samples, at)]
+
+        assert states([sample("a", 91), sample("b", 50)]) == [("a", "disk_full", "firing")]
+        assert states([sample("a", 95), sample("b", 50)]) == []  # still firing
+        assert evaluated == ["a"]  # b is unchanged
+        assert states([sample("a", 88), sample("b", 50)]) == []  # inside the hysteresis band
+        assert states([sample("a", 80), sample("b", 50)]) == [("a", "disk_full", "resolved")]
+        assert states([sample("a", 80), sample("b", 50)]) == [] and evaluated == []
+
+        # A ping that stops updating is re-checked once its age reaches the threshold
+        assert states([], now + 29 * 60) == [] and evaluated == []
+        assert states([], now + 31 * 60) == [("a", "ping_stale", "firing"), ("b", "ping_stale", "firing")]
+        assert states([sample("a", 80, last_pinged=now + 31 * 60)], now + 31 * 60) == [
+            ("a", "ping_stale", "resolved")
+        ]
+
+        engine.evaluate_node = evaluate_node
+        await engine.dispatch(engine.evaluate([sample("c", 99)], now))
+        written = [json.loads(line) for line in Path(mock_settings.alerts.file).read_text().splitlines()]
+        assert [(alert['node_name'], alert['rule'], alert['severity']) for alert in written] == [
+            ("c", "disk_full", "warning")
+        ]
+
+    async def test_alerts_follow_stored_cycles_only(self, mock_settings, tmp_path, fake_collect_node_data):
+        """Test that a cycle that fails to store does not advance alert state."""
+        from storj_monitor.config import AlertRuleConfig
+
+        mock_settings.nodes = mock_settings.nodes[:1]
+        mock_settings.alerts.rules = [
+            AlertRuleConfig(name="disk_full", metric="disk_usage_percent", condition="above", threshold=10)
+        ]
+        mock_settings.alerts.file = str(tmp_path / "alerts.jsonl")
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                collector.collect_node_data = fake_collect_node_data()
+                collector.store_metrics = AsyncMock(side_effect=[ConnectionError("database gone"), {}])
+
+                await collector.collect_all_metrics()
+                await asyncio.gather(*collector.alert_tasks)
+                assert not Path(mock_settings.alerts.file).exists()
+
+                await collector.collect_all_metrics()
+                await collector.close()
+
+        written = [json.loads(line) for line in Path(mock_settings.alerts.file).read_text().splitlines()]
+        assert [(alert['node_name'], alert['state']) for alert in written] == [("test_node1", "firing")]
+
+    async def test_collector_concurrency_limit(self, mock_settings, fake_collect_node_data):
+        """Test that nodes are collected concurrently up to max_concurrency."""
+        mock_settings.monitoring.max_concurrency = 1
+        in_flight = 0
+        max_in_flight = 0
+        collect_node_data = fake_collect_node_data()
+
+        async def counting_collect_node_data(node):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await collect_node_data(node)
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                collector.collect_node_data = counting_collect_node_data
+                collector.store_metrics = AsyncMock(return_value={})
+
+                await collector.collect_all_metrics()
+                assert max_in_flight == 1
+
+                mock_settings.monitoring.max_concurrency = 2
+                max_in_flight = 0
+                await collector.collect_all_metrics()
+                assert max_in_flight == 2
+
+        stored = collector.store_metrics.call_args[0][0]
+        assert [m.node_name for m in stored['disk']] == ['test_node1', 'test_node2']
+        assert stored['test_node1_node_id'] == 'test_node1_id'
+
+    async def test_collector_per_host_limit(self, mock_settings):
+        """Test that nodes sharing a host are limited and spread across hosts."""
+        mock_settings.nodes.append(
+            NodeConfig(name="test_node3", dashboard_url="http://192.168.177.134:14002")
+        )
+        mock_settings.monitoring.max_per_host = 1
+        in_flight_by_host = {}
+        max_in_flight_by_host = {}
+        start_order = []
+
+        async def fake_collect_node_data(node):
+            host = node.host
+            start_order.append(node.name)
+            in_flight_by_host[host] = in_flight_by_host.get(host, 0) + 1
+            max_in_flight_by_host[host] = max(max_in_flight_by_host.get(host, 0), in_flight_by_host[host])
+            await asyncio.sleep(0.01)
+            in_flight_by_host[host] -= 1
+            raise httpx.ConnectError("unreachable")
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                collector.collect_node_data = fake_collect_node_data
+                collector.store_metrics = AsyncMock(return_value={})
+                await collector.collect_all_metrics()
+
+        assert max_in_flight_by_host == {"192.168.177.133": 1, "192.168.177.134": 1}
+        # The second host does not wait behind every node of the first one
+        assert start_order[:2] == ["test_node1", "test_node3"]
+
+    @respx.mock
+    async def test_collect_node_data_fetches_in_parallel(self, mock_settings, mock_node_response, mock_satellites_response):
+        """Test that both node endpoints are requested concurrently."""
+        from storj_monitor.utils import AsyncHTTPClient
+
+        in_flight = 0
+        max_in_flight = 0
+        cancelled = []
+
+        async def slow_response(request, payload):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            try:
+                await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                cancelled.append(request.url.path)
+                raise
+            finally:
+                in_flight -= 1
+            return httpx.Response(200, json=payload)
+
+        respx.get("http://192.168.177.133:14002/api/sno").mock(
+            side_effect=lambda request: slow_response(request, mock_node_response())
+        )
+        respx.get("http://192.168.177.133:14002/api/sno/satellites").mock(
+            side_effect=lambda request: slow_response(request, mock_satellites_response())
+        )
+        respx.get("http://192.168.177.133:14003/api/sno").mock(
+            side_effect=lambda request: slow_response(request, mock_node_response())
+        )
+        respx.get("http://192.168.177.133:14003/api/sno/satellites").mock(
+            return_value=httpx.Response(500, text="Internal Server Error")
+        )
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                with patch('collector.service.create_http_client',
+                           side_effect=lambda *args, **kwargs: AsyncHTTPClient(timeout=10, max_retries=0)):
+                    collector = StorjCollector()
+
+                    data = await collector.collect_node_data(mock_settings.nodes[0])
+                    assert max_in_flight == 2
+                    assert data['node_info'].node_id == "test_node_123"
+
+                    # A failing endpoint fails the node and cancels the other fetch
+                    with pytest.raises(httpx.HTTPStatusError):
+                        await collector.collect_node_data(mock_settings.nodes[1])
+                    assert cancelled == ["/api/sno"]
+
+    @respx.mock
+    async def test_http_client_reused_across_cycles(self, mock_settings, mock_node_response, mock_satellites_response):
+        """Test that one pooled HTTP client serves every cycle until close()."""
+        for port, node_id in ((14002, "node1_id"), (14003, "node2_id")):
+            respx.get(f"http://192.168.177.133:{port}/api/sno").mock(
+                return_value=httpx.Response(200, json=mock_node_response(node_id))
+            )
+            respx.get(f"http://192.168.177.133:{port}/api/sno/satellites").mock(
+                return_value=httpx.Response(200, json=mock_satellites_response())
+            )
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                collector.store_metrics = AsyncMock(return_value={})
+
+                await collector.collect_all_metrics()
+                # Both test nodes live on the same host and share its pool
+                assert list(collector.http_clients) == ["192.168.177.133"]
+                client = collector.http_clients["192.168.177.133"]
+                assert client.is_open
+                # Two requests per node for each of the host's slots
+                assert client.limits.max_connections == 2 * mock_settings.monitoring.max_per_host
+
+                await collector.collect_all_metrics()
+                assert collector.http_clients["192.168.177.133"] is client
+
+                await collector.close()
+                assert collector.http_clients == {}
+                assert not client.is_open
+
+                # The configured pool limits cap each host's pool
+                mock_settings.monitoring.max_connections = 3
+                mock_settings.monitoring.max_keepalive_connections = 1
+                client = collector.get_http_client("192.168.177.133")
+                assert (client.limits.max_connections, client.limits.max_keepalive_connections) == (3, 1)
+                await collector.close()
+
+    async def test_store_metrics_batches_all_tables(self, mock_settings, temp_db, mock_node_response, mock_satellites_response):
+        """Test that batched writes store every table in one transaction."""
+        from storj_monitor.models import StorjNodeInfo, StorjSatelliteInfo
+
+        async with aiosqlite.connect(temp_db) as db:
+            schema_path = Path(__file__).parent.parent / "db" / "schema_v2.sql"
+            await db.executescript(schema_path.read_text())
+
+        node_info = StorjNodeInfo(**mock_node_response("node1_id"))
+        satellite_info = StorjSatelliteInfo(**mock_satellites_response())
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                all_metrics = {
+                    'test_node1_node_id': node_info.node_id,
+                    'disk': [collector.extract_disk_metrics("test_node1", node_info)],
+                    'bandwidth': [collector.extract_bandwidth_metrics("test_node1", node_info)],
+                    'health': [collector.extract_health_metrics("test_node1", node_info, satellite_info)],
+                    'daily_bandwidth': collector.extract_daily_bandwidth_metrics("test_node1", satellite_info),
+                    'daily_storage': collector.extract_daily_storage_metrics("test_node1", satellite_info),
+                    'satellite_status': collector.satellite_extractor.extract_satellite_status(
+                        "test_node1", node_info, satellite_info
+                    ),
+                    'daily_satellite': []
+                }
+                await collector.store_metrics(all_metrics)
+
+        async with aiosqlite.connect(temp_db) as db:
+            for table in ('metrics_disk', 'metrics_bandwidth', 'metrics_health',
+                          'metrics_daily_bandwidth', 'metrics_daily_storage', 'node_satellites'):
+                cursor = await db.execute(f"SELECT COUNT(*) FROM {table}")
+                assert (await cursor.fetchone())[0] == 1, table
+
+            cursor = await db.execute("SELECT node_id FROM nodes WHERE name = 'test_node1'")
+            assert (await cursor.fetchone())[0] == "node1_id"
+
+    async def test_latest_state_tables_follow_each_store(self, mock_settings, temp_db, mock_node_response, mock_satellites_response):
+        """Test that node_latest holds the newest sample and feeds the API queries."""
+        from storj_monitor.models import StorjNodeInfo, StorjSatelliteInfo
+        from webapp.database import DatabaseManager
+
+        node_info = StorjNodeInfo(**mock_node_response())
+        satellite_info = StorjSatelliteInfo(**mock_satellites_response())
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                for used_bytes in (1000, 2000):
+                    disk_metric = collector.extract_disk_metrics("test_node1", node_info)
+                    disk_metric.used_bytes = used_bytes
+                    await collector.store_metrics({
+                        'disk': [disk_metric],
+                        'bandwidth': [collector.extract_bandwidth_metrics("test_node1", node_info)],
+                        'health': [collector.extract_health_metrics("test_node1", node_info, satellite_info)],
+                        'satellite_status': collector.satellite_extractor.extract_satellite_status(
+                            "test_node1", node_info, satellite_info
+                        )
+                    })
+                await collector.close()
+
+        async with aiosqlite.connect(temp_db) as db:
+            cursor = await db.execute("SELECT node_name, disk_used FROM node_latest")
+            assert await cursor.fetchall() == [("test_node1", 2000)]
+            cursor = await db.execute("SELECT COUNT(*) FROM node_satellite_latest")
+            assert (await cursor.fetchone())[0] == 1
+
+        with patch('webapp.database.get_settings', return_value=mock_settings):
+            statuses = await DatabaseManager().get_latest_node_status()
+
+        by_name = {status.name: status for status in statuses}
+        assert set(by_name) == {"test_node1", "test_node2"}
+        assert by_name["test_node1"].disk_used == 2000
+        assert by_name["test_node1"].audit_score == 0.999
+        assert by_name["test_node1"].active_satellites == 1
+        assert by_name["test_node2"].disk_used is None
+
+    async def test_connection_pool_reuses_bounded_connections(self, mock_settings, temp_db):
+        """Test that pooled queries share pool_size long-lived read connections."""
+        from storj_monitor.db import ConnectionPool, apply_migrations
+        from webapp.database import DatabaseManager
+
+        async with aiosqlite.connect(temp_db) as db:
+            await apply_migrations(db)
+
+        pool = await ConnectionPool(mock_settings.database, size=2).open()
+        borrowed = set()
+        in_use = 0
+        peak = 0
+
+        async def borrow():
+            nonlocal in_use, peak
+            async with pool.connection() as db:
+                in_use += 1
+                peak = max(peak, in_use)
+                borrowed.add(id(db))
+                await asyncio.sleep(0.01)
+                in_use -= 1
+
+        try:
+            await asyncio.gather(*(borrow() for _ in range(6)))
+            assert peak == 2
+            assert len(borrowed) == 2
+
+            # Pooled connections are read-only
+            async with pool.connection() as db:
+                with pytest.raises(Exception):
+                    await db.execute("DELETE FROM nodes")
+
+            with patch('webapp.database.get_settings', return_value=mock_settings):
+                with patch.object(DatabaseManager, 'pool', pool):
+                    statuses = await DatabaseManager().get_latest_node_status()
+            assert {status.name for status in statuses} == {"test_node1", "test_node2"}
+            assert len(pool._connections) == 2
+        finally:
+            await pool.close()
+
+    async def test_rollups_follow_samples_and_serve_long_windows(self, mock_settings, temp_db):
+        """Test that samples fold into hourly/daily rollups used for long history windows."""
+        from storj_monitor.models import DiskMetrics
+        from storj_monitor.db import select_rollup_tier
+        from webapp.database import DatabaseManager
+
+        assert select_rollup_tier(24) is None
+        assert select_rollup_tier(168)[0] == 'metrics_rollup_hourly'
+        assert select_rollup_tier(8760)[0] == 'metrics_rollup_daily'
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                for used_bytes in (4 * 1024**3, 2 * 1024**3, 3 * 1024**3):
+                    await collector.store_metrics({'disk': [DiskMetrics(
+                        node_name="test_node1", timestamp=datetime.now(),
+                        used_bytes=used_bytes, available_bytes=6 * 1024**3
+                    )]})
+                await collector.close()
+
+        async with aiosqlite.connect(temp_db) as db:
+            cursor = await db.execute("""
+                SELECT samples, min_value, max_value, sum_value, last_value
+                FROM metrics_rollup_daily WHERE node_ref = 1 AND metric = 'disk_used'
+            """)
+            assert await cursor.fetchall() == [(3, 2 * 1024**3, 4 * 1024**3, 9 * 1024**3, 3 * 1024**3)]
+
+        with patch('webapp.database.get_settings', return_value=mock_settings):
+            manager = DatabaseManager()
+            raw = await manager.get_disk_usage_history("test_node1", hours=24)
+            yearly = await manager.get_disk_usage_history("test_node1", hours=8760)
+
+        assert [point['used_gb'] for point in raw] == [4.0, 2.0, 3.0]
+        assert len(yearly) == 1
+        assert yearly[0]['used_gb'] == 3.0
+        assert yearly[0]['usage_percentage'] == 33.33
+
+    async def test_rollups_bucket_by_cycle_start(self, mock_settings, temp_db):
+        """Test that a cycle crossing an hour boundary rolls up into the hour it started in."""
+        from storj_monitor.models import DiskMetrics
+
+        started_at = int(time.time()) // 3600 * 3600 - 30
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                await collector.store_metrics({
+                    'cycle': {'started_at': started_at, 'node_count': 1},
+                    'disk': [DiskMetrics(
+                        node_name="test_node1", timestamp=datetime.now(),
+                        used_bytes=4 * 1024**3, available_bytes=6 * 1024**3
+                    )],
+                })
+                await collector.close()
+
+        async with aiosqlite.connect(temp_db) as db:
+            cursor = await db.execute(
+                "SELECT DISTINCT bucket FROM metrics_rollup_hourly WHERE metric = 'disk_used'"
+            )
+            assert await cursor.fetchall() == [(started_at // 3600 * 3600,)]
+            cursor = await db.execute(
+                "SELECT DISTINCT bucket FROM metrics_rollup_daily WHERE metric = 'disk_used'"
+            )
+            assert await cursor.fetchall() == [(started_at // 86400 * 86400,)]
+
+    async def test_fleet_history_buckets_every_node_in_one_query(self, mock_settings, temp_db):
+        """Test that fleet history returns per-node and summed series from raw samples and rollups."""
+        from storj_monitor.models import DiskMetrics, HealthMetrics
+        from webapp.database import DatabaseManager
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                for used_gb in (2, 4):
+                    await collector.store_metrics({
+                        'disk': [DiskMetrics(node_name=name, timestamp=datetime.now(),
+                                             used_bytes=used_gb * factor * 1024**3, available_bytes=10 * 1024**3)
+                                 for name, factor in (("test_node1", 1), ("test_node2", 2))],
+                        'health': [HealthMetrics(node_name=name, timestamp=datetime.now(), version="1.136.4",
+                                                 uptime_seconds=60, last_pinged=datetime.now(), quic_status="OK",
+                                                 audit_score=score, suspension_score=1.0, online_score=1.0)
+                                   for name, score in (("test_node1", 1.0), ("test_node2", 0.9))],
+                    })
+                await collector.close()
+
+        with patch('webapp.database.get_settings', return_value=mock_settings):
+            manager = DatabaseManager()
+            with patch.object(aiosqlite.Connection, 'execute', autospec=True,
+                              side_effect=aiosqlite.Connection.execute) as execute:
+                per_node = await manager.get_fleet_history(['disk'], hours=1, max_points=2)
+                queries = execute.call_count
+            total = await manager.get_fleet_history(['disk', 'health'], hours=1, combine='total', max_points=2)
+            yearly = await manager.get_fleet_history(['disk', 'health'], hours=8760, combine='total')
+
+        assert queries == 1
+        # A half-hour bucket holds both cycles; each node gets its average
+        assert per_node['bucket_seconds'] == 1800
+        assert {name: [point['disk']['used_gb'] for point in points]
+                for name, points in per_node['series'].items()} in (
+            {'test_node1': [3.0], 'test_node2': [6.0]},
+            {'test_node1': [2.0, 4.0], 'test_node2': [4.0, 8.0]},  # the cycles straddled a bucket edge
+        )
+        assert list(total['series']) == ['total']
+        assert total['series']['total'][-1]['health']['audit_score'] == 0.95
+        assert yearly['series']['total'][0]['disk']['used_gb'] == 9.0
+        assert yearly['series']['total'][0]['health']['audit_score'] == 0.95
+
+    async def test_fleet_history_keeps_each_cycle_in_one_bucket(self, mock_settings, temp_db):
+        """Test that a cycle whose nodes are stamped across a bucket edge is summed in one bucket."""
+        from storj_monitor.db import apply_migrations
+        from webapp.database import DatabaseManager
+
+        edge = int(time.time()) // 60 * 60 - 600
+        async with aiosqlite.connect(temp_db) as db:
+            await apply_migrations(db)
+            await db.execute(
+                "INSERT INTO collection_cycles (id, started_at, finished_at, node_count, error_count) "
+                "VALUES (1, ?, ?, 2, 0)", (edge - 2, edge + 2)
+            )
+            await db.executemany(
+                "INSERT INTO metrics_samples (cycle_id, node_ref, timestamp, disk_used) VALUES (1, ?, ?, ?)",
+                [(1, edge - 1, 1024**3), (2, edge + 1, 2 * 1024**3)]
+            )
+            await db.commit()
+
+        with patch('webapp.database.get_settings', return_value=mock_settings):
+            total = await DatabaseManager().get_fleet_history(['disk'], hours=1, combine='total', max_points=60)
+
+        assert total['bucket_seconds'] == 60
+        assert [(point['timestamp'], point['disk']['used_gb']) for point in total['series']['total']] == [
+            (time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(edge - 60)), 3.0)
+        ]
+
+    async def test_rollup_migration_backfills_history(self, temp_db):
+        """Test that the rollup schema revision aggregates existing raw samples."""
+        from storj_monitor.db import apply_migrations
+
+        async with aiosqlite.connect(temp_db) as db:
+            await db.executemany(
+                "INSERT INTO metrics_disk (node_name, timestamp, used_bytes, available_bytes) VALUES (?, ?, ?, ?)",
+                [("test_node1", "2025-01-01 10:05:00", 10, 0),
+                 ("test_node1", "2025-01-01 10:55:00", 30, 0),
+                 ("test_node1", "2025-01-01 11:05:00", 20, 0)]
+            )
+            await db.commit()
+            await apply_migrations(db)
+
+            cursor = await db.execute("""
+                SELECT datetime(bucket, 'unixepoch'), samples, min_value, max_value, last_value
+                FROM metrics_rollup_hourly WHERE metric = 'disk_used' ORDER BY bucket
+            """)
+            assert await cursor.fetchall() == [
+                ("2025-01-01 10:00:00", 2, 10, 30, 30),
+                ("2025-01-01 11:00:00", 1, 20, 20, 20)
+            ]
+            cursor = await db.execute(
+                "SELECT samples, sum_value FROM metrics_rollup_daily WHERE metric = 'disk_used'"
+            )
+            assert await cursor.fetchall() == [(3, 60)]
+            # Rollup rows reference the node instead of repeating its name
+            cursor = await db.execute(
+                "SELECT DISTINCT n.name FROM metrics_rollup_hourly r JOIN nodes n ON n.id = r.node_ref"
+            )
+            assert await cursor.fetchall() == [("test_node1",)]
+
+    async def test_retention_deletes_expired_rows_and_reclaims_space(self, mock_settings, tmp_path):
+        """Test that retention batches deletes per table and shrinks the database file."""
+        from storj_monitor.db import apply_migrations, connect_database
+        from collector.retention import RetentionEngine
+
+        mock_settings.database.path = str(tmp_path / "retention.db")
+        mock_settings.retention.batch_size = 100
+        mock_settings.retention.batch_pause_ms = 0
+
+        db = await connect_database(mock_settings.database)
+        try:
+            await apply_migrations(db)
+            padding = 'x' * 500
+            await db.execute("INSERT INTO nodes (name, dashboard_url) VALUES ('test_node1', '')")
+            await db.executemany(
+                "INSERT INTO metrics_samples (cycle_id, node_ref, timestamp, version) VALUES (?, 1, ?, ?)",
+                [(cycle, 1577836800, padding) for cycle in range(1050)]  # 2020-01-01
+                + [(cycle, int(time.time()), padding) for cycle in range(1050, 1055)]
+            )
+            await db.execute("""
+                INSERT INTO metrics_rollup_daily (node_ref, metric, bucket, samples)
+                VALUES (1, 'disk_used', 0, 1)
+            """)
+            await db.commit()
+        finally:
+            await db.close()
+
+        report = await RetentionEngine(mock_settings).run()
+
+        assert report['rows_deleted']['metrics_samples'] == 1050
+        assert 'metrics_rollup_daily' not in report['rows_deleted']  # kept forever
+        assert report['bytes_freed'] > 0
+
+        async with aiosqlite.connect(mock_settings.database.path) as db:
+            cursor = await db.execute("SELECT COUNT(*) FROM metrics_samples")
+            assert (await cursor.fetchone())[0] == 5
+            # Counters followed the inserts and the batched deletes
+            cursor = await db.execute("""
+                SELECT row_count, oldest = (SELECT MIN(timestamp) FROM metrics_samples)
+                FROM table_counters WHERE table_name = 'metrics_samples'
+            """)
+            assert await cursor.fetchone() == (5, 1)
+            cursor = await db.execute("SELECT COUNT(*) FROM metrics_rollup_daily")
+            assert (await cursor.fetchone())[0] == 1
+            cursor = await db.execute("PRAGMA freelist_count")
+            assert (await cursor.fetchone())[0] == 0
+
+    async def test_retention_keeps_referenced_cycles_and_current_satellite_status(self, mock_settings, tmp_path):
+        """Test that cycles outlive their samples and the newest satellite version never expires."""
+        from storj_monitor.config import RetentionConfig
+        from storj_monitor.db import apply_migrations, connect_database
+        from collector.retention import RetentionEngine
+
+        assert RetentionConfig().enabled is False  # opt-in
+        mock_settings.database.path = str(tmp_path / "retention.db")
+        mock_settings.retention.batch_pause_ms = 0
+        mock_settings.retention.tables = {
+            'metrics_samples': 30, 'collection_cycles': 1, 'node_satellites': 14
+        }
+        day = 86400
+        now = int(time.time())
+
+        db = await connect_database(mock_settings.database)
+        try:
+            await apply_migrations(db)
+            await db.execute("INSERT INTO nodes (name, dashboard_url) VALUES ('test_node1', '')")
+            await db.executemany("INSERT INTO satellites (satellite_id, name) VALUES (?, ?)",
+                                 [("sat_a", "a"), ("sat_b", "b")])
+            await db.executemany(
+                "INSERT INTO collection_cycles (id, started_at, finished_at, node_count, error_count) "
+                "VALUES (?, ?, ?, 1, 0)", [(1, now - 10 * day, now - 10 * day), (2, now - 40 * day, now - 40 * day)]
+            )
+            await db.executemany(
+                "INSERT INTO metrics_samples (cycle_id, node_ref, timestamp) VALUES (?, 1, ?)",
+                [(1, now - 10 * day), (2, now - 40 * day)]
+            )
+            # sat_a changed twice long ago; sat_b never changed
+            await db.executemany(
+                "INSERT INTO node_satellites (node_ref, satellite_ref, timestamp, last_seen) VALUES (1, ?, ?, ?)",
+                [(1, now - 60 * day, now), (1, now - 50 * day, now), (2, now - 60 * day, now)]
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+        engine = RetentionEngine(mock_settings)
+        assert engine.retention_days()['collection_cycles'] == 30
+        report = await engine.run()
+
+        assert report['rows_deleted'] == {'metrics_samples': 1, 'collection_cycles': 1, 'node_satellites': 1}
+        async with aiosqlite.connect(mock_settings.database.path) as db:
+            cursor = await db.execute("SELECT id FROM collection_cycles")
+            assert await cursor.fetchall() == [(1,)]
+            cursor = await db.execute("SELECT satellite_ref, timestamp FROM node_satellites ORDER BY satellite_ref")
+            assert await cursor.fetchall() == [(1, now - 50 * day), (2, now - 60 * day)]
+
+    async def test_epoch_timestamp_migration_and_history_cutoff(self, mock_settings, temp_db):
+        """Test that text sample times migrate to epoch seconds and range queries cut off correctly."""
+        from storj_monitor.db import apply_migrations
+        from webapp.database import DatabaseManager
+
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        recent = (now - timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')
+        expired = (now - timedelta(hours=30)).strftime('%Y-%m-%d %H:%M:%S')
+
+        async with aiosqlite.connect(temp_db) as db:
+            await db.executemany(
+                "INSERT INTO metrics_disk (node_name, timestamp, used_bytes, available_bytes) VALUES (?, ?, ?, ?)",
+                [("test_node1", expired, 1024**3, 0), ("test_node1", recent, 2 * 1024**3, 0)]
+            )
+            await db.commit()
+            await apply_migrations(db)
+
+            cursor = await db.execute("SELECT DISTINCT typeof(timestamp) FROM metrics_disk")
+            assert await cursor.fetchall() == [("integer",)]
+
+        with patch('webapp.database.get_settings', return_value=mock_settings):
+            history = await DatabaseManager().get_disk_usage_history("test_node1", hours=24)
+
+        assert history == [{
+            'timestamp': recent, 'used_gb': 2.0, 'available_gb': 0.0,
+            'trash_gb': 0.0, 'usage_percentage': 100.0
+        }]
+
+    async def test_reference_migration_keeps_history_readable(self, mock_settings, temp_db):
+        """Test that node names in history migrate to integer references."""
+        from storj_monitor.db import apply_migrations
+        from webapp.database import DatabaseManager
+
+        recent = (datetime.now(timezone.utc) - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+
+        async with aiosqlite.connect(temp_db) as db:
+            await db.execute(
+                "INSERT INTO metrics_disk (node_name, timestamp, used_bytes, available_bytes) VALUES (?, ?, ?, ?)",
+                ("test_node1", recent, 1024**3, 1024**3)
+            )
+            await db.execute(
+                "INSERT INTO metrics_health (node_name, timestamp, audit_score, suspension_score, online_score) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ("unconfigured_node", recent, 0.5, 1.0, 1.0)
+            )
+            await db.commit()
+            await apply_migrations(db)
+
+            cursor = await db.execute("SELECT typeof(node_ref) FROM metrics_disk")
+            assert await cursor.fetchall() == [("integer",)]
+            # Names only found in history are registered rather than dropped
+            cursor = await db.execute("SELECT COUNT(*) FROM nodes WHERE name = 'unconfigured_node'")
+            assert (await cursor.fetchone())[0] == 1
+
+        with patch('webapp.database.get_settings', return_value=mock_settings):
+            manager = DatabaseManager()
+            history = await manager.get_disk_usage_history("test_node1", hours=24)
+
+        assert [point['used_gb'] for point in history] == [1.0]
+
+    async def test_sample_migration_merges_legacy_rows(self, temp_db):
+        """Test that disk, bandwidth and health rows of one legacy cycle merge into one sample."""
+        from storj_monitor.db import apply_migrations
+
+        async with aiosqlite.connect(temp_db) as db:
+            await db.execute(
+                "INSERT INTO metrics_disk (node_name, timestamp, used_bytes, available_bytes) VALUES (?, ?, ?, ?)",
+                ("test_node1", "2025-01-01 10:00:00", 10, 90)
+            )
+            await db.execute(
+                "INSERT INTO metrics_bandwidth (node_name, timestamp, used_bytes) VALUES (?, ?, ?)",
+                ("test_node1", "2025-01-01 10:00:01", 5)
+            )
+            await db.execute(
+                "INSERT INTO metrics_health (node_name, timestamp, audit_score) VALUES (?, ?, ?)",
+                ("test_node1", "2025-01-01 10:00:02", 0.9)
+            )
+            await db.commit()
+            await apply_migrations(db)
+
+            cursor = await db.execute("""
+                SELECT datetime(timestamp, 'unixepoch'), disk_used, bandwidth_used, audit_score
+                FROM metrics_samples
+            """)
+            assert await cursor.fetchall() == [("2025-01-01 10:00:00", 10, 5, 0.9)]
+            cursor = await db.execute("SELECT COUNT(*) FROM collection_cycles")
+            assert (await cursor.fetchone())[0] == 1
+
+    async def test_samples_clustered_without_rowid(self, mock_settings, temp_db):
+        """Test that samples are keyed by node and time and still browsable without a rowid."""
+        from storj_monitor.db import apply_migrations, row_key_columns
+        from webapp.database import DatabaseManager
+
+        async with aiosqlite.connect(temp_db) as db:
+            await apply_migrations(db)
+            await db.executemany(
+                "INSERT INTO metrics_samples (cycle_id, node_ref, timestamp, disk_used) VALUES (?, 1, ?, ?)",
+                [(cycle, 1700000000 + cycle * 300, cycle) for cycle in range(3)]
+            )
+            await db.commit()
+
+            assert await row_key_columns(db, "metrics_samples") == ["node_ref", "timestamp", "cycle_id"]
+            assert await row_key_columns(db, "collection_cycles") == ["rowid"]
+
+        with patch('webapp.database.get_settings', return_value=mock_settings):
+            table = await DatabaseManager().get_table_data("metrics_samples", limit=2)
+
+        assert table["total_count"] == 3
+        assert table["has_more"] is True
+        assert [row["disk_used"] for row in table["data"]] == [2, 1]
+
+    async def test_schema_row_counts_do_not_scan_tables(self, mock_settings, temp_db, traced_connection):
+        """Test that the schema browser reports counters and estimates, and counts exactly only on request."""
+        from storj_monitor.db import apply_migrations
+        from webapp.database import DatabaseManager
+
+        async with aiosqlite.connect(temp_db) as db:
+            await apply_migrations(db)
+            await db.executemany(
+                "INSERT INTO metrics_samples (cycle_id, node_ref, timestamp) VALUES (?, 1, ?)",
+                [(cycle, 1700000000 + cycle * 300) for cycle in range(20)]
+            )
+            await db.executemany(
+                "INSERT INTO metrics_rollup_daily (node_ref, metric, bucket, samples) VALUES (1, ?, 0, 1)",
+                [(f"metric_{index}",) for index in range(7)]
+            )
+            await db.execute("CREATE VIEW sample_times AS SELECT timestamp FROM metrics_samples")
+            await db.commit()
+            await db.execute("ANALYZE")
+            await db.commit()
+
+        with patch('webapp.database.get_settings', return_value=mock_settings):
+            schema = await DatabaseManager().get_database_schema()
+            assert not [statement for statement in traced_connection if 'COUNT(' in statement.upper()]
+
+            tables = {table['name']: table for table in schema['tables']}
+            assert (tables['metrics_samples']['row_count'], tables['metrics_samples']['row_count_source']) == (20, 'counter')
+            assert (tables['metrics_rollup_daily']['row_count'], tables['metrics_rollup_daily']['row_count_source']) == (7, 'estimate')
+            views = {view['name']: view for view in schema['views']}
+            assert views['sample_times']['row_count'] is None
+
+            manager = DatabaseManager()
+            assert (await manager.count_rows('sample_times'))['row_count'] == 20
+            with pytest.raises(ValueError):
+                await manager.count_rows('missing; DROP TABLE nodes')
+
+    async def test_hot_queries_use_indexes(self, mock_settings, temp_db, traced_connection):
+        """Test via EXPLAIN QUERY PLAN that the web API's hot queries never scan a history table."""
+        from storj_monitor.db import apply_migrations
+        from webapp.database import DatabaseManager
+
+        async with aiosqlite.connect(temp_db) as db:
+            await apply_migrations(db)
+
+        with patch('webapp.database.get_settings', return_value=mock_settings):
+            manager = DatabaseManager()
+            await manager.get_latest_node_status()
+            await manager.get_node_status("test_node1")
+            await manager.get_system_summary()
+            for hours in (24, 8760):
+                await manager.get_disk_usage_history("test_node1", hours)
+                await manager.get_bandwidth_usage_history("test_node1", hours)
+                await manager.get_health_metrics_history("test_node1", hours)
+                await manager.get_fleet_history(['disk', 'bandwidth', 'health'], hours)
+            await manager.get_daily_bandwidth_summary("test_node1")
+            await manager.get_recent_events()
+            await manager.get_node_satellite_status("test_node1")
+
+        history_tables = ('metrics_samples', 'metrics_rollup_hourly', 'metrics_rollup_daily',
+                          'metrics_daily_bandwidth', 'metrics_daily_storage', 'node_satellites', 'events')
+        queries = [statement for statement in traced_connection if statement.lstrip().upper().startswith('SELECT')]
+        assert queries
+
+        async with aiosqlite.connect(temp_db) as db:
+            # A scan through any index, covering or partial, still walks the whole table
+            for query in queries:
+                cursor = await db.execute(f"EXPLAIN QUERY PLAN {query}")
+                for *_, detail in await cursor.fetchall():
+                    assert not any(detail.startswith(f"SCAN {table}") for table in history_tables), (detail, query)
+
+    async def test_daily_upsert_only_touches_changed_rows(self, mock_settings, temp_db):
+        """Test that re-sent daily metrics only rewrite days whose values changed."""
+        from storj_monitor.models import DailyBandwidthMetrics, DailyStorageMetrics
+
+        days = [date(2025, 9, day) for day in range(1, 31)]
+
+        def daily_metrics(today_ingress):
+            return {
+                'daily_bandwidth': [
+                    DailyBandwidthMetrics(node_name="test_node1", date=day,
+                                          ingress_usage_bytes=today_ingress if day == days[-1] else 100)
+                    for day in days
+                ],
+                'daily_storage': [
+                    DailyStorageMetrics(node_name="test_node1", date=day, at_rest_total_bytes=200)
+                    for day in days
+                ]
+            }
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+
+                touched = await collector.store_metrics(daily_metrics(100))
+                assert touched['metrics_daily_bandwidth'] == 30
+                assert touched['metrics_daily_storage'] == 30
+
+                async with aiosqlite.connect(temp_db) as db:
+                    cursor = await db.execute("SELECT date, id FROM metrics_daily_bandwidth")
+                    ids_before = dict(await cursor.fetchall())
+
+                # Same month re-sent with only today's value grown
+                touched = await collector.store_metrics(daily_metrics(500))
+                assert touched['metrics_daily_bandwidth'] == 1
+                assert touched['metrics_daily_storage'] == 0
+                await collector.close()
+
+        async with aiosqlite.connect(temp_db) as db:
+            cursor = await db.execute("SELECT date, id, ingress_usage_bytes FROM metrics_daily_bandwidth")
+            rows = await cursor.fetchall()
+            # Updated in place: no row was deleted and re-inserted under a new id
+            assert {row[0]: row[1] for row in rows} == ids_before
+            assert {row[0]: row[2] for row in rows}[str(days[-1])] == 500
+
+    async def test_satellite_status_change_only_versions(self, mock_settings, temp_db, mock_node_response, mock_satellites_response):
+        """Test that node_satellites only grows when a tracked field changes."""
+        from storj_monitor.models import StorjNodeInfo, StorjSatelliteInfo
+
+        node_info = StorjNodeInfo(**mock_node_response())
+        satellite_info = StorjSatelliteInfo(**mock_satellites_response())
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+
+                def sample(audit_score=1.0, egress=0):
+                    statuses = collector.satellite_extractor.extract_satellite_status(
+                        "test_node1", node_info, satellite_info
+                    )
+                    for status in statuses:
+                        # One sample per collection interval
+                        status['timestamp'] = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=egress)
+                        status['audit_score'] = audit_score
+                        status['current_month_egress'] = egress
+                    return {'satellite_status': statuses}
+
+                touched = await collector.store_metrics(sample(egress=100))
+                assert touched['node_satellites'] == 1
+                touched = await collector.store_metrics(sample(egress=200))
+                assert touched['node_satellites'] == 0
+                last_sample = sample(audit_score=0.97, egress=300)
+                touched = await collector.store_metrics(last_sample)
+                assert touched['node_satellites'] == 1
+                await collector.store_metrics(sample(audit_score=0.97, egress=400))
+                await collector.close()
+
+        async with aiosqlite.connect(temp_db) as db:
+            cursor = await db.execute(
+                "SELECT audit_score, current_month_egress FROM node_satellites ORDER BY id"
+            )
+            assert await cursor.fetchall() == [(1.0, 200), (0.97, 400)]
+
+            # Latest status still reflects the most recent sample
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute("SELECT * FROM latest_satellite_status")
+            rows = await cursor.fetchall()
+            assert len(rows) == 1
+            assert rows[0]['audit_score'] == 0.97
+            assert rows[0]['current_month_egress'] == 400
+            cursor = await db.execute("SELECT datetime(MAX(last_seen), 'unixepoch') FROM node_satellites")
+            assert rows[0]['last_updated'] == (await cursor.fetchone())[0]
+
+    async def test_collector_runs_on_injected_settings(self, mock_settings, temp_db, mock_node_response):
+        """Test that a collector given settings needs no settings.yaml or global settings."""
+        from storj_monitor.models import StorjNodeInfo
+
+        with patch('storj_monitor.config.settings', None):
+            collector = StorjCollector(mock_settings)
+            node_info = StorjNodeInfo(**mock_node_response())
+            touched = await collector.store_metrics(
+                {'disk': [collector.extract_disk_metrics("test_node1", node_info)]}
+            )
+            await collector.close()
+
+        assert collector.settings is mock_settings
+        assert touched['metrics_samples'] == 1
+
+    async def test_store_metrics_reuses_and_reconnects_writer(self, mock_settings, temp_db, mock_node_response):
+        """Test that the writer connection persists, is tuned, and recovers."""
+        from storj_monitor.models import StorjNodeInfo
+
+        mock_settings.database.wal_mode = True
+        node_info = StorjNodeInfo(**mock_node_response())
+
+        with patch('collector.service.load_settings', return_value=mock_settings):
+            with patch('collector.service.setup_logging'):
+                collector = StorjCollector()
+                all_metrics = {'disk': [collector.extract_disk_metrics("test_node1", node_info)]}
+
+                await collector.store_metrics(all_metrics)
+                writer = collector.db
+                cursor = await writer.execute("PRAGMA journal_mode")
+                assert (await cursor.fetchone())[0] == "wal"
+                cursor = await writer.execute("PRAGMA busy_timeout")
+                assert (await cursor.fetchone())[0] == mock_settings.database.busy_timeout_ms
+
+                await collector.store_metrics(all_metrics)
+                assert collector.db is writer
+
+                # A faulty statement is raised as is, on the same live writer
+                bad_batch = [('nodes', "INSERT INTO nodes (name) VALUES (?)", [('a', 'b')])]
+                with patch.object(collector, 'build_metric_batches', return_value=bad_batch):
+                    with pytest.raises(sqlite3.ProgrammingError):
+                        await collector.store_metrics(all_metrics)
+                assert collector.db is writer
+
+                # Simulate the connection dying between cycles
+                await writer.close()
+                await collector.store_metrics(all_metrics)
+                assert collector.db is not writer
+
+                await collector.close()
+                assert collector.db is None
+
+        async with aiosqlite.connect(temp_db) as db:
+            cursor = await db.execute("SELECT COUNT(*) FROM metrics_disk")
+            assert (await cursor.fetchone())[0] == 3
+
     async def test_database_schema_integrity(self, temp_db):
         """Test that database schema is correctly applied."""
         async with aiosqlite.connect(temp_db) as db:
@@ -281,7 +1295,7 @@ class TestCollectorIntegration:
             assert 'latest_node_status' in views
             assert 'daily_summary' in views
 
-    async def test_data_extraction_accuracy(self, mock_settings):
+    async def test_data_extraction_accuracy(self, mock_settings, mock_node_response, mock_satellites_response):
         """Test that data extraction methods work correctly."""
         with patch('collector.service.load_settings', return_value=mock_settings):
             with patch('collector.service.setup_logging'):
@@ -290,8 +1304,8 @@ class TestCollectorIntegration:
                 # Create mock data
                 from storj_monitor.models import StorjNodeInfo, StorjSatelliteInfo
                 
-                node_data = self.create_mock_node_response()
-                satellite_data = self.create_mock_satellites_response()
+                node_data = mock_node_response()
+                satellite_data = mock_satellites_response()
                 
                 node_info = StorjNodeInfo(**node_data)
                 satellite_info = StorjSatelliteInfo(**satellite_data)
@@ -322,33 +1336,54 @@ class TestCollectorIntegration:
 class TestAPIIntegration:
     """Integration tests for the web API."""
     
+    @pytest.fixture
+    async def temp_db(self, tmp_path):
+        """Create a fully migrated temporary database with one test node."""
+        from storj_monitor.db import apply_migrations
+
+        db_path = tmp_path / "api.db"
+        async with aiosqlite.connect(db_path) as db:
+            await apply_migrations(db)
+            await db.execute(
+                "INSERT INTO nodes (name, dashboard_url, description) VALUES (?, ?, ?)",
+                ("test_node1", "http://192.168.177.133:14002", "Test Node 1")
+            )
+            await db.commit()
+        return db_path
+
     @pytest.fixture
     async def test_app(self, temp_db):
-        """Create test FastAPI application."""
-        from webapp.server import app
-        from webapp.database import DatabaseManager
-        
-        # Mock the database path
-        with patch.object(DatabaseManager, '__init__', lambda self: setattr(self, 'db_path', Path(temp_db))):
-            yield app
+        """Create test FastAPI application reading the temporary database."""
+        settings = Settings(
+            nodes=[{"name": "test_node1", "dashboard_url": "http://192.168.177.133:14002"}],
+            database={"path": str(temp_db)}
+        )
+        # The server module loads its settings on import
+        with patch('storj_monitor.config.settings', settings):
+            with patch('storj_monitor.config.load_settings', return_value=settings):
+                from webapp.server import app
+                yield app
 
     async def test_api_endpoints_basic(self, test_app, temp_db):
         """Test basic API endpoint functionality."""
-        from httpx import AsyncClient
+        from httpx import ASGITransport, AsyncClient
         
-        # Add some test data to database
+        # Add one collection cycle with a sample for the test node
         async with aiosqlite.connect(temp_db) as db:
             await db.execute("""
-                INSERT INTO metrics_disk (node_name, used_bytes, available_bytes, trash_bytes)
-                VALUES ('test_node1', 1000000000, 9000000000, 50000000)
+                INSERT INTO collection_cycles (started_at, finished_at, node_count, error_count)
+                VALUES (1757890800, 1757890801, 1, 0)
             """)
             await db.execute("""
-                INSERT INTO metrics_health (node_name, version, audit_score, suspension_score, online_score, satellites_count, uptime_seconds, last_pinged)
-                VALUES ('test_node1', '1.136.4', 0.999, 1.0, 0.98, 4, 86400, '2025-09-14T23:00:00Z')
+                INSERT INTO metrics_samples
+                (cycle_id, node_ref, timestamp, disk_used, disk_available, disk_trash,
+                 version, audit_score, suspension_score, online_score, satellites_count, uptime_seconds)
+                VALUES (1, (SELECT id FROM nodes WHERE name = 'test_node1'), 1757890800,
+                        1000000000, 9000000000, 50000000, '1.136.4', 0.999, 1.0, 0.98, 4, 86400)
             """)
             await db.commit()
         
-        async with AsyncClient(app=test_app, base_url="http://test") as client:
+        async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test") as client:
             # Test health endpoint
             response = await client.get("/health")
             assert response.status_code == 200
@@ -359,7 +1394,9 @@ class TestAPIIntegration:
             response = await client.get("/api/system/summary")
             assert response.status_code == 200
             data = response.json()
-            assert "node_count" in data
+            assert data["node_count"] == 1
+            assert data["total_records"] == 1
+            assert data["last_cycle"]["id"] == 1
             assert "storage_summary" in data
 
 
@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 from storj_monitor.utils import (
     bytes_to_human_readable, human_readable_to_bytes, 
     timestamp_to_datetime, calculate_uptime_seconds,
-    safe_int, safe_float
+    safe_int, safe_float, downsample_lttb
 )
 
 
@@ -130,5 +130,26 @@ class TestSafeConversions:
         assert safe_float("invalid", 999.9) == 999.9
 
 
+class TestDownsampling:
+    """Test LTTB downsampling."""
+
+    def test_downsample_lttb_bounds_and_keeps_extremes(self):
+        """Test that a long series is cut to max_points, keeping its ends and a spike."""
+        points = [{'x': i, 'y': 100 if i == 537 else i % 10} for i in range(5000)]
+        sampled = downsample_lttb(points, 200, lambda point: point['y'])
+
+        assert len(sampled) == 200
+        assert sampled[0] is points[0] and sampled[-1] is points[-1]
+        assert points[537] in sampled
+        assert [point['x'] for point in sampled] == sorted(point['x'] for point in sampled)
+
+    def test_downsample_lttb_short_series(self):
+        """Test that series already within max_points are returned unchanged."""
+        assert downsample_lttb([1, 2, 3], 3, float) == [1, 2, 3]
+        assert downsample_lttb([], 10, float) == []
+        with pytest.raises(ValueError):
+            downsample_lttb([1, 2, 3, 4], 2, float)
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -1,37 +1,119 @@
 """Database access layer for the web API."""
 
 import aiosqlite
-from datetime import datetime, date, timedelta
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import logging
 
 from storj_monitor.config import get_settings
+from storj_monitor.db import ConnectionPool, row_key_columns, select_rollup_tier
 from storj_monitor.models import NodeStatus, NodeSatelliteStatus, VettingSummary, SatelliteInfo
-from storj_monitor.utils import bytes_to_human_readable
+from storj_monitor.utils import bytes_to_human_readable, downsample_lttb
 
 
 logger = logging.getLogger(__name__)
 
+# Sample columns behind each fleet history metric
+FLEET_HISTORY_COLUMNS = {
+    'disk': ('disk_used', 'disk_available', 'disk_trash'),
+    'bandwidth': ('bandwidth_used',),
+    'health': ('audit_score', 'suspension_score', 'online_score'),
+}
+
+# Columns the fleet total averages across nodes instead of summing
+FLEET_AVERAGED_COLUMNS = ('audit_score', 'suspension_score', 'online_score')
+
+
+def format_history_point(metric: str, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Format one point of a fleet history metric the way the per-node history endpoints do."""
+    if metric == 'disk':
+        used = values.get('disk_used') or 0
+        available = values.get('disk_available') or 0
+        return {
+            'used_gb': round(used / (1024**3), 2),
+            'available_gb': round(available / (1024**3), 2),
+            'trash_gb': round((values.get('disk_trash') or 0) / (1024**3), 2),
+            'usage_percentage': round((used / (used + available) * 100), 2) if (used + available) > 0 else 0
+        }
+    if metric == 'bandwidth':
+        return {'used_gb': round((values.get('bandwidth_used') or 0) / (1024**3), 2)}
+    return {
+        column: round(values[column], 4) if values.get(column) is not None else None
+        for column in FLEET_HISTORY_COLUMNS['health']
+    }
+
 
 class DatabaseManager:
     """Manages database connections and queries for the web API."""
 
+    # App-lifetime read pool, opened by the web server's lifespan hook.
+    # Without it (scripts, tests) every query opens its own connection.
+    pool: Optional[ConnectionPool] = None
+
     def __init__(self):
         self.settings = get_settings()
         self.db_path = Path(self.settings.database.path)
+        # Set while read_snapshot() is open; every query then shares it
+        self._snapshot_db: Optional[aiosqlite.Connection] = None
 
     def get_connection(self):
-        """Get a database connection."""
+        """Get a database connection, borrowed from the pool when one is open."""
+        if self._snapshot_db is not None:
+            return self._shared_connection(self._snapshot_db)
+        if self.pool is not None:
+            return self.pool.connection()
         return aiosqlite.connect(self.db_path)
 
+    @staticmethod
+    @asynccontextmanager
+    async def _shared_connection(db: aiosqlite.Connection) -> AsyncIterator[aiosqlite.Connection]:
+        yield db
+
+    @asynccontextmanager
+    async def read_snapshot(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Run every query made inside the block on one connection and one read transaction.
+
+        All of them see the database as of the first read, even if the
+        collector commits a cycle in between.
+        """
+        async with self.get_connection() as db:
+            await db.execute("BEGIN")
+            self._snapshot_db = db
+            try:
+                yield db
+            finally:
+                self._snapshot_db = None
+                await db.rollback()
+
+    async def get_dashboard(self, events_limit: int = 10, events_after: Optional[int] = None) -> Dict[str, Any]:
+        """Get everything the dashboard's first paint needs from one consistent snapshot."""
+        async with self.read_snapshot():
+            return {
+                'nodes': await self.get_latest_node_status(),
+                'summary': await self.get_system_summary(),
+                'events': await self.get_recent_events(events_limit, after=events_after),
+                'vetting': await self.get_vetting_summary(),
+                'satellites': await self.get_satellites(),
+            }
+
     async def get_latest_node_status(self) -> List[NodeStatus]:
-        """Get the latest status for all nodes."""
+        """Get the latest status for all nodes.
+
+        Both views read the node_latest and node_satellite_latest tables,
+        so this costs the same no matter how much history is stored.
+        """
         async with self.get_connection() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
-                SELECT * FROM node_overview_with_satellites
-                ORDER BY name
+                SELECT s.*, o.active_satellites, o.vetted_satellites,
+                       o.avg_vetting_progress, o.vetted_satellite_names
+                FROM latest_node_status s
+                JOIN node_overview_with_satellites o ON o.name = s.name
+                ORDER BY s.name
             """)
             rows = await cursor.fetchall()
             
@@ -48,53 +130,179 @@ class DatabaseManager:
             
             return NodeStatus(**dict(row)) if row else None
 
-    async def get_disk_usage_history(self, node_name: str, hours: int = 24) -> List[Dict[str, Any]]:
-        """Get disk usage history for a node."""
-        since_time = datetime.utcnow() - timedelta(hours=hours)
+    async def _rollup_history(self, db: aiosqlite.Connection, node_name: str,
+                              metrics: List[str], hours: int) -> Optional[List[Dict[str, Any]]]:
+        """Read a history window from the coarsest rollup tier that still fills it.
+
+        Returns one dict per bucket with the bucket start as 'timestamp' and
+        the bucket average of each metric, or None when the window is short
+        enough to be served from raw samples.
+        """
+        tier = select_rollup_tier(hours)
+        if tier is None:
+            return None
+        table, bucket_seconds = tier
+
+        since_bucket = (int(time.time()) - hours * 3600) // bucket_seconds * bucket_seconds
+        cursor = await db.execute(f"""
+            SELECT datetime(bucket, 'unixepoch') as timestamp, metric,
+                   sum_value / samples as value
+            FROM {table}
+            WHERE node_ref = (SELECT id FROM nodes WHERE name = ?)
+              AND bucket >= ? AND metric IN ({', '.join('?' for _ in metrics)})
+            ORDER BY bucket
+        """, (node_name, since_bucket, *metrics))
+
+        points: Dict[str, Dict[str, Any]] = {}
+        for row in await cursor.fetchall():
+            points.setdefault(row['timestamp'], {'timestamp': row['timestamp']})[row['metric']] = row['value']
+        return list(points.values())
+
+    async def get_disk_usage_history(self, node_name: str, hours: int = 24,
+                                     max_points: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get disk usage history for a node, downsampled to at most max_points when given."""
+        since_time = int(time.time()) - hours * 3600
         
         async with self.get_connection() as db:
             db.row_factory = aiosqlite.Row
-            cursor = await db.execute("""
-                SELECT timestamp, used_bytes, available_bytes, trash_bytes
-                FROM metrics_disk 
-                WHERE node_name = ? AND timestamp >= ?
-                ORDER BY timestamp
-            """, (node_name, since_time))
-            rows = await cursor.fetchall()
-            
-            return [
-                {
+            rows = await self._rollup_history(
+                db, node_name, ['disk_used', 'disk_available', 'disk_trash'], hours
+            )
+            if rows is None:
+                cursor = await db.execute("""
+                    SELECT datetime(timestamp, 'unixepoch') as timestamp, disk_used, disk_available, disk_trash
+                    FROM metrics_samples
+                    WHERE node_ref = (SELECT id FROM nodes WHERE name = ?) AND metrics_samples.timestamp >= ?
+                      AND disk_used IS NOT NULL
+                    ORDER BY metrics_samples.timestamp
+                """, (node_name, since_time))
+                rows = [dict(row) for row in await cursor.fetchall()]
+            if max_points:
+                rows = downsample_lttb(rows, max_points, lambda row: row.get('disk_used') or 0)
+            
+            history = []
+            for row in rows:
+                used = row.get('disk_used') or 0
+                available = row.get('disk_available') or 0
+                history.append({
                     'timestamp': row['timestamp'],
-                    'used_gb': round(row['used_bytes'] / (1024**3), 2),
-                    'available_gb': round(row['available_bytes'] / (1024**3), 2),
-                    'trash_gb': round(row['trash_bytes'] / (1024**3), 2),
-                    'usage_percentage': round((row['used_bytes'] / (row['used_bytes'] + row['available_bytes']) * 100), 2) if (row['used_bytes'] + row['available_bytes']) > 0 else 0
-                }
-                for row in rows
-            ]
+                    'used_gb': round(used / (1024**3), 2),
+                    'available_gb': round(available / (1024**3), 2),
+                    'trash_gb': round((row.get('disk_trash') or 0) / (1024**3), 2),
+                    'usage_percentage': round((used / (used + available) * 100), 2) if (used + available) > 0 else 0
+                })
+            return history
 
-    async def get_bandwidth_usage_history(self, node_name: str, hours: int = 24) -> List[Dict[str, Any]]:
-        """Get bandwidth usage history for a node."""
-        since_time = datetime.utcnow() - timedelta(hours=hours)
+    async def get_bandwidth_usage_history(self, node_name: str, hours: int = 24,
+                                          max_points: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get bandwidth usage history for a node, downsampled to at most max_points when given."""
+        since_time = int(time.time()) - hours * 3600
         
         async with self.get_connection() as db:
             db.row_factory = aiosqlite.Row
-            cursor = await db.execute("""
-                SELECT timestamp, used_bytes
-                FROM metrics_bandwidth 
-                WHERE node_name = ? AND timestamp >= ?
-                ORDER BY timestamp
-            """, (node_name, since_time))
-            rows = await cursor.fetchall()
+            rows = await self._rollup_history(db, node_name, ['bandwidth_used'], hours)
+            if rows is None:
+                cursor = await db.execute("""
+                    SELECT datetime(timestamp, 'unixepoch') as timestamp, bandwidth_used
+                    FROM metrics_samples
+                    WHERE node_ref = (SELECT id FROM nodes WHERE name = ?) AND metrics_samples.timestamp >= ?
+                      AND bandwidth_used IS NOT NULL
+                    ORDER BY metrics_samples.timestamp
+                """, (node_name, since_time))
+                rows = [dict(row) for row in await cursor.fetchall()]
+            if max_points:
+                rows = downsample_lttb(rows, max_points, lambda row: row.get('bandwidth_used') or 0)
             
             return [
                 {
                     'timestamp': row['timestamp'],
-                    'used_gb': round(row['used_bytes'] / (1024**3), 2)
+                    'used_gb': round((row.get('bandwidth_used') or 0) / (1024**3), 2)
                 }
                 for row in rows
             ]
 
+    async def get_fleet_history(self, metrics: List[str], hours: int = 24, combine: str = 'nodes',
+                                max_points: int = 300) -> Dict[str, Any]:
+        """Get time-bucketed history of every node from one query.
+
+        The window is cut into at most max_points equal buckets, read from
+        raw samples or, for long windows, from the rollup tier the per-node
+        endpoints use. Raw samples are bucketed by the start of their
+        collection cycle, so the nodes of one cycle always share a bucket
+        even when it is narrower than the poll interval. Each point holds
+        the bucket average per node; with
+        combine='total' the nodes are added up into one 'total' series
+        (scores are averaged instead). Every point carries one entry per
+        requested metric, formatted like the per-node history endpoints.
+        """
+        columns = [column for metric in metrics for column in FLEET_HISTORY_COLUMNS[metric]]
+        tier = select_rollup_tier(hours)
+        min_width = tier[1] if tier else 60
+        # Round the bucket width up to a whole number of source buckets
+        width = max(min_width, -(-hours * 3600 // max_points))
+        width = -(-width // min_width) * min_width
+        since = (int(time.time()) - hours * 3600) // width * width
+
+        async with self.get_connection() as db:
+            if tier is None:
+                cursor = await db.execute(f"""
+                    SELECT c.started_at / {width} * {width} as bucket, n.name as node_name,
+                           {', '.join(f'AVG({column}) as {column}' for column in columns)}
+                    FROM metrics_samples s
+                    JOIN collection_cycles c ON c.id = s.cycle_id
+                    JOIN nodes n ON n.id = s.node_ref
+                    WHERE s.timestamp >= ? AND c.started_at >= ?
+                    GROUP BY bucket, s.node_ref
+                    ORDER BY bucket
+                """, (since, since))
+                rows = {
+                    (row[0], row[1]): dict(zip(columns, row[2:])) for row in await cursor.fetchall()
+                }
+            else:
+                # node_ref IN (...) lets each node's range be a primary key search
+                cursor = await db.execute(f"""
+                    SELECT r.bucket / {width} * {width} as wide_bucket, n.name, r.metric,
+                           SUM(r.sum_value) / SUM(r.samples)
+                    FROM {tier[0]} r
+                    JOIN nodes n ON n.id = r.node_ref
+                    WHERE r.node_ref IN (SELECT id FROM nodes)
+                      AND r.metric IN ({', '.join('?' for _ in columns)})
+                      AND r.bucket >= ?
+                    GROUP BY wide_bucket, r.node_ref, r.metric
+                    ORDER BY wide_bucket
+                """, (*columns, since))
+                rows = {}
+                for bucket, node_name, column, value in await cursor.fetchall():
+                    rows.setdefault((bucket, node_name), dict.fromkeys(columns))[column] = value
+
+        if combine == 'total':
+            totals: Dict[int, Dict[str, Any]] = {}
+            for (bucket, _), values in rows.items():
+                total = totals.setdefault(bucket, {'nodes': 0, **dict.fromkeys(columns, 0)})
+                total['nodes'] += 1
+                for column in columns:
+                    total[column] += values[column] or 0
+            for total in totals.values():
+                for column in FLEET_AVERAGED_COLUMNS:
+                    if column in columns:
+                        total[column] /= total['nodes']
+            rows = {(bucket, 'total'): values for bucket, values in totals.items()}
+
+        series: Dict[str, List[Dict[str, Any]]] = {}
+        for (bucket, name), values in sorted(rows.items()):
+            point = {'timestamp': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(bucket))}
+            for metric in metrics:
+                point[metric] = format_history_point(metric, values)
+            series.setdefault(name, []).append(point)
+
+        return {
+            'hours': hours,
+            'bucket_seconds': width,
+            'combine': combine,
+            'metrics': metrics,
+            'series': series
+        }
+
     async def get_daily_bandwidth_summary(self, node_name: str, days: int = 30) -> List[Dict[str, Any]]:
         """Get daily bandwidth summary for a node."""
         since_date = date.today() - timedelta(days=days)
@@ -119,35 +327,55 @@ class DatabaseManager:
                 for row in rows
             ]
 
-    async def get_health_metrics_history(self, node_name: str, hours: int = 24) -> List[Dict[str, Any]]:
-        """Get health metrics history for a node."""
-        since_time = datetime.utcnow() - timedelta(hours=hours)
+    async def get_health_metrics_history(self, node_name: str, hours: int = 24,
+                                         max_points: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get health metrics history for a node, downsampled to at most max_points when given.
+
+        Points are picked by the lowest of the three scores, so dips in
+        any of them are kept.
+        """
+        since_time = int(time.time()) - hours * 3600
         
         async with self.get_connection() as db:
             db.row_factory = aiosqlite.Row
-            cursor = await db.execute("""
-                SELECT timestamp, audit_score, suspension_score, online_score, 
-                       uptime_seconds, satellites_count
-                FROM metrics_health 
-                WHERE node_name = ? AND timestamp >= ?
-                ORDER BY timestamp
-            """, (node_name, since_time))
-            rows = await cursor.fetchall()
+            rows = await self._rollup_history(
+                db, node_name,
+                ['audit_score', 'suspension_score', 'online_score', 'uptime_seconds', 'satellites_count'],
+                hours
+            )
+            if rows is None:
+                cursor = await db.execute("""
+                    SELECT datetime(timestamp, 'unixepoch') as timestamp, audit_score, suspension_score, online_score,
+                           uptime_seconds, satellites_count
+                    FROM metrics_samples
+                    WHERE node_ref = (SELECT id FROM nodes WHERE name = ?) AND metrics_samples.timestamp >= ?
+                      AND audit_score IS NOT NULL
+                    ORDER BY metrics_samples.timestamp
+                """, (node_name, since_time))
+                rows = [dict(row) for row in await cursor.fetchall()]
+            if max_points:
+                rows = downsample_lttb(rows, max_points, lambda row: min(
+                    row.get('audit_score') or 0, row.get('suspension_score') or 0, row.get('online_score') or 0
+                ))
             
             return [
                 {
                     'timestamp': row['timestamp'],
-                    'audit_score': round(row['audit_score'], 4),
-                    'suspension_score': round(row['suspension_score'], 4),
-                    'online_score': round(row['online_score'], 4),
-                    'uptime_hours': round(row['uptime_seconds'] / 3600, 1),
-                    'satellites_count': row['satellites_count']
+                    'audit_score': round(row.get('audit_score') or 0, 4),
+                    'suspension_score': round(row.get('suspension_score') or 0, 4),
+                    'online_score': round(row.get('online_score') or 0, 4),
+                    'uptime_hours': round((row.get('uptime_seconds') or 0) / 3600, 1),
+                    'satellites_count': round(row['satellites_count']) if row.get('satellites_count') is not None else None
                 }
                 for row in rows
             ]
 
     async def get_system_summary(self) -> Dict[str, Any]:
-        """Get overall system summary."""
+        """Get overall system summary.
+
+        None of its queries grows with the amount of history stored: sample
+        counts and time bounds come from trigger-maintained counters.
+        """
         async with self.get_connection() as db:
             db.row_factory = aiosqlite.Row
             
@@ -155,8 +383,15 @@ class DatabaseManager:
             cursor = await db.execute("SELECT COUNT(*) as node_count FROM nodes")
             node_count = (await cursor.fetchone())['node_count']
             
-            cursor = await db.execute("SELECT COUNT(*) as total_records FROM metrics_disk")
-            total_records = (await cursor.fetchone())['total_records']
+            # Row count and time bounds of the samples, kept up to date by triggers
+            cursor = await db.execute("""
+                SELECT row_count as total_records,
+                       datetime(oldest, 'unixepoch') as oldest,
+                       datetime(newest, 'unixepoch') as newest
+                FROM table_counters
+                WHERE table_name = 'metrics_samples'
+            """)
+            samples = await cursor.fetchone()
             
             # Get latest metrics summary
             cursor = await db.execute("""
@@ -176,19 +411,26 @@ class DatabaseManager:
             cursor = await db.execute("SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()")
             db_size = (await cursor.fetchone())['size']
             
-            # Get oldest and newest records
-            cursor = await db.execute("SELECT MIN(timestamp) as oldest, MAX(timestamp) as newest FROM metrics_disk")
-            time_range = await cursor.fetchone()
+            # Get the most recent collection cycle
+            cursor = await db.execute("""
+                SELECT id, datetime(started_at, 'unixepoch') as started_at,
+                       finished_at - started_at as duration_seconds, node_count, error_count
+                FROM collection_cycles
+                ORDER BY id DESC
+                LIMIT 1
+            """)
+            last_cycle = await cursor.fetchone()
             
             return {
                 'node_count': node_count,
                 'active_nodes': summary_row['active_nodes'] if summary_row else 0,
-                'total_records': total_records,
+                'total_records': samples['total_records'] if samples else 0,
                 'database_size_mb': round(db_size / (1024**2), 2) if db_size else 0,
                 'data_range': {
-                    'oldest': time_range['oldest'],
-                    'newest': time_range['newest']
+                    'oldest': samples['oldest'] if samples else None,
+                    'newest': samples['newest'] if samples else None
                 },
+                'last_cycle': dict(last_cycle) if last_cycle else None,
                 'storage_summary': {
                     'total_used_gb': round((summary_row['total_disk_used'] or 0) / (1024**3), 2),
                     'total_available_gb': round((summary_row['total_disk_available'] or 0) / (1024**3), 2),
@@ -201,56 +443,90 @@ class DatabaseManager:
                 }
             }
 
-    async def get_recent_events(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get recent important events (score drops, downtimes, etc.)."""
+    async def get_recent_events(self, limit: int = 50, before: Optional[int] = None,
+                                after: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get recent node events (score changes, downtimes, restarts, etc.), newest first.
+
+        Events are paged by id: pass the id of the last event received as
+        before to get the next older page, or the newest id already seen as
+        after to get only newer events.
+        """
         async with self.get_connection() as db:
             db.row_factory = aiosqlite.Row
-            
-            # Get recent health metrics with potential issues
             cursor = await db.execute("""
-                SELECT node_name, timestamp, audit_score, suspension_score, online_score
-                FROM metrics_health 
-                WHERE audit_score < 0.99 OR suspension_score < 0.99 OR online_score < 0.95
-                ORDER BY timestamp DESC
+                SELECT e.id, datetime(e.timestamp, 'unixepoch') as timestamp, n.name as node_name,
+                       e.severity as type, e.event_type, e.message
+                FROM events e
+                JOIN nodes n ON n.id = e.node_ref
+                WHERE e.id < ? AND e.id > ?
+                ORDER BY e.id DESC
                 LIMIT ?
-            """, (limit,))
-            rows = await cursor.fetchall()
-            
-            events = []
-            for row in rows:
-                event_type = "warning"
-                message = f"Node {row['node_name']}"
-                details = []
-                
-                if row['audit_score'] < 0.95:
-                    event_type = "critical"
-                    details.append(f"audit score: {row['audit_score']:.3f}")
-                elif row['audit_score'] < 0.99:
-                    details.append(f"audit score: {row['audit_score']:.3f}")
-                
-                if row['suspension_score'] < 0.95:
-                    event_type = "critical"
-                    details.append(f"suspension score: {row['suspension_score']:.3f}")
-                elif row['suspension_score'] < 0.99:
-                    details.append(f"suspension score: {row['suspension_score']:.3f}")
-                
-                if row['online_score'] < 0.95:
-                    details.append(f"online score: {row['online_score']:.3f}")
-                
-                if details:
-                    message += f" - {', '.join(details)}"
-                    events.append({
-                        'timestamp': row['timestamp'],
-                        'node_name': row['node_name'],
-                        'type': event_type,
-                        'message': message
-                    })
-            
-            return events
+            """, (before if before is not None else sys.maxsize, after or 0, limit))
+            return [dict(row) for row in await cursor.fetchall()]
+
+    async def get_last_cycle_id(self) -> Optional[int]:
+        """Get the id of the most recent collection cycle (None before the first one)."""
+        async with self.get_connection() as db:
+            cursor = await db.execute("SELECT MAX(id) FROM collection_cycles")
+            return (await cursor.fetchone())[0]
+
+    async def get_last_event_id(self) -> Optional[int]:
+        """Get the id of the most recent event (None while there are none)."""
+        async with self.get_connection() as db:
+            cursor = await db.execute("SELECT MAX(id) FROM events")
+            return (await cursor.fetchone())[0]
+
+    async def _row_counts(self, db: aiosqlite.Connection) -> Dict[str, Tuple[int, str]]:
+        """Get (row count, source) per table without counting any rows.
+
+        Tables with trigger-maintained counters report them exactly
+        ('counter'); other tables report the sqlite_stat1 estimate the
+        retention run refreshes ('estimate'). Tables in neither are left out.
+        """
+        counts = {}
+        cursor = await db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        )
+        if await cursor.fetchone():
+            # The first number of each stat row is the table's row count
+            cursor = await db.execute(
+                "SELECT tbl, MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 GROUP BY tbl"
+            )
+            counts.update((table, (count, 'estimate')) for table, count in await cursor.fetchall())
+        cursor = await db.execute("SELECT table_name, row_count FROM table_counters")
+        counts.update((table, (count, 'counter')) for table, count in await cursor.fetchall())
+        return counts
+
+    async def count_rows(self, table_name: str) -> Dict[str, Any]:
+        """Count the rows of one table or view exactly (a full scan on large tables)."""
+        async with self.get_connection() as db:
+            await self._check_table_name(db, table_name)
+            cursor = await db.execute(f"SELECT COUNT(*) FROM {table_name}")
+            return {
+                "table_name": table_name,
+                "row_count": (await cursor.fetchone())[0],
+                "row_count_source": "exact"
+            }
+
+    @staticmethod
+    async def _check_table_name(db: aiosqlite.Connection, table_name: str) -> None:
+        """Raise ValueError unless table_name is an existing table or view (it is put into SQL)."""
+        cursor = await db.execute("""
+            SELECT name FROM sqlite_master 
+            WHERE type IN ('table', 'view') AND name = ?
+        """, (table_name,))
+        if not await cursor.fetchone():
+            raise ValueError(f"Table or view '{table_name}' not found")
 
     async def get_database_schema(self) -> Dict[str, Any]:
-        """Get database schema information."""
+        """Get database schema information.
+
+        Row counts come from counters or statistics (see _row_counts), so
+        listing the schema never scans a table. Views have no count until
+        one is requested from count_rows.
+        """
         async with self.get_connection() as db:
+            row_counts = await self._row_counts(db)
             db.row_factory = aiosqlite.Row
             
             # Get all tables
@@ -271,14 +547,13 @@ class DatabaseManager:
                 cursor = await db.execute(f"PRAGMA table_info({table_name})")
                 columns = await cursor.fetchall()
                 
-                # Get row count
-                cursor = await db.execute(f"SELECT COUNT(*) as count FROM {table_name}")
-                row_count = (await cursor.fetchone())['count']
+                row_count, source = row_counts.get(table_name, (None, None))
                 
                 table_info = {
                     "name": table_name,
                     "columns": [dict(col) for col in columns],
-                    "row_count": row_count
+                    "row_count": row_count,
+                    "row_count_source": source
                 }
                 
                 if table_type == 'table':
@@ -289,35 +564,34 @@ class DatabaseManager:
             return schema_info
 
     async def get_table_data(self, table_name: str, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
-        """Get data from a specific table or view."""
+        """Get data from a specific table or view.
+
+        total_count is the counter or estimate from the schema listing (None
+        when there is neither); has_more tells whether another page follows.
+        """
         async with self.get_connection() as db:
-            db.row_factory = aiosqlite.Row
-            
             # Validate table name to prevent SQL injection
-            cursor = await db.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type IN ('table', 'view') AND name = ?
-            """, (table_name,))
-            if not await cursor.fetchone():
-                raise ValueError(f"Table or view '{table_name}' not found")
-            
-            # Get total count
-            cursor = await db.execute(f"SELECT COUNT(*) as count FROM {table_name}")
-            total_count = (await cursor.fetchone())['count']
+            await self._check_table_name(db, table_name)
+            total_count, source = (await self._row_counts(db)).get(table_name, (None, None))
+            db.row_factory = aiosqlite.Row
             
-            # Get data with limit and offset
+            # Get data with limit and offset, last rows in key order first;
+            # one extra row tells whether there is a next page
+            order_by = ', '.join(f"{column} DESC" for column in await row_key_columns(db, table_name))
             cursor = await db.execute(
-                f"SELECT * FROM {table_name} ORDER BY rowid DESC LIMIT ? OFFSET ?", 
-                (limit, offset)
+                f"SELECT * FROM {table_name} ORDER BY {order_by} LIMIT ? OFFSET ?", 
+                (limit + 1, offset)
             )
             rows = await cursor.fetchall()
             
             # Convert rows to dictionaries
-            data = [dict(row) for row in rows]
+            data = [dict(row) for row in rows[:limit]]
             
             return {
                 "table_name": table_name,
                 "total_count": total_count,
+                "total_count_source": source,
+                "has_more": len(rows) > limit,
                 "limit": limit,
                 "offset": offset,
                 "data": data
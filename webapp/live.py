@@ -0,0 +1,134 @@
+"""Live dashboard updates pushed to browsers as Server-Sent Events."""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from .database import DatabaseManager
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between keep-alive comments on an idle stream, so proxies
+# don't close it between collection cycles
+KEEPALIVE_SECONDS = 15
+
+# Updates buffered per viewer; a viewer that falls further behind only
+# gets the newest ones, each update carries the full current state
+SUBSCRIBER_QUEUE_SIZE = 4
+
+
+def changed_fields(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the fields of current whose values differ from previous."""
+    return {key: value for key, value in current.items() if previous.get(key) != value}
+
+
+class CycleBroadcaster:
+    """Watches for new collection cycles and fans each one out to every open stream.
+
+    A single task checks for a new cycle (a primary key lookup) and, when
+    one lands, reads the update once and hands the encoded message to all
+    subscribers. Database load therefore depends on the collection rate,
+    not on how many dashboards are open, and nothing is read while no
+    dashboard is connected.
+
+    An update only carries what changed since the previous one: the
+    changed fields of each node and of the summary, the vetting entries
+    and satellites that changed, and the new events. The first update
+    after startup carries everything.
+    """
+
+    def __init__(self, poll_seconds: float = 5):
+        self.poll_seconds = poll_seconds
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.last_cycle_id: Optional[int] = None
+        self.last_event_id: Optional[int] = None
+        # Encoded state as of the last update, per node and vetting entry by node name
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.summary: Dict[str, Any] = {}
+        self.vetting: Dict[str, Dict[str, Any]] = {}
+        self.satellites: Optional[List[Dict[str, Any]]] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+
+    def publish(self, message: str) -> None:
+        """Queue a message for every subscriber, dropping a slow viewer's oldest update."""
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def build_update(self, db: DatabaseManager, cycle_id: int) -> Dict[str, Any]:
+        """Read the dashboard state after a cycle and return what changed since the last update."""
+        dashboard = jsonable_encoder(await db.get_dashboard(events_limit=500, events_after=self.last_event_id))
+        if dashboard['events']:
+            self.last_event_id = dashboard['events'][0]['id']
+        nodes = {node['name']: node for node in dashboard['nodes']}
+        vetting = {entry['node_name']: entry for entry in dashboard['vetting']}
+        node_changes = {name: changed_fields(self.nodes.get(name, {}), node) for name, node in nodes.items()}
+
+        update = {
+            'cycle_id': cycle_id,
+            'nodes': {name: fields for name, fields in node_changes.items() if fields},
+            'removed_nodes': [name for name in self.nodes if name not in nodes],
+            'summary': changed_fields(self.summary, dashboard['summary']),
+            'vetting': {name: entry for name, entry in vetting.items() if self.vetting.get(name) != entry},
+            'events': dashboard['events'],
+        }
+        if dashboard['satellites'] != self.satellites:
+            update['satellites'] = dashboard['satellites']
+
+        self.nodes, self.summary, self.vetting = nodes, dashboard['summary'], vetting
+        self.satellites = dashboard['satellites']
+        return update
+
+    async def check(self) -> bool:
+        """Publish an update if a new cycle landed since the last check; returns whether one was sent."""
+        db = DatabaseManager()
+        cycle_id = await db.get_last_cycle_id()
+        if self.last_cycle_id is None:
+            # First check only sets the baseline; dashboards load the current state themselves
+            self.last_cycle_id = cycle_id or 0
+            self.last_event_id = await db.get_last_event_id()
+            return False
+        if cycle_id is None or cycle_id <= self.last_cycle_id:
+            return False
+
+        update = await self.build_update(db, cycle_id)
+        self.last_cycle_id = cycle_id
+        self.publish(f"id: {cycle_id}\nevent: cycle\ndata: {json.dumps(update)}\n\n")
+        return True
+
+    async def run(self) -> None:
+        """Check for new cycles until cancelled, only while someone is listening."""
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            if not self.subscribers:
+                continue
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Error publishing live update: {e}")
+
+    async def stream(self, is_disconnected) -> AsyncIterator[str]:
+        """Yield one viewer's Server-Sent Events until it disconnects."""
+        queue = self.subscribe()
+        try:
+            # Reconnect delay for the browser's EventSource
+            yield "retry: 10000\n\n"
+            while not await is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(queue)
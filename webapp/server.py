@@ -1,35 +1,60 @@
 """FastAPI web server for Storj Monitor."""
 
+import asyncio
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional
 import logging
 
 # Add parent directory to path to import storj_monitor
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI, HTTPException, Query, Depends, Body
+from fastapi import FastAPI, HTTPException, Query, Depends, Body, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from storj_monitor.config import load_settings, get_settings
 from storj_monitor.models import NodeStatus
+from storj_monitor.db import ConnectionPool
 from storj_monitor.utils import setup_logging
 from .database import DatabaseManager
+from .live import CycleBroadcaster
 
 
 # Initialize settings and logging
 settings = load_settings()
 logger = setup_logging(settings.logging.level, "logs/webapp.log")
 
+# Shared by every live dashboard stream
+broadcaster = CycleBroadcaster(settings.web_server.stream_poll_seconds)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the read connection pool and the live update task for the lifetime of the app."""
+    pool = await ConnectionPool(settings.database).open()
+    DatabaseManager.pool = pool
+    logger.info(f"Opened {pool.size} pooled database connections")
+    broadcast_task = asyncio.create_task(broadcaster.run())
+    try:
+        yield
+    finally:
+        broadcast_task.cancel()
+        await asyncio.gather(broadcast_task, return_exceptions=True)
+        DatabaseManager.pool = None
+        await pool.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Storj Monitor API",
     description="REST API for monitoring Storj storage nodes",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -101,12 +126,13 @@ async def get_node(node_name: str, db: DatabaseManager = Depends(get_db_manager)
 @app.get("/api/nodes/{node_name}/disk-usage")
 async def get_disk_usage_history(
     node_name: str,
-    hours: int = Query(default=24, ge=1, le=168, description="Hours of history to fetch"),
+    hours: int = Query(default=24, ge=1, le=8760, description="Hours of history to fetch"),
+    max_points: Optional[int] = Query(default=None, ge=3, le=10000, description="Downsample to at most this many points"),
     db: DatabaseManager = Depends(get_db_manager)
 ):
     """Get disk usage history for a node."""
     try:
-        return await db.get_disk_usage_history(node_name, hours)
+        return await db.get_disk_usage_history(node_name, hours, max_points)
     except Exception as e:
         logger.error(f"Error fetching disk usage for {node_name}: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch disk usage data")
@@ -114,16 +140,36 @@ async def get_disk_usage_history(
 @app.get("/api/nodes/{node_name}/bandwidth-usage")
 async def get_bandwidth_usage_history(
     node_name: str,
-    hours: int = Query(default=24, ge=1, le=168, description="Hours of history to fetch"),
+    hours: int = Query(default=24, ge=1, le=8760, description="Hours of history to fetch"),
+    max_points: Optional[int] = Query(default=None, ge=3, le=10000, description="Downsample to at most this many points"),
     db: DatabaseManager = Depends(get_db_manager)
 ):
     """Get bandwidth usage history for a node."""
     try:
-        return await db.get_bandwidth_usage_history(node_name, hours)
+        return await db.get_bandwidth_usage_history(node_name, hours, max_points)
     except Exception as e:
         logger.error(f"Error fetching bandwidth usage for {node_name}: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch bandwidth usage data")
 
+@app.get("/api/fleet/history")
+async def get_fleet_history(
+    metric: List[Literal["disk", "bandwidth", "health"]] = Query(
+        default=["disk"], description="Metrics to include; repeat for several"
+    ),
+    hours: int = Query(default=24, ge=1, le=8760, description="Hours of history to fetch"),
+    combine: Literal["nodes", "total"] = Query(
+        default="nodes", description="One series per node, or one fleet total"
+    ),
+    max_points: int = Query(default=300, ge=3, le=10000, description="Maximum time buckets"),
+    db: DatabaseManager = Depends(get_db_manager)
+):
+    """Get time-bucketed history of every node (or the fleet total) in one request."""
+    try:
+        return await db.get_fleet_history(list(dict.fromkeys(metric)), hours, combine, max_points)
+    except Exception as e:
+        logger.error(f"Error fetching fleet history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch fleet history")
+
 @app.get("/api/nodes/{node_name}/daily-bandwidth")
 async def get_daily_bandwidth_summary(
     node_name: str,
@@ -140,12 +186,13 @@ async def get_daily_bandwidth_summary(
 @app.get("/api/nodes/{node_name}/health-metrics")
 async def get_health_metrics_history(
     node_name: str,
-    hours: int = Query(default=24, ge=1, le=168, description="Hours of history to fetch"),
+    hours: int = Query(default=24, ge=1, le=8760, description="Hours of history to fetch"),
+    max_points: Optional[int] = Query(default=None, ge=3, le=10000, description="Downsample to at most this many points"),
     db: DatabaseManager = Depends(get_db_manager)
 ):
     """Get health metrics history for a node."""
     try:
-        return await db.get_health_metrics_history(node_name, hours)
+        return await db.get_health_metrics_history(node_name, hours, max_points)
     except Exception as e:
         logger.error(f"Error fetching health metrics for {node_name}: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch health metrics data")
@@ -162,15 +209,45 @@ async def get_system_summary(db: DatabaseManager = Depends(get_db_manager)):
 @app.get("/api/system/events")
 async def get_recent_events(
     limit: int = Query(default=50, ge=1, le=500, description="Maximum number of events to return"),
+    before: Optional[int] = Query(default=None, ge=1, description="Only return events older than this event id"),
     db: DatabaseManager = Depends(get_db_manager)
 ):
-    """Get recent system events and alerts."""
+    """Get recent system events and alerts, newest first; page with the last event's id as before."""
     try:
-        return await db.get_recent_events(limit)
+        return await db.get_recent_events(limit, before)
     except Exception as e:
         logger.error(f"Error fetching recent events: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch recent events")
 
+@app.get("/api/dashboard")
+async def get_dashboard(
+    events_limit: int = Query(default=10, ge=1, le=500, description="Number of recent events to include"),
+    db: DatabaseManager = Depends(get_db_manager)
+):
+    """Get nodes, system summary, recent events, vetting summary and satellites in one response.
+
+    Everything is read on one connection within one read transaction, so
+    the sections always describe the same collection cycle.
+    """
+    try:
+        return await db.get_dashboard(events_limit)
+    except Exception as e:
+        logger.error(f"Error fetching dashboard: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch dashboard")
+
+@app.get("/api/stream")
+async def stream_updates(request: Request):
+    """Stream a Server-Sent Event each time a collection cycle lands.
+
+    Each 'cycle' event carries the same sections as /api/dashboard, with
+    only the events recorded since the previous update.
+    """
+    return StreamingResponse(
+        broadcaster.stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Configuration endpoint (read-only)
 @app.get("/api/config")
 async def get_config():
@@ -242,6 +319,17 @@ async def get_table_data(
         logger.error(f"Error fetching table data for {table_name}: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch table data")
 
+@app.get("/api/db/table/{table_name}/count")
+async def count_table_rows(table_name: str, db: DatabaseManager = Depends(get_db_manager)):
+    """Count the rows of a table or view exactly; a full scan on large tables."""
+    try:
+        return await db.count_rows(table_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error counting rows of {table_name}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to count rows")
+
 @app.post("/api/db/query")
 async def execute_query(
     query_data: dict = Body(...),
@@ -3,11 +3,15 @@
 class StorjMonitor {
     constructor() {
         this.apiBase = '/api';
-        this.refreshInterval = 900000; // 15 minutes (900,000ms)
+        this.refreshInterval = 900000; // 15 minutes (900,000ms), only used without live updates
+        this.refreshTimer = null;
+        this.eventSource = null;
         this.charts = {};
         this.currentView = 'dashboard';
         this.nodes = [];
         this.systemSummary = {};
+        this.events = [];
+        this.eventsPageSize = 100;
         
         this.init();
     }
@@ -27,9 +31,9 @@ class StorjMonitor {
             // Setup event listeners
             this.setupEventListeners();
             
-            console.log('Starting auto-refresh...');
-            // Start auto-refresh
-            this.startAutoRefresh();
+            console.log('Starting live updates...');
+            // Live updates per collection cycle, polling as the fallback
+            this.startLiveUpdates();
             
             console.log('Dashboard initialized successfully');
         } catch (error) {
@@ -42,27 +46,12 @@ class StorjMonitor {
         console.log('Loading initial data...');
         
         try {
-            // Load all required data
-            console.log('Loading nodes...');
-            await this.loadNodes();
+            // Load all required data in one request
+            console.log('Loading dashboard...');
+            await this.loadDashboard();
             console.log('Loaded nodes:', this.nodes);
-            
-            console.log('Loading system summary...');
-            await this.loadSystemSummary();
             console.log('Loaded system summary:', this.systemSummary);
             
-            console.log('Loading recent events...');
-            await this.loadRecentEvents();
-            console.log('Loaded recent events:', this.recentEvents);
-            
-            console.log('Loading vetting summary...');
-            await this.loadVettingSummary();
-            console.log('Loaded vetting summary:', this.vettingSummary);
-            
-            console.log('Loading satellites...');
-            await this.loadSatellites();
-            console.log('Loaded satellites:', this.satellites);
-            
             console.log('Updating dashboard UI...');
             // Update UI
             this.updateDashboard();
@@ -85,8 +74,52 @@ class StorjMonitor {
         }
     }
 
+    startLiveUpdates() {
+        if (!window.EventSource) {
+            this.startAutoRefresh();
+            return;
+        }
+
+        const source = new EventSource(`${this.apiBase}/stream`);
+        source.addEventListener('cycle', (event) => this.applyCycleUpdate(JSON.parse(event.data)));
+        source.onerror = () => {
+            // EventSource reconnects on its own; poll only once it gives up
+            if (source.readyState === EventSource.CLOSED) {
+                console.warn('Live updates unavailable, falling back to polling');
+                this.startAutoRefresh();
+            }
+        };
+        this.eventSource = source;
+    }
+
+    applyCycleUpdate(update) {
+        // Updates only carry what changed since the previous one
+        console.log('Collection cycle update:', update.cycle_id);
+        for (const [name, fields] of Object.entries(update.nodes)) {
+            const node = this.nodes.find(n => n.name === name);
+            if (node) {
+                Object.assign(node, fields);
+            } else {
+                this.nodes.push(fields);
+            }
+        }
+        this.nodes = this.nodes
+            .filter(node => !update.removed_nodes.includes(node.name))
+            .sort((a, b) => a.name.localeCompare(b.name));
+        this.systemSummary = {...this.systemSummary, ...update.summary};
+        for (const [name, entry] of Object.entries(update.vetting)) {
+            this.vettingSummary = (this.vettingSummary || []).filter(v => v.node_name !== name).concat([entry]);
+        }
+        if (update.satellites) {
+            this.satellites = update.satellites;
+        }
+        this.recentEvents = [...update.events, ...(this.recentEvents || [])].slice(0, 10);
+        this.updateCurrentView();
+    }
+
     startAutoRefresh() {
-        setInterval(async () => {
+        if (this.refreshTimer) return;
+        this.refreshTimer = setInterval(async () => {
             if (!document.hidden) {
                 await this.refreshData();
             }
@@ -125,31 +158,28 @@ class StorjMonitor {
         }
     }
 
-    async loadNodes() {
-        this.nodes = await this.apiCall('/nodes');
+    async loadDashboard() {
+        const dashboard = await this.apiCall('/dashboard?events_limit=10');
+        this.nodes = dashboard.nodes;
+        this.systemSummary = dashboard.summary;
+        this.recentEvents = dashboard.events;
+        this.vettingSummary = dashboard.vetting;
+        this.satellites = dashboard.satellites;
     }
 
-    async loadSystemSummary() {
-        this.systemSummary = await this.apiCall('/system/summary');
-    }
-
-    async loadRecentEvents() {
-        this.recentEvents = await this.apiCall('/system/events?limit=10');
-    }
-
-    async loadVettingSummary() {
-        this.vettingSummary = await this.apiCall('/vetting/summary');
-    }
-
-    async loadSatellites() {
-        this.satellites = await this.apiCall('/satellites');
+    historyMaxPoints() {
+        // About one point per horizontal pixel of the history charts
+        const canvas = document.getElementById('historyDiskChart');
+        return Math.min(2000, Math.max(100, Math.round(canvas?.clientWidth || 500)));
     }
 
     async loadNodeHistory(nodeName, hours = 24) {
+        // The server downsamples long windows so payload and render time stay bounded
+        const query = `hours=${hours}&max_points=${this.historyMaxPoints()}`;
         const [diskHistory, bandwidthHistory, healthHistory] = await Promise.all([
-            this.apiCall(`/nodes/${nodeName}/disk-usage?hours=${hours}`),
-            this.apiCall(`/nodes/${nodeName}/bandwidth-usage?hours=${hours}`),
-            this.apiCall(`/nodes/${nodeName}/health-metrics?hours=${hours}`)
+            this.apiCall(`/nodes/${nodeName}/disk-usage?${query}`),
+            this.apiCall(`/nodes/${nodeName}/bandwidth-usage?${query}`),
+            this.apiCall(`/nodes/${nodeName}/health-metrics?${query}`)
         ]);
         
         return { diskHistory, bandwidthHistory, healthHistory };
@@ -597,6 +627,24 @@ class StorjMonitor {
         }
     }
 
+    async createAggregateHistoryCharts(hours) {
+        // One request returns the summed fleet series for all three charts
+        try {
+            const query = `metric=disk&metric=bandwidth&metric=health&combine=total` +
+                `&hours=${hours}&max_points=${this.historyMaxPoints()}`;
+            const fleet = await this.apiCall(`/fleet/history?${query}`);
+            const total = fleet.series.total || [];
+            const pick = (metric) => total.map(point => ({ timestamp: point.timestamp, ...point[metric] }));
+            this.createHistoryCharts({
+                diskHistory: pick('disk'),
+                bandwidthHistory: pick('bandwidth'),
+                healthHistory: pick('health')
+            }, 'All nodes');
+        } catch (error) {
+            console.error('Failed to load fleet history:', error);
+        }
+    }
+
     createHistoryCharts(data, nodeName) {
         // Create individual charts for the selected node
         this.createHistoryDiskChart(data.diskHistory, nodeName);
@@ -764,9 +812,12 @@ class StorjMonitor {
         });
     }
 
-    async updateEventsTable() {
+    async updateEventsTable(before = null) {
         try {
-            const events = await this.apiCall('/system/events?limit=100');
+            // Events are paged by id: "before" is the id of the oldest event shown
+            const page = await this.apiCall(`/system/events?limit=${this.eventsPageSize}${before ? `&before=${before}` : ''}`);
+            const events = before ? this.events.concat(page) : page;
+            this.events = events;
             const container = document.getElementById('eventsTable');
             
             if (!events || events.length === 0) {
@@ -797,6 +848,11 @@ class StorjMonitor {
                         </tbody>
                     </table>
                 </div>
+                ${page.length === this.eventsPageSize ? `
+                    <button class="btn btn-outline-secondary btn-sm" onclick="storjMonitor.updateEventsTable(${events[events.length - 1].id})">
+                        Load older events
+                    </button>
+                ` : ''}
             `;
             
             container.innerHTML = table;
@@ -828,6 +884,22 @@ class StorjMonitor {
         return date.toLocaleString();
     }
 
+    updateCurrentView() {
+        switch (this.currentView) {
+            case 'nodes':
+                this.updateNodeDetails();
+                break;
+            case 'history':
+                this.updateHistoryCharts();
+                break;
+            case 'events':
+                this.updateEventsTable();
+                break;
+            default:
+                this.updateDashboard();
+        }
+    }
+
     // Public Methods
     async refreshData() {
         const refreshBtn = document.getElementById('refreshBtn');
@@ -838,21 +910,7 @@ class StorjMonitor {
         
         try {
             await this.loadInitialData();
-            
-            // Update current view
-            switch (this.currentView) {
-                case 'nodes':
-                    this.updateNodeDetails();
-                    break;
-                case 'history':
-                    this.updateHistoryCharts();
-                    break;
-                case 'events':
-                    this.updateEventsTable();
-                    break;
-                default:
-                    this.updateDashboard();
-            }
+            this.updateCurrentView();
         } catch (error) {
             console.error('Failed to refresh data:', error);
         } finally {